@@ -2,9 +2,10 @@
 import jwt
 import bcrypt
 from datetime import datetime, timezone, timedelta
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS, db
+from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS
+from database import db
 
 security = HTTPBearer()
 
@@ -16,20 +17,24 @@ def verify_password(password: str, hashed: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
-def create_token(user_id: str, role: str) -> str:
+def create_token(user_id: str, email: str, role: str) -> str:
     """Create a JWT token for a user"""
     payload = {
         "user_id": user_id,
+        "email": email,
         "role": role,
         "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def verify_token(token: str) -> dict:
-    """Verify and decode a JWT token"""
+async def get_user_from_token(token: str) -> dict:
+    """Decode a JWT token and load its user"""
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
+        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -37,21 +42,7 @@ def verify_token(token: str) -> dict:
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """FastAPI dependency to get the current authenticated user"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    
-    user = await db.users.find_one(
-        {"id": payload["user_id"]}, 
-        {"_id": 0, "password": 0}
-    )
-    
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    if not user.get("approved", True):
-        raise HTTPException(status_code=403, detail="Account pending approval")
-    
-    return user
+    return await get_user_from_token(credentials.credentials)
 
 async def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
     """FastAPI dependency to ensure the user is an admin"""
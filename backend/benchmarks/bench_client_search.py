@@ -0,0 +1,140 @@
+"""
+Time client search queries (the filter used by GET /api/clients?search=) against
+a large seeded clients collection, comparing the indexed token prefix search
+with the previous unanchored regex $or.
+
+Seeds --clients documents tagged "bench" with search tokens, runs a mix of
+name, partial-name and phone queries, reports p50/p95/p99 per strategy, then
+removes everything it created.
+
+Usage (from backend/):
+    MONGO_URL=mongodb://localhost:27017 DB_NAME=dealercrm_bench \\
+    python benchmarks/bench_client_search.py --clients 500000 --queries 500
+
+Point it at a local/dev deployment only: it writes to the configured database.
+DB_NAME has no default and must name a benchmark database (contain "bench").
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pymongo import MongoClient
+
+from dataset import load_service
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', '')
+
+if 'bench' not in DB_NAME:
+    sys.exit(f"Refusing to run: set DB_NAME to a benchmark database (its name must contain 'bench'), got {DB_NAME!r}")
+
+_client_search = load_service("client_search")
+client_search_tokens = _client_search.client_search_tokens
+parse_search_query = _client_search.parse_search_query
+search_filter = _client_search.search_filter
+SEARCH_FIELD = _client_search.SEARCH_FIELD
+
+BENCH_TAG = "search_bench"
+
+FIRST_NAMES = ["José", "María", "Juan", "Ana", "Luis", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía",
+               "Miguel", "Elena", "Carlos", "Rosa", "Andrés", "Valeria", "Diego", "Paula", "Raúl", "Inés"]
+LAST_NAMES = ["García", "Martínez", "López", "Hernández", "González", "Pérez", "Rodríguez", "Sánchez",
+              "Ramírez", "Torres", "Flores", "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Reyes", "Peña"]
+
+
+def seed(db, num_clients: int, num_owners: int, batch_size: int = 10000) -> list:
+    """Insert benchmark clients and return a sample of them to build queries from"""
+    now = datetime.now(timezone.utc).isoformat()
+    owners = [str(uuid.uuid4()) for _ in range(num_owners)]
+    sample, batch = [], []
+    for i in range(num_clients):
+        first, last = random.choice(FIRST_NAMES), f"{random.choice(LAST_NAMES)}{i % 997}"
+        phone = f"+1{random.randint(2000000000, 9999999999)}"
+        doc = {
+            "id": str(uuid.uuid4()), "first_name": first, "last_name": last, "phone": phone,
+            SEARCH_FIELD: client_search_tokens(first, last, phone),
+            "created_by": random.choice(owners), "is_deleted": False,
+            "bench": BENCH_TAG, "created_at": now
+        }
+        batch.append(doc)
+        if i % max(1, num_clients // 200) == 0:
+            sample.append(doc)
+        if len(batch) >= batch_size:
+            db.clients.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.clients.insert_many(batch, ordered=False)
+    return sample
+
+
+def build_queries(sample: list, count: int) -> list:
+    """User-style inputs: full name, first-name prefix, last-name prefix, local number, last four"""
+    queries = []
+    for _ in range(count):
+        doc = random.choice(sample)
+        digits = doc["phone"][2:]
+        queries.append(random.choice([
+            f"{doc['first_name']} {doc['last_name']}",
+            doc["first_name"][:3],
+            doc["last_name"][:5],
+            digits[3:],
+            digits[-4:],
+        ]))
+    return queries
+
+
+def regex_filter(search: str) -> dict:
+    search_regex = {"$regex": re.escape(search), "$options": "i"}
+    return {"$or": [{"first_name": search_regex}, {"last_name": search_regex}, {"phone": search_regex}]}
+
+
+def time_queries(db, queries: list, make_filter) -> list:
+    latencies = []
+    for search in queries:
+        query = {"is_deleted": {"$ne": True}, **make_filter(search)}
+        start = time.perf_counter()
+        list(db.clients.find(query, {"_id": 0}).sort("created_at", -1).limit(1000))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500000)
+    parser.add_argument("--owners", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--skip-regex", action="store_true", help="only time the indexed search")
+    args = parser.parse_args()
+
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    db.clients.create_index(SEARCH_FIELD)
+    db.clients.create_index([("created_by", 1), (SEARCH_FIELD, 1)])
+    sample = seed(db, args.clients, args.owners)
+    try:
+        queries = build_queries(sample, args.queries)
+        strategies = [("token prefix", lambda s: search_filter(parse_search_query(s)))]
+        if not args.skip_regex:
+            strategies.append(("regex $or", regex_filter))
+
+        print(f"{args.queries} searches over {args.clients} clients")
+        for name, make_filter in strategies:
+            latencies = time_queries(db, queries, make_filter)
+            summary = ", ".join(f"p{pct} {percentile(latencies, pct) * 1000:.1f} ms" for pct in (50, 95, 99))
+            print(f"  {name}: {summary}")
+    finally:
+        db.clients.delete_many({"bench": BENCH_TAG})
+
+
+if __name__ == "__main__":
+    main()
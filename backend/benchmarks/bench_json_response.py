@@ -0,0 +1,102 @@
+"""
+Microbenchmark: serializing a 1000-row list response the default FastAPI way
+(response_model validation + jsonable_encoder + JSONResponse) versus the
+FastJSONResponse fast path the list endpoints return directly.
+
+No database or server needed; rows are synthetic client and pre-qualify
+documents shaped like the stored ones (ISO strings plus "<field>_dt" datetimes).
+
+Usage (from backend/, with the backend requirements installed):
+    python benchmarks/bench_json_response.py --rows 1000 --repeat 50
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import PreQualifyResponse  # noqa: E402
+from services.json_response import FastJSONResponse, ModelRows, orjson  # noqa: E402
+
+def client_row(rng: random.Random, now: datetime) -> dict:
+    created = now - timedelta(days=rng.uniform(0, 500))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))), "first_name": "María", "last_name": "García",
+        "phone": f"+1{rng.randint(2000000000, 9999999999)}", "email": "maria@example.com",
+        "address": "1500 E Anaheim St", "created_by": str(uuid.UUID(int=rng.getrandbits(128))),
+        "created_at": created.isoformat(), "created_at_dt": created,
+        "last_contact": created.isoformat(), "last_contact_dt": created,
+        "id_uploaded": rng.random() < 0.5, "income_proof_uploaded": False, "residence_proof_uploaded": False,
+        "id_documents": [{"id": str(uuid.uuid4()), "url": "/api/uploads/x.jpg", "uploaded_at": created.isoformat()}],
+        "search_score": rng.random(), "sold_count": rng.randint(0, 2), "status_color": "green",
+    }
+
+def prequalify_row(rng: random.Random, now: datetime) -> dict:
+    created = now - timedelta(days=rng.uniform(0, 200))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))), "email": "juan@example.com",
+        "firstName": "Juan", "lastName": "Pérez", "phone": f"{rng.randint(2000000000, 9999999999)}",
+        "address": "7444 Florence Ave", "city": "Downey", "state": "CA", "zipCode": "90240",
+        "housingType": "Renta", "rentAmount": "1800", "timeAtAddressYears": 3, "employerName": "ACME",
+        "netIncome": "4200", "incomeFrequency": "Mensual", "consentAccepted": True,
+        "created_at": created.isoformat(), "created_at_dt": created, "status": "pending",
+    }
+
+def timeit(fn, repeat: int) -> List[float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def default_path(adapter: TypeAdapter, rows: list) -> bytes:
+    # What FastAPI does with a returned list and a response_model
+    validated = adapter.validate_python(rows)
+    dumped = adapter.dump_python(validated, mode="json")
+    return JSONResponse(jsonable_encoder(dumped)).body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    clients = [client_row(rng, now) for _ in range(args.rows)]
+    submissions = [prequalify_row(rng, now) for _ in range(args.rows)]
+    prequalify_rows = ModelRows(PreQualifyResponse)
+
+    cases = {
+        "clients (List[dict])": (
+            lambda: default_path(TypeAdapter(List[dict]), clients),
+            lambda: FastJSONResponse(clients).body,
+        ),
+        "prequalify (List[PreQualifyResponse])": (
+            lambda: default_path(TypeAdapter(List[PreQualifyResponse]), submissions),
+            lambda: FastJSONResponse(prequalify_rows(submissions)).body,
+        ),
+    }
+
+    print(f"{args.rows} rows, median of {args.repeat} runs, encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+    for name, (default, fast) in cases.items():
+        before = statistics.median(timeit(default, args.repeat)) * 1000
+        after = statistics.median(timeit(fast, args.repeat)) * 1000
+        size = len(fast())
+        print(f"  {name:<40} default {before:8.2f} ms   fast {after:7.2f} ms   x{before / after:5.1f}   {size / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    main()
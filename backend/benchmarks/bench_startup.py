@@ -0,0 +1,94 @@
+"""
+Measure worker cold start: time to import the app module and the resident
+memory of a fresh process afterwards, and which heavy libraries got loaded.
+
+Each run imports `server` in a new interpreter (what a uvicorn worker does
+before serving), optionally also runs the startup hooks, and reports the
+median of --runs.
+
+Usage (from backend/, with the backend's .env / MONGO_URL available):
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --startup   # also run startup events (needs mongod)
+    python benchmarks/bench_startup.py --importtime          # top import-time contributors
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["pandas", "twilio.rest", "resend", "apscheduler", "PIL", "PyPDF2", "pypdf", "reportlab"]
+
+# Runs inside the child interpreter; prints one JSON line
+PROBE = """
+import json, sys, time, resource
+started = time.perf_counter()
+import server
+imported = time.perf_counter() - started
+startup = None
+if {run_startup}:
+    import asyncio
+    async def run():
+        t = time.perf_counter()
+        await server.app.router.startup()
+        elapsed = time.perf_counter() - t
+        await server.app.router.shutdown()
+        return elapsed
+    startup = asyncio.run(run())
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_s": imported,
+    "startup_s": startup,
+    "max_rss_mb": rss_kb / 1024 if sys.platform != "darwin" else rss_kb / 1024 / 1024,
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+def run_once(run_startup: bool) -> dict:
+    code = PROBE.format(run_startup=run_startup, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def import_time_report(top: int):
+    """Largest cumulative import times from python -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"], cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.split("|")]
+        rows.append((int(cumulative_us), int(self_us.split(":")[-1]), name))
+    top_level = [row for row in rows if not row[2].startswith(" ") and "." not in row[2].strip()]
+    for cumulative_us, _, name in sorted(top_level, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--startup", action="store_true", help="also run the app startup/shutdown events")
+    parser.add_argument("--importtime", action="store_true", help="print the slowest top-level imports")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = [run_once(args.startup) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts of `import server`")
+    print(f"  import:  median {statistics.median(r['import_s'] for r in results) * 1000:.0f} ms")
+    if args.startup:
+        print(f"  startup: median {statistics.median(r['startup_s'] for r in results) * 1000:.0f} ms")
+    print(f"  max RSS: median {statistics.median(r['max_rss_mb'] for r in results):.1f} MB")
+    print(f"  heavy modules loaded: {', '.join(results[-1]['heavy_loaded']) or 'none'}")
+
+    if args.importtime:
+        print("Slowest top-level imports (cumulative):")
+        import_time_report(args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Replay a burst of inbound Twilio SMS webhooks against a running backend.
+
+Seeds clients, salespeople and records into the backend's (local) MongoDB,
+posts form-encoded webhooks concurrently, reports acknowledgement latency
+percentiles and the time until the inbound queue has processed the burst,
+then removes everything it created.
+
+Usage:
+    MONGO_URL=mongodb://localhost:27017 DB_NAME=dealercrm_bench \\
+    BASE_URL=http://localhost:8001 python benchmarks/bench_twilio_webhook.py --requests 2000 --concurrency 50
+
+Point it at a local/dev deployment only: it writes to the configured database.
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from pymongo import MongoClient
+
+BASE_URL = os.environ.get('BASE_URL', 'http://localhost:8001').rstrip('/')
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'dealercrm_bench')
+
+BENCH_TAG = "webhook_bench"
+
+_local = threading.local()
+
+
+def seed(db, num_clients: int, num_users: int) -> list:
+    """Insert benchmark users/clients/records and return the client phone numbers"""
+    now = datetime.now(timezone.utc).isoformat()
+    users = [
+        {"id": str(uuid.uuid4()), "email": f"bench{i}@example.com", "name": f"Bench {i}",
+         "role": "telemarketer", "bench": BENCH_TAG, "created_at": now}
+        for i in range(num_users)
+    ]
+    db.users.insert_many(users)
+
+    clients, records, phones = [], [], []
+    for i in range(num_clients):
+        digits = f"555{i:07d}"
+        phone = f"+1{digits}"
+        owner = random.choice(users)["id"]
+        client_id = str(uuid.uuid4())
+        clients.append({
+            "id": client_id, "first_name": "Bench", "last_name": str(i), "phone": phone,
+            "phone_key": digits, "created_by": owner, "last_active_user_id": owner,
+            "collaboration_users": [random.choice(users)["id"]],
+            "is_deleted": False, "bench": BENCH_TAG, "created_at": now
+        })
+        records.append({
+            "id": str(uuid.uuid4()), "client_id": client_id, "salesperson_id": owner,
+            "bench": BENCH_TAG, "created_at": now
+        })
+        phones.append(phone)
+
+    db.clients.insert_many(clients)
+    db.user_records.insert_many(records)
+    return phones
+
+
+def cleanup(db, phones: list, sids: list):
+    client_ids = [c["id"] for c in db.clients.find({"bench": BENCH_TAG}, {"id": 1})]
+    db.inbound_sms_queue.delete_many({"key": {"$in": sids}})
+    db.sms_conversations.delete_many({"from_phone": {"$in": phones}})
+    db.notifications.delete_many({"client_id": {"$in": client_ids}})
+    for collection in (db.users, db.clients, db.user_records):
+        collection.delete_many({"bench": BENCH_TAG})
+
+
+def wait_for_queue(db, sids: list, timeout: float = 300) -> float:
+    """Block until every benchmark message has left the inbound queue; returns seconds waited"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        remaining = db.inbound_sms_queue.count_documents({"key": {"$in": sids}, "status": {"$in": ["pending", "processing"]}})
+        if remaining == 0:
+            break
+        time.sleep(0.05)
+    return time.perf_counter() - start
+
+
+def post_webhook(message: tuple) -> float:
+    phone, sid = message
+    # requests.Session is not thread-safe: keep one keep-alive session per worker
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    start = time.perf_counter()
+    response = session.post(f"{BASE_URL}/webhook/twilio/sms", data={
+        "From": phone,
+        "To": "+15550000000",
+        "Body": "Hola, me interesa el carro",
+        "MessageSid": sid
+    })
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    phones = seed(db, args.clients, args.users)
+    sids = [f"SM{uuid.uuid4().hex}" for _ in range(args.requests)]
+    try:
+        messages = [(random.choice(phones), sid) for sid in sids]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(post_webhook, messages))
+        elapsed = time.perf_counter() - started
+        drained = wait_for_queue(db, sids)
+
+        print(f"{args.requests} webhooks, concurrency {args.concurrency}, {args.clients} clients")
+        print(f"  throughput: {args.requests / elapsed:.1f} req/s ({elapsed:.2f}s total)")
+        print(f"  mean: {statistics.mean(latencies) * 1000:.1f} ms")
+        for pct in (50, 95, 99):
+            print(f"  p{pct}: {percentile(latencies, pct) * 1000:.1f} ms")
+        print(f"  queue drained {drained:.2f}s after the last acknowledgement")
+    finally:
+        cleanup(db, phones, sids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Seeded synthetic dataset for the benchmark suite.
+
+Writes users, clients, records, appointments, comments and imported contacts
+into the configured MongoDB with realistic ratios. Every document is tagged
+{"bench": BENCH_TAG} so cleanup() can remove it again. The same --seed gives
+the same dataset: ids, names, phones, owners and relative timestamps are all
+drawn from one random.Random; timestamps are offsets from the moment of
+generation so date-window queries (agenda, dashboard month) see a stable mix.
+
+Derived fields (phone_key, search_tokens, "<field>_dt" mirrors) are written
+the same way the API writes them, so indexed code paths are exercised.
+"""
+import importlib.util
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import bcrypt
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+
+def load_service(name: str):
+    """
+    Load backend/services/<name>.py as a standalone module. Importing it through
+    the services package would run services/__init__, which imports config and
+    with it backend/.env (the real MONGO_URL/DB_NAME).
+    """
+    spec = importlib.util.spec_from_file_location(f"bench_services_{name}", SERVICES_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+with_search_tokens = load_service("client_search").with_search_tokens
+with_datetime_mirrors = load_service("datetimes").with_datetime_mirrors
+
+BENCH_TAG = "benchmark_suite"
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+
+# Per-client averages, from production-like books
+RECORDS_PER_CLIENT = 1.3
+APPOINTMENTS_PER_RECORD = 0.35
+COMMENTS_PER_CLIENT = 2.0
+REMINDER_SHARE = 0.1
+SOLD_SHARE = 0.12
+IMPORTED_CONTACTS_PER_CLIENT = 0.5
+
+FIRST_NAMES = ["José", "María", "Juan", "Ana", "Luis", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía",
+               "Miguel", "Elena", "Carlos", "Rosa", "Andrés", "Valeria", "Diego", "Paula", "Raúl", "Inés"]
+LAST_NAMES = ["García", "Martínez", "López", "Hernández", "González", "Pérez", "Rodríguez", "Sánchez",
+              "Ramírez", "Torres", "Flores", "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Reyes", "Peña"]
+DEALERS = ["Downtown Motors", "Valley Auto", "Coast Cars", "Sunset Auto Group"]
+APPOINTMENT_STATUSES = ["agendado"] * 5 + ["sin_configurar", "cambio_hora", "no_show", "cumplido", "cumplido"]
+COLLECTIONS = ("users", "clients", "user_records", "appointments", "client_comments", "imported_contacts")
+
+@dataclass
+class Dataset:
+    seed: int
+    admin: dict = None
+    bdc_manager: dict = None
+    telemarketers: List[dict] = field(default_factory=list)
+    client_phones: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def users(self) -> List[dict]:
+        return [self.admin, self.bdc_manager] + self.telemarketers
+
+class _Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.now = datetime.now(timezone.utc)
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def ago(self, max_days: float) -> datetime:
+        return self.now - timedelta(seconds=self.rng.uniform(0, max_days * 86400))
+
+    def phone_digits(self) -> str:
+        return f"{self.rng.randint(200, 999)}{self.rng.randint(2000000, 9999999)}"
+
+def _insert(db, collection: str, docs: List[dict], counts: Dict[str, int], batch_size: int = 5000):
+    for i in range(0, len(docs), batch_size):
+        db[collection].insert_many(docs[i:i + batch_size], ordered=False)
+    counts[collection] = counts.get(collection, 0) + len(docs)
+
+def generate(db, seed: int = 42, telemarketers: int = 20, clients: int = 20000) -> Dataset:
+    """Insert a benchmark dataset into `db` (a synchronous pymongo Database) and describe it"""
+    gen = _Generator(seed)
+    rng = gen.rng
+    dataset = Dataset(seed=seed)
+    password = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+    def user(role: str, index: int) -> dict:
+        return {
+            "id": gen.uuid(), "email": f"bench-{role}-{index}-{seed}@{BENCH_EMAIL_DOMAIN}",
+            "password": password, "name": f"Bench {role} {index}", "role": role,
+            "is_active": True, "bench": BENCH_TAG, "created_at": gen.ago(365).isoformat()
+        }
+
+    dataset.admin = user("admin", 0)
+    dataset.bdc_manager = user("bdc_manager", 0)
+    dataset.telemarketers = [user("telemarketer", i) for i in range(telemarketers)]
+    _insert(db, "users", dataset.users, dataset.counts)
+
+    # A few busy telemarketers own most clients
+    owners = dataset.telemarketers + [dataset.admin]
+    weights = [1 / (i + 1) for i in range(len(owners))]
+
+    client_docs, records, appointments, comments = [], [], [], []
+    for _ in range(clients):
+        owner = rng.choices(owners, weights)[0]
+        digits = gen.phone_digits()
+        created = gen.ago(540)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        client = {
+            "id": gen.uuid(), "first_name": first, "last_name": last,
+            "phone": f"+1{digits}", "phone_key": digits,
+            "email": f"{first.lower()}.{rng.randint(1, 9999)}@example.com",
+            "created_by": owner["id"], "last_active_user_id": owner["id"],
+            "is_deleted": rng.random() < 0.02,
+            "created_at": created.isoformat(),
+            "last_contact": (created + (gen.now - created) * rng.random()).isoformat(),
+            "bench": BENCH_TAG,
+        }
+        if rng.random() < SOLD_SHARE:
+            client["is_sold"] = True
+            client["sold_at"] = (created + (gen.now - created) * rng.random()).isoformat()
+        client_docs.append(with_datetime_mirrors(with_search_tokens(client)))
+        dataset.client_phones.append(client["phone"])
+
+        for _ in range(int(RECORDS_PER_CLIENT) + (rng.random() < RECORDS_PER_CLIENT % 1)):
+            record_created = created + (gen.now - created) * rng.random()
+            record = {
+                "id": gen.uuid(), "client_id": client["id"],
+                "salesperson_id": owner["id"], "salesperson_name": owner["name"],
+                "record_status": "completed" if client.get("is_sold") else rng.choice([None, "pending", "in_progress"]),
+                "finance_status": rng.choice(["no", "financiado", "lease"]),
+                "created_at": record_created.isoformat(), "is_deleted": False,
+                "bench": BENCH_TAG,
+            }
+            records.append(with_datetime_mirrors(record))
+            if rng.random() < APPOINTMENTS_PER_RECORD:
+                status = rng.choice(APPOINTMENT_STATUSES)
+                day = (gen.now + timedelta(days=rng.randint(-60, 45))).date()
+                appointments.append(with_datetime_mirrors({
+                    "id": gen.uuid(), "user_record_id": record["id"], "client_id": client["id"],
+                    "salesperson_id": owner["id"], "salesperson_name": owner["name"],
+                    "date": None if status == "sin_configurar" else day.isoformat(),
+                    "time": None if status == "sin_configurar" else f"{rng.randint(9, 18):02d}:{rng.choice(['00', '30'])}",
+                    "dealer": rng.choice(DEALERS), "language": rng.choice(["es", "en"]),
+                    "status": status, "reminder_count": 0,
+                    "created_at": record_created.isoformat(), "bench": BENCH_TAG,
+                }))
+
+        for _ in range(rng.randint(0, int(COMMENTS_PER_CLIENT * 2))):
+            reminder = rng.random() < REMINDER_SHARE
+            comments.append(with_datetime_mirrors({
+                "id": gen.uuid(), "client_id": client["id"], "comment": "Llamar de nuevo",
+                "user_id": owner["id"], "user_name": owner["name"],
+                "created_at": gen.ago(120).isoformat(),
+                "reminder_at": (gen.now + timedelta(hours=rng.uniform(-48, 240))).isoformat() if reminder else None,
+                "reminder_sent": False, "bench": BENCH_TAG,
+            }))
+
+    _insert(db, "clients", client_docs, dataset.counts)
+    _insert(db, "user_records", records, dataset.counts)
+    _insert(db, "appointments", appointments, dataset.counts)
+    _insert(db, "client_comments", comments, dataset.counts)
+
+    contacts = []
+    for _ in range(int(clients * IMPORTED_CONTACTS_PER_CLIENT)):
+        owner = rng.choices(owners, weights)[0]
+        digits = gen.phone_digits()
+        contacts.append(with_datetime_mirrors({
+            "id": gen.uuid(), "first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES),
+            "phone": digits, "phone_formatted": f"+1{digits}",
+            "imported_by": owner["id"], "imported_by_name": owner["name"],
+            "imported_at": gen.ago(90).isoformat(),
+            "sms_sent": False, "sms_count": 0, "last_sms_sent": None,
+            "opt_out": rng.random() < 0.05, "status": "pending", "bench": BENCH_TAG,
+        }))
+    _insert(db, "imported_contacts", contacts, dataset.counts)
+    return dataset
+
+def cleanup(db):
+    """Remove the dataset and what the API derived from it (notifications, SMS, imports, queue items)"""
+    user_ids = [u["id"] for u in db.users.find({"bench": BENCH_TAG}, {"id": 1})]
+    client_ids = [c["id"] for c in db.clients.find({"bench": BENCH_TAG}, {"id": 1})]
+    phones = [c["phone"] for c in db.clients.find({"bench": BENCH_TAG}, {"phone": 1})]
+    db.notifications.delete_many({"user_id": {"$in": user_ids}})
+    db.sms_conversations.delete_many({"$or": [{"client_id": {"$in": client_ids}}, {"from_phone": {"$in": phones}}]})
+    db.inbound_sms_queue.delete_many({"payload.From": {"$in": phones}})
+    db.imported_contacts.delete_many({"imported_by": {"$in": user_ids}})
+    db.unread_counters.delete_many({"_id": {"$in": [f"notifications:{uid}" for uid in user_ids] + [f"sms:{cid}" for cid in client_ids]}})
+    for collection in COLLECTIONS:
+        db[collection].delete_many({"bench": BENCH_TAG})
@@ -0,0 +1,265 @@
+"""
+Benchmark suite: seeds a synthetic dataset, runs scripted API scenarios
+against a running backend and reports latency percentiles and MongoDB
+operations per request (from the X-DB-Calls response header).
+
+Scenarios:
+    client_list    GET /api/clients as telemarketers and admin, with and without search
+    dashboard      GET /api/dashboard/stats and /salesperson-performance
+    agenda         GET /api/appointments/agenda for admin, BDC manager and telemarketers
+    webhook_burst  concurrent inbound Twilio webhooks, plus time to drain the inbound queue
+    import         POST /api/import-contacts with a CSV upload
+
+Usage (from backend/, against a local mongod and a backend started with the same DB):
+    MONGO_URL=mongodb://localhost:27017 DB_NAME=dealercrm_bench BASE_URL=http://localhost:8001 \\
+    python benchmarks/run_benchmarks.py --clients 20000 --iterations 200 --json results.json
+
+    # later, fail (exit 1) if p95 or DB calls per request regressed by more than 20%
+    python benchmarks/run_benchmarks.py --baseline results.json --tolerance 0.2
+
+The dataset is removed afterwards unless --keep is given; --reuse skips seeding
+and runs against a dataset kept by an earlier --keep run with the same --seed.
+Point it at a local/dev deployment only: it writes to the configured database.
+DB_NAME has no default and must name a benchmark database (contain "bench");
+the script exits before touching MongoDB otherwise.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import requests
+from pymongo import MongoClient
+
+# Read before importing dataset, so nothing can swap in backend/.env settings
+BASE_URL = os.environ.get('BASE_URL', 'http://localhost:8001').rstrip('/')
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', '')
+
+if 'bench' not in DB_NAME:
+    sys.exit(f"Refusing to run: set DB_NAME to a benchmark database (its name must contain 'bench'), got {DB_NAME!r}")
+
+from dataset import BENCH_PASSWORD, BENCH_TAG, FIRST_NAMES, cleanup, generate, Dataset  # noqa: E402
+
+# (seconds, db calls, HTTP status)
+Sample = Tuple[float, int, int]
+
+_local = threading.local()
+
+def session() -> requests.Session:
+    # requests.Session is not thread-safe: one keep-alive session per worker thread
+    current = getattr(_local, "session", None)
+    if current is None:
+        current = _local.session = requests.Session()
+    return current
+
+def timed(method: str, path: str, token: str = None, **kwargs) -> Sample:
+    headers = kwargs.pop("headers", {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    start = time.perf_counter()
+    response = session().request(method, f"{BASE_URL}{path}", headers=headers, **kwargs)
+    elapsed = time.perf_counter() - start
+    return elapsed, int(response.headers.get("X-DB-Calls", -1)), response.status_code
+
+def login(user: dict) -> str:
+    response = session().post(f"{BASE_URL}/api/auth/login", json={"email": user["email"], "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["token"]
+
+class Context:
+    def __init__(self, dataset: Dataset, db, rng: random.Random, concurrency: int):
+        self.dataset = dataset
+        self.db = db
+        self.rng = rng
+        self.concurrency = concurrency
+        self.tokens: Dict[str, str] = {user["id"]: login(user) for user in dataset.users}
+
+    def token(self, user: dict) -> str:
+        return self.tokens[user["id"]]
+
+    def telemarketer_token(self) -> str:
+        return self.token(self.rng.choice(self.dataset.telemarketers))
+
+# ==================== SCENARIOS ====================
+
+def scenario_client_list(ctx: Context, iterations: int) -> List[Sample]:
+    samples = []
+    for i in range(iterations):
+        kind = i % 4
+        if kind == 0:
+            samples.append(timed("GET", "/api/clients", ctx.telemarketer_token()))
+        elif kind == 1:
+            search = ctx.rng.choice(FIRST_NAMES)[:3]
+            samples.append(timed("GET", "/api/clients", ctx.telemarketer_token(), params={"search": search}))
+        elif kind == 2:
+            phone = ctx.rng.choice(ctx.dataset.client_phones)
+            samples.append(timed("GET", "/api/clients", ctx.token(ctx.dataset.admin),
+                                 params={"search": phone[-7:], "owner_filter": "all"}))
+        else:
+            samples.append(timed("GET", "/api/clients", ctx.token(ctx.dataset.admin), params={"owner_filter": "all"}))
+    return samples
+
+def scenario_dashboard(ctx: Context, iterations: int) -> List[Sample]:
+    samples = []
+    for i in range(iterations):
+        kind = i % 3
+        if kind == 0:
+            samples.append(timed("GET", "/api/dashboard/stats", ctx.token(ctx.dataset.admin), params={"period": "month"}))
+        elif kind == 1:
+            samples.append(timed("GET", "/api/dashboard/salesperson-performance", ctx.token(ctx.dataset.admin),
+                                 params={"period": "6months"}))
+        else:
+            samples.append(timed("GET", "/api/dashboard/stats", ctx.telemarketer_token()))
+    return samples
+
+def scenario_agenda(ctx: Context, iterations: int) -> List[Sample]:
+    users = [ctx.dataset.admin, ctx.dataset.bdc_manager]
+    samples = []
+    for i in range(iterations):
+        token = ctx.token(users[i % 2]) if i % 3 else ctx.telemarketer_token()
+        samples.append(timed("GET", "/api/appointments/agenda", token))
+    return samples
+
+def _post_webhook(phone: str) -> Sample:
+    return timed("POST", "/webhook/twilio/sms", data={
+        "From": phone, "To": "+15550000000",
+        "Body": "Hola, me interesa el carro", "MessageSid": f"SM{uuid.uuid4().hex}",
+    })
+
+def scenario_webhook_burst(ctx: Context, iterations: int) -> List[Sample]:
+    phones = [ctx.rng.choice(ctx.dataset.client_phones) for _ in range(iterations)]
+    with ThreadPoolExecutor(max_workers=ctx.concurrency) as pool:
+        samples = list(pool.map(_post_webhook, phones))
+    start = time.perf_counter()
+    while ctx.db.inbound_sms_queue.count_documents({"payload.From": {"$in": phones}, "status": {"$in": ["pending", "processing"]}}):
+        if time.perf_counter() - start > 300:
+            break
+        time.sleep(0.05)
+    print(f"  webhook_burst: inbound queue drained {time.perf_counter() - start:.2f}s after the last acknowledgement")
+    return samples
+
+def _contacts_csv(rng: random.Random, rows: int) -> bytes:
+    out = io.StringIO()
+    out.write("first_name,last_name,phone\n")
+    for _ in range(rows):
+        out.write(f"{rng.choice(FIRST_NAMES)},Bench,{rng.randint(200, 999)}{rng.randint(2000000, 9999999)}\n")
+    return out.getvalue().encode("utf-8")
+
+def scenario_import(ctx: Context, iterations: int, rows: int = 200) -> List[Sample]:
+    samples = []
+    # Each upload is a full file import; a handful is enough to see the trend
+    for _ in range(max(1, iterations // 20)):
+        files = {"file": ("contacts.csv", _contacts_csv(ctx.rng, rows), "text/csv")}
+        samples.append(timed("POST", "/api/import-contacts", ctx.telemarketer_token(), files=files))
+    return samples
+
+SCENARIOS: Dict[str, Callable[[Context, int], List[Sample]]] = {
+    "client_list": scenario_client_list,
+    "dashboard": scenario_dashboard,
+    "agenda": scenario_agenda,
+    "webhook_burst": scenario_webhook_burst,
+    "import": scenario_import,
+}
+
+# ==================== REPORTING ====================
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(samples: List[Sample]) -> dict:
+    latencies = [s[0] for s in samples]
+    db_calls = [s[1] for s in samples if s[1] >= 0]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s[2] >= 400),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "db_calls_mean": round(statistics.mean(db_calls), 1) if db_calls else None,
+        "db_calls_max": max(db_calls) if db_calls else None,
+    }
+
+def print_table(results: Dict[str, dict]):
+    header = f"{'scenario':<15}{'reqs':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'db/req':>9}{'db max':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<15}{r['requests']:>6}{r['errors']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+              f"{r['db_calls_mean'] if r['db_calls_mean'] is not None else '-':>9}"
+              f"{r['db_calls_max'] if r['db_calls_max'] is not None else '-':>8}")
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Regressions beyond `tolerance` (fraction) in p95 latency or mean DB calls per request"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ("p95_ms", "db_calls_mean"):
+            old, new = before.get(metric), current.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--telemarketers", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=25, help="webhook burst workers")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--keep", action="store_true", help="leave the dataset in place")
+    parser.add_argument("--reuse", action="store_true", help="reuse a dataset kept by an earlier run")
+    args = parser.parse_args()
+
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    if args.reuse:
+        dataset = Dataset(seed=args.seed)
+        users = list(db.users.find({"bench": BENCH_TAG}, {"_id": 0}))
+        dataset.admin = next(u for u in users if u["role"] == "admin")
+        dataset.bdc_manager = next(u for u in users if u["role"] == "bdc_manager")
+        dataset.telemarketers = [u for u in users if u["role"] == "telemarketer"]
+        dataset.client_phones = [c["phone"] for c in db.clients.find({"bench": BENCH_TAG}, {"phone": 1})]
+    else:
+        cleanup(db)
+        started = time.perf_counter()
+        dataset = generate(db, seed=args.seed, telemarketers=args.telemarketers, clients=args.clients)
+        print(f"Seeded {dataset.counts} in {time.perf_counter() - started:.1f}s (seed {args.seed})")
+
+    results = {}
+    try:
+        ctx = Context(dataset, db, random.Random(args.seed), args.concurrency)
+        for name in args.scenarios.split(","):
+            results[name] = summarize(SCENARIOS[name](ctx, args.iterations))
+    finally:
+        if not args.keep:
+            cleanup(db)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump({"seed": args.seed, "clients": args.clients, "results": results}, out, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
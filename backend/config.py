@@ -1,10 +1,10 @@
 """
-Database configuration and shared utilities for DealerCRM
+Configuration for DealerCRM: every setting read from the environment lives here.
+The MongoDB client itself is created once, in database.py.
 """
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 
 # Load environment variables
@@ -12,9 +12,35 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_URL = os.environ['MONGO_URL']
+DB_NAME = os.environ['DB_NAME']
+
+# Connection pool (per process; pymongo defaults when unset). Size the pool for
+# concurrent requests per worker; a checkout waiting longer than
+# MONGO_WAIT_QUEUE_TIMEOUT_MS fails instead of queueing indefinitely.
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ['MONGO_MAX_IDLE_TIME_MS']) if os.environ.get('MONGO_MAX_IDLE_TIME_MS') else None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS']) if os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '20000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ['MONGO_SOCKET_TIMEOUT_MS']) if os.environ.get('MONGO_SOCKET_TIMEOUT_MS') else None
+
+# Read preference for read-only reporting routes (dashboards, performance, backup).
+# "secondaryPreferred" moves them off the primary on a replica set; "primary" keeps them there.
+ANALYTICS_READ_PREFERENCE = os.environ.get('ANALYTICS_READ_PREFERENCE', 'primary')
+# Optional bound on how stale a secondary may be for those reads (seconds, >= 90)
+ANALYTICS_MAX_STALENESS_SECONDS = int(os.environ.get('ANALYTICS_MAX_STALENESS_SECONDS', '-1'))
+
+# Request / MongoDB instrumentation
+# Optional bearer token required by /metrics (unset = open, e.g. scraped on a private network)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Query-shape profile (GET /api/admin/slow-queries); commands slower than this are logged
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+
+# In-memory cache for config lists / SMS templates. Writes invalidate it on the worker
+# that handles them; other workers pick the change up within this many seconds.
+REFERENCE_CACHE_TTL_SECONDS = float(os.environ.get('REFERENCE_CACHE_TTL_SECONDS', '60'))
 
 # JWT Settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'dealercrm-secret-key-2024')
@@ -25,17 +51,23 @@ JWT_EXPIRATION_HOURS = 24
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
+TWILIO_MESSAGING_SERVICE_SID = os.environ.get('TWILIO_MESSAGING_SERVICE_SID')
 
-# Email Configuration (SMTP)
+# Resend Email Configuration (optional - can use SMTP instead)
+RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
+SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
+
+# SMTP Email Configuration (FREE - Gmail, Outlook, etc.)
 SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
 SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
-SMTP_USER = os.environ.get('SMTP_USER', '')
-SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
+SMTP_USER = os.environ.get('SMTP_USER', '')  # Your email
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')  # App password
 SMTP_FROM_NAME = os.environ.get('SMTP_FROM_NAME', 'DealerCRM')
 
-# Resend Email (optional)
-RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
-SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
+# Company Logo URL for emails and public forms
+COMPANY_LOGO_URL = "https://carplusautosalesgroup.com/img/carplus.png"
+COMPANY_NAME = "CARPLUS AUTOSALE"
+COMPANY_TAGLINE = "Friendly Brokerage"
 
 # Frontend URL for links
 FRONTEND_URL = os.environ.get('FRONTEND_URL', '')
@@ -46,7 +78,7 @@ UPLOADS_DIR.mkdir(exist_ok=True)
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO, 
+    level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
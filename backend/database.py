@@ -0,0 +1,59 @@
+"""
+The single MongoDB client for the backend, with its command and pool listeners.
+Import `db` from here; never create another AsyncIOMotorClient.
+
+Pool size and timeouts come from config.py (MONGO_*). Read-only reporting
+routes use `analytics_db`: the same client and pool, with the read preference
+from ANALYTICS_READ_PREFERENCE so they can run on secondaries.
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from config import (
+    MONGO_URL, DB_NAME, SLOW_QUERY_MS,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS,
+    ANALYTICS_READ_PREFERENCE, ANALYTICS_MAX_STALENESS_SECONDS, REFERENCE_CACHE_TTL_SECONDS
+)
+from services.metrics import MetricsRegistry, RequestMetrics, MongoCommandMetrics, MongoPoolMetrics
+from services.query_profiler import QueryProfiler
+from services.reference_cache import ReferenceCache
+
+# Request / MongoDB instrumentation, exposed on GET /metrics
+metrics_registry = MetricsRegistry()
+request_metrics = RequestMetrics(metrics_registry)
+mongo_command_metrics = MongoCommandMetrics(metrics_registry)
+mongo_pool_metrics = MongoPoolMetrics(metrics_registry)
+query_profiler = QueryProfiler(slow_ms=SLOW_QUERY_MS)
+
+# Config lists and SMS templates (see services/reference_cache.py)
+reference_cache = ReferenceCache(ttl_seconds=REFERENCE_CACHE_TTL_SECONDS)
+
+def client_options() -> dict:
+    """Pool and timeout settings for the client; unset values keep the driver defaults"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    event_listeners=[mongo_command_metrics, mongo_pool_metrics, query_profiler],
+    **client_options()
+)
+db = client[DB_NAME]
+
+def analytics_read_preference():
+    """Read preference for reporting queries, e.g. SecondaryPreferred(max_staleness=120)"""
+    mode = read_pref_mode_from_name(ANALYTICS_READ_PREFERENCE)
+    if ANALYTICS_MAX_STALENESS_SECONDS > 0 and mode != 0:
+        return make_read_preference(mode, None, max_staleness=ANALYTICS_MAX_STALENESS_SECONDS)
+    return make_read_preference(mode, None)
+
+# Dashboards, performance reports and backups: may read slightly stale data from a secondary
+analytics_db = client.get_database(DB_NAME, read_preference=analytics_read_preference())
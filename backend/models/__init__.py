@@ -4,8 +4,9 @@ Pydantic models for DealerCRM
 from .user import UserCreate, UserActivate, UserRoleUpdate, UserLogin, UserResponse
 from .client import ClientCreate, ClientResponse
 from .record import UserRecordCreate, UserRecordResponse
-from .appointment import AppointmentCreate, AppointmentResponse
+from .appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
 from .cosigner import CoSignerRelationCreate, CoSignerRelationResponse
+from .sms import SMSLogCreate
 from .config_list import ConfigListItem, ConfigListItemResponse
 from .prequalify import PreQualifySubmission, PreQualifyResponse
 
@@ -17,9 +18,11 @@ __all__ = [
     # Record models
     'UserRecordCreate', 'UserRecordResponse',
     # Appointment models
-    'AppointmentCreate', 'AppointmentResponse',
+    'AppointmentCreate', 'AppointmentUpdate', 'AppointmentResponse',
     # Co-signer models
     'CoSignerRelationCreate', 'CoSignerRelationResponse',
+    # SMS models
+    'SMSLogCreate',
     # Config list models
     'ConfigListItem', 'ConfigListItemResponse',
     # Pre-qualify models
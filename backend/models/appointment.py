@@ -5,24 +5,31 @@ from typing import Optional
 class AppointmentCreate(BaseModel):
     user_record_id: str
     client_id: str
-    date: str
-    time: str
+    date: Optional[str] = None
+    time: Optional[str] = None
     dealer: Optional[str] = None
-    language: str = "es"
-    change_time: bool = False
+    language: str = "en"  # en or es
+    change_time: Optional[str] = None
+
+class AppointmentUpdate(BaseModel):
+    date: Optional[str] = None
+    time: Optional[str] = None
+    dealer: Optional[str] = None
+    language: Optional[str] = None
+    change_time: Optional[str] = None
 
 class AppointmentResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
     user_record_id: str
     client_id: str
-    salesperson_id: Optional[str] = None
-    date: str
-    time: str
+    salesperson_id: str
+    date: Optional[str] = None
+    time: Optional[str] = None
     dealer: Optional[str] = None
-    language: str = "es"
-    change_time: bool = False
-    status: str = "scheduled"
+    language: str = "en"
+    change_time: Optional[str] = None
+    status: str = "sin_configurar"  # agendado, sin_configurar, cambio_hora, tres_semanas, no_show, cumplido
     link_sent_at: Optional[str] = None
     reminder_count: int = 0
     created_at: str
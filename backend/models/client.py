@@ -1,6 +1,6 @@
 """Client models for customer management"""
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Any, Optional
 
 class ClientCreate(BaseModel):
     first_name: str
@@ -9,11 +9,20 @@ class ClientCreate(BaseModel):
     email: Optional[str] = None
     address: Optional[str] = None
     apartment: Optional[str] = None
+    # Date of birth
     date_of_birth: Optional[str] = None
-    time_at_address_years: Optional[int] = None
-    time_at_address_months: Optional[int] = None
+    # ID fields (admin only for id_number)
+    id_type: Optional[str] = None  # Licencia, Pasaporte, Matrícula Consular, etc.
+    id_number: Optional[str] = None  # ID/License number (admin only)
+    # SSN/ITIN fields
+    ssn_type: Optional[str] = None  # SSN, ITIN, Ninguno
+    ssn: Optional[str] = None  # Last 4 digits (admin only)
+    # Time at address (accept str or int)
+    time_at_address_years: Optional[Any] = None
+    time_at_address_months: Optional[Any] = None
+    # Housing type: Dueño, Renta, Vivo con familiares
     housing_type: Optional[str] = None
-    rent_amount: Optional[str] = None
+    rent_amount: Optional[str] = None  # Only when housing_type is "Renta"
 
 class ClientResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -24,23 +33,27 @@ class ClientResponse(BaseModel):
     email: Optional[str] = None
     address: Optional[str] = None
     apartment: Optional[str] = None
+    # Date of birth
     date_of_birth: Optional[str] = None
-    time_at_address_years: Optional[int] = None
-    time_at_address_months: Optional[int] = None
+    # ID fields (admin only for id_number)
+    id_type: Optional[str] = None
+    id_number: Optional[str] = None  # Admin only
+    # SSN/ITIN fields
+    ssn_type: Optional[str] = None
+    ssn: Optional[str] = None  # Admin only
+    # Time at address (can be int or str)
+    time_at_address_years: Optional[Any] = None
+    time_at_address_months: Optional[Any] = None
+    # Housing type
     housing_type: Optional[str] = None
     rent_amount: Optional[str] = None
     id_uploaded: bool = False
-    id_file_url: Optional[str] = None
     income_proof_uploaded: bool = False
-    income_proof_file_url: Optional[str] = None
     residence_proof_uploaded: bool = False
+    id_file_url: Optional[str] = None
+    income_proof_file_url: Optional[str] = None
     residence_proof_file_url: Optional[str] = None
-    last_record_date: Optional[str] = None
-    sold_count: int = 0
+    last_record_date: Optional[str] = None  # Date of last record created (not last_contact)
     created_at: str
-    created_by: Optional[str] = None
+    created_by: str
     is_deleted: bool = False
-    salesperson_id: Optional[str] = None
-    salesperson_name: Optional[str] = None
-    last_contacted_at: Optional[str] = None
-    opt_out_sms: bool = False
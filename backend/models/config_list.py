@@ -4,12 +4,15 @@ from typing import Optional
 
 class ConfigListItem(BaseModel):
     name: str
-    category: str  # bank, dealer, car, id_type, poi_type, por_type
+    category: str  # 'bank', 'dealer', 'car'
+    address: Optional[str] = None  # Only for dealers
 
 class ConfigListItemResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
-    name: str
+    name: Optional[str] = None  # For banks, dealers, cars
+    value: Optional[str] = None  # For id_type, poi_type, por_type
     category: str
-    created_at: str
+    address: Optional[str] = None
+    created_at: Optional[str] = None
     created_by: Optional[str] = None
@@ -16,9 +16,11 @@ class PreQualifySubmission(BaseModel):
     zipCode: Optional[str] = None
     housingType: Optional[str] = None
     rentAmount: Optional[str] = None
+    # Time at address - separated fields
     timeAtAddressYears: Optional[int] = None
     timeAtAddressMonths: Optional[int] = None
     employerName: Optional[str] = None
+    # Time with employer - separated fields
     timeWithEmployerYears: Optional[int] = None
     timeWithEmployerMonths: Optional[int] = None
     incomeType: Optional[str] = None
@@ -35,17 +37,22 @@ class PreQualifyResponse(BaseModel):
     lastName: str
     phone: str
     idNumber: Optional[str] = None
+    idType: Optional[str] = None
     ssn: Optional[str] = None
+    ssnType: Optional[str] = None
     dateOfBirth: Optional[str] = None
     address: Optional[str] = None
+    apartment: Optional[str] = None
     city: Optional[str] = None
     state: Optional[str] = None
     zipCode: Optional[str] = None
     housingType: Optional[str] = None
     rentAmount: Optional[str] = None
+    # Time at address - separated fields
     timeAtAddressYears: Optional[int] = None
     timeAtAddressMonths: Optional[int] = None
     employerName: Optional[str] = None
+    # Time with employer - separated fields
     timeWithEmployerYears: Optional[int] = None
     timeWithEmployerMonths: Optional[int] = None
     incomeType: Optional[str] = None
@@ -53,8 +60,9 @@ class PreQualifyResponse(BaseModel):
     incomeFrequency: Optional[str] = None
     estimatedDownPayment: Optional[str] = None
     consentAccepted: bool = False
+    language: Optional[str] = None
     created_at: str
     status: str = "pending"
     matched_client_id: Optional[str] = None
     matched_client_name: Optional[str] = None
-    id_file_url: Optional[str] = None
+    id_file_url: Optional[str] = None  # URL del documento de ID subido
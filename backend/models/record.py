@@ -1,58 +1,80 @@
 """User Record (Oportunidad/Cartilla) models"""
-from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict
+from typing import Any, List, Optional
 
 class UserRecordCreate(BaseModel):
     client_id: str
+    # ID/DL fields (renamed from dl to id_type)
     has_id: bool = False
-    id_type: Optional[str] = None
+    id_type: Optional[str] = None  # DL, Passport, Matricula, Votacion ID, US Passport, Resident ID, Other
+    # POI (Proof of Income) - renamed from checks
     has_poi: bool = False
-    poi_type: Optional[str] = None
+    poi_type: Optional[str] = None  # Cash, Company Check, Personal Check, Talon de Cheque
+    # SSN
     ssn: bool = False
+    # ITIN
     itin: bool = False
-    self_employed: bool = False
-    self_employed_docs: List[str] = Field(default_factory=list)
+    # Employment type: Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
+    self_employed: bool = False  # Legacy field
+    employment_type: Optional[str] = None  # Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
+    employment_company_name: Optional[str] = None  # Company name when Company or Self employed
+    employment_time_years: Optional[Any] = None  # Years at employment (accepts str or int)
+    employment_time_months: Optional[Any] = None  # Months at employment (accepts str or int)
+    # Income fields
+    income_frequency: Optional[str] = None  # Semanal, Cada dos semanas, Dos veces al mes, Mensual
+    net_income_amount: Optional[str] = None  # Net income amount
+    # POR (Proof of Residence) - new
     has_por: bool = False
-    por_types: List[str] = Field(default_factory=list)
+    por_types: Optional[List[str]] = None  # Agua, Luz, Gas, Internet, etc. (multiple selection)
+    # Bank info with deposit type
     bank: Optional[str] = None
-    bank_deposit_type: Optional[str] = None
-    down_payment_type: List[str] = Field(default_factory=list)
+    bank_deposit_type: Optional[str] = None  # Deposito Directo, No deposito directo
+    # Other fields
+    auto: Optional[str] = None
+    credit: Optional[str] = None
+    # Auto Loan fields - Paid, Late, On Time (with bank and amount for On Time)
+    first_time_buyer: bool = False  # New field
+    auto_loan: Optional[str] = None  # Legacy field
+    auto_loan_status: Optional[str] = None  # Paid, Late, On Time
+    auto_loan_bank: Optional[str] = None  # Bank name when On Time
+    auto_loan_amount: Optional[str] = None  # Amount when On Time
+    # Down Payment with type
+    down_payment_type: Optional[str] = None  # Cash, Tarjeta, Trade
+    down_payment_types: Optional[List[str]] = None  # Multiple selection
     down_payment_cash: Optional[str] = None
     down_payment_card: Optional[str] = None
+    # Trade-in vehicle info
     trade_make: Optional[str] = None
     trade_model: Optional[str] = None
     trade_year: Optional[str] = None
-    trade_title: Optional[str] = None
+    trade_title: Optional[str] = None  # Clean Title, Salvaged
     trade_miles: Optional[str] = None
-    trade_plate: Optional[str] = None
+    trade_plate: Optional[str] = None  # CA, Out of State
     trade_estimated_value: Optional[str] = None
-    auto: bool = False
-    credit: bool = False
-    auto_loan: Optional[List[str]] = None
+    # Dealer/Location
     dealer: Optional[str] = None
-    finance_status: Optional[str] = None
+    # Finance status: financiado, lease, no (fixed typo)
+    finance_status: str = "no"  # financiado, lease, no
+    # Vehicle info (only when finance_status is financiado or lease)
     vehicle_make: Optional[str] = None
     vehicle_year: Optional[str] = None
-    sale_month: Optional[str] = None
-    sale_day: Optional[str] = None
-    sale_year: Optional[str] = None
-    record_status: Optional[str] = None
-    approved_amount: Optional[str] = None
-    contract_amount: Optional[str] = None
-    down_payment_final: Optional[str] = None
-    commission_amount: Optional[str] = None
-    commission_paid: bool = False
-    commission_due_date: Optional[str] = None
-    employment_type: Optional[str] = None
-    employment_company_name: Optional[str] = None
-    employment_time_years: Optional[int] = None
-    employment_time_months: Optional[int] = None
-    income_frequency: Optional[str] = None
-    net_income_amount: Optional[str] = None
+    sale_month: Optional[int] = None
+    sale_day: Optional[int] = None
+    sale_year: Optional[int] = None
+    previous_record_id: Optional[str] = None  # For "New Opportunity" - links to previous record
+    # Collaborator - shared user working on this record
     collaborator_id: Optional[str] = None
     collaborator_name: Optional[str] = None
-    collaborator_commission: Optional[str] = None
-    collaborator_paid: bool = False
+    # Record completion status: null, completed, no_show
+    record_status: Optional[str] = None
+    # Commission fields (admin only) - only visible when record_status is completed
+    commission_percentage: Optional[float] = None  # 1-100
+    commission_value: Optional[float] = None  # Dollar amount
+    commission_locked: Optional[bool] = False  # When true, record_status cannot be changed by non-admins
+    # Legacy fields for backward compatibility
+    dl: Optional[bool] = None
+    checks: Optional[bool] = None
+    down_payment: Optional[str] = None
 
 class UserRecordResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -60,21 +82,45 @@ class UserRecordResponse(BaseModel):
     client_id: str
     salesperson_id: Optional[str] = None
     salesperson_name: Optional[str] = None
+    # ID fields
     has_id: bool = False
     id_type: Optional[str] = None
+    # POI fields
     has_poi: bool = False
     poi_type: Optional[str] = None
+    # Other checks
     ssn: bool = False
     itin: bool = False
-    self_employed: bool = False
-    self_employed_docs: List[str] = Field(default_factory=list)
+    self_employed: bool = False  # Legacy
+    # Employment fields
+    employment_type: Optional[str] = None  # Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
+    employment_company_name: Optional[str] = None
+    employment_time_years: Optional[Any] = None
+    employment_time_months: Optional[Any] = None
+    # Income fields
+    income_frequency: Optional[str] = None  # Semanal, Cada dos semanas, Dos veces al mes, Mensual
+    net_income_amount: Optional[str] = None  # Net income amount
+    # POR fields
     has_por: bool = False
-    por_types: List[str] = Field(default_factory=list)
+    por_types: Optional[List[str]] = None
+    # Bank info
     bank: Optional[str] = None
     bank_deposit_type: Optional[str] = None
-    down_payment_type: List[str] = Field(default_factory=list)
+    direct_deposit_amount: Optional[str] = None
+    # Other fields
+    auto: Optional[str] = None
+    credit: Optional[str] = None
+    # Auto Loan fields - Paid, Late, On Time (with bank and amount for On Time)
+    auto_loan: Optional[str] = None  # Legacy field
+    auto_loan_status: Optional[str] = None  # Paid, Late, On Time
+    auto_loan_bank: Optional[str] = None  # Bank name when On Time
+    auto_loan_amount: Optional[str] = None  # Amount when On Time
+    # Down Payment
+    down_payment_type: Optional[str] = None
+    down_payment_types: Optional[List[str]] = None  # Multiple selection
     down_payment_cash: Optional[str] = None
     down_payment_card: Optional[str] = None
+    # Trade-in
     trade_make: Optional[str] = None
     trade_model: Optional[str] = None
     trade_year: Optional[str] = None
@@ -82,34 +128,30 @@ class UserRecordResponse(BaseModel):
     trade_miles: Optional[str] = None
     trade_plate: Optional[str] = None
     trade_estimated_value: Optional[str] = None
-    auto: bool = False
-    credit: bool = False
-    auto_loan: Optional[List[str]] = None
+    # Dealer
     dealer: Optional[str] = None
-    finance_status: Optional[str] = None
+    # Finance status
+    finance_status: str = "no"  # financiado, lease, no
+    # Vehicle info
     vehicle_make: Optional[str] = None
     vehicle_year: Optional[str] = None
-    sale_month: Optional[str] = None
-    sale_day: Optional[str] = None
-    sale_year: Optional[str] = None
+    sale_month: Optional[int] = None
+    sale_day: Optional[int] = None
+    sale_year: Optional[int] = None
     created_at: str
     is_deleted: bool = False
     previous_record_id: Optional[str] = None
     opportunity_number: int = 1
-    record_status: Optional[str] = None
-    approved_amount: Optional[str] = None
-    contract_amount: Optional[str] = None
-    down_payment_final: Optional[str] = None
-    commission_amount: Optional[str] = None
-    commission_paid: bool = False
-    commission_due_date: Optional[str] = None
-    employment_type: Optional[str] = None
-    employment_company_name: Optional[str] = None
-    employment_time_years: Optional[int] = None
-    employment_time_months: Optional[int] = None
-    income_frequency: Optional[str] = None
-    net_income_amount: Optional[str] = None
+    # Collaborator
     collaborator_id: Optional[str] = None
     collaborator_name: Optional[str] = None
-    collaborator_commission: Optional[str] = None
-    collaborator_paid: bool = False
+    # Record status
+    record_status: Optional[str] = None
+    # Commission fields (admin only)
+    commission_percentage: Optional[float] = None
+    commission_value: Optional[float] = None
+    commission_locked: Optional[bool] = False
+    # Legacy fields
+    dl: Optional[bool] = False
+    checks: Optional[bool] = False
+    down_payment: Optional[str] = None
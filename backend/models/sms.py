@@ -0,0 +1,8 @@
+"""SMS log models"""
+from pydantic import BaseModel
+
+class SMSLogCreate(BaseModel):
+    client_id: str
+    phone: str
+    message_type: str  # documents, appointment, reminder
+    status: str = "pending"
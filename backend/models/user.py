@@ -1,9 +1,9 @@
 """User models for authentication and user management"""
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 class UserCreate(BaseModel):
-    email: str
+    email: EmailStr
     password: str
     name: str
     phone: Optional[str] = None
@@ -17,14 +17,14 @@ class UserRoleUpdate(BaseModel):
     role: str
 
 class UserLogin(BaseModel):
-    email: str
+    email: str  # Can be email or username
     password: str
 
 class UserResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
     email: str
-    name: Optional[str] = None
+    name: str
     role: str
     phone: Optional[str] = None
     created_at: str
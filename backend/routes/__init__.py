@@ -1,6 +1,12 @@
 # API Routes Reference
 # This file documents all API endpoints in the DealerCRM API
-# For refactoring purposes - routes are still defined in server.py
+#
+# Router modules (each exposes `router`, included by server.py):
+#   routes/auth.py          - /api/auth/*, /api/users/*
+#   routes/config_lists.py  - /api/config-lists/*, /api/admin/init-config-lists
+#   routes/metrics.py       - /metrics, /api/admin/slow-queries
+# Everything else is still defined in server.py. Router modules import the
+# database from database.py and settings from config.py only, never from server.py.
 
 """
 AUTHENTICATION ROUTES (/api/auth)
@@ -102,5 +108,3 @@ GET /api/public/appointments/{appointment_id} - Get appointment details (public)
 PUT /api/public/appointments/{appointment_id} - Update appointment (public)
 POST /api/public/upload-documents/{client_id} - Upload documents (public)
 """
-
-# Note: Full refactoring to separate route files is planned for future iteration
@@ -0,0 +1,116 @@
+"""Authentication and user management routes"""
+import uuid
+from datetime import datetime, timezone
+from typing import List
+from fastapi import APIRouter, HTTPException, Depends
+from auth import hash_password, verify_password, create_token, get_current_user
+from database import db
+from models import UserCreate, UserActivate, UserRoleUpdate, UserLogin, UserResponse
+
+router = APIRouter(prefix="/api")
+
+# ==================== AUTH ROUTES ====================
+
+@router.post("/auth/register", response_model=dict)
+async def register(user: UserCreate):
+    existing = await db.users.find_one({"email": user.email})
+    if existing:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
+    user_doc = {
+        "id": str(uuid.uuid4()),
+        "email": user.email,
+        "password": hash_password(user.password),
+        "name": user.name,
+        "role": "telemarketer",  # All new users are telemarketer by default (previously salesperson)
+        "phone": user.phone,
+        "is_active": False,  # Users must be activated by admin
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    await db.users.insert_one(user_doc)
+    
+    # Return success but no token - user needs admin activation
+    return {"message": "Registration successful. Please wait for admin approval.", "user": {k: v for k, v in user_doc.items() if k != "password" and k != "_id"}}
+
+@router.post("/auth/login", response_model=dict)
+async def login(credentials: UserLogin):
+    user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
+    if not user or not verify_password(credentials.password, user["password"]):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    # Check if user is active (admin accounts are always active)
+    if not user.get("is_active", False) and user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Account not activated. Please wait for admin approval.")
+    
+    token = create_token(user["id"], user["email"], user["role"])
+    return {"token": token, "user": {k: v for k, v in user.items() if k != "password"}}
+
+@router.get("/auth/me", response_model=UserResponse)
+async def get_me(current_user: dict = Depends(get_current_user)):
+    return current_user
+
+# ==================== USERS ROUTES ====================
+
+@router.get("/users", response_model=List[dict])
+async def get_users(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
+    return users
+
+@router.put("/users/activate")
+async def activate_user(data: UserActivate, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await db.users.update_one(
+        {"id": data.user_id},
+        {"$set": {"is_active": data.is_active}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"message": f"User {'activated' if data.is_active else 'deactivated'} successfully"}
+
+@router.put("/users/role")
+async def update_user_role(data: UserRoleUpdate, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    # Valid roles: admin, bdc_manager, telemarketer (previously salesperson)
+    valid_roles = ["admin", "bdc_manager", "telemarketer", "salesperson"]  # Keep salesperson for backwards compatibility
+    if data.role not in valid_roles:
+        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
+    
+    result = await db.users.update_one(
+        {"id": data.user_id},
+        {"$set": {"role": data.role}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"message": f"User role updated to {data.role}"}
+
+@router.put("/users/{user_id}/email")
+async def update_user_email(user_id: str, data: dict, current_user: dict = Depends(get_current_user)):
+    """Update user email - Admin only"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    new_email = data.get("email")
+    if not new_email:
+        raise HTTPException(status_code=400, detail="Email is required")
+    
+    # Check if email already exists
+    existing = await db.users.find_one({"email": new_email, "id": {"$ne": user_id}})
+    if existing:
+        raise HTTPException(status_code=400, detail="Email already in use")
+    
+    result = await db.users.update_one(
+        {"id": user_id},
+        {"$set": {"email": new_email}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"message": f"Email updated to {new_email}"}
@@ -0,0 +1,232 @@
+"""Configurable lists (banks, dealers, cars, ID/POI/POR types) used by form dropdowns"""
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from auth import get_current_user
+from config import logger
+from database import db, reference_cache
+from models import ConfigListItem, ConfigListItemResponse
+from services.json_response import ModelRows
+from services.reference_cache import cached_json_response
+
+router = APIRouter(prefix="/api")
+
+CONFIG_LIST_CACHE_PREFIX = "config_lists:"
+config_list_rows = ModelRows(ConfigListItemResponse)
+
+async def load_config_list(category: str) -> List[dict]:
+    items = await db.config_lists.find({"category": category}, {"_id": 0}).to_list(1000)
+    
+    # Normalize items - ensure 'name' field exists for frontend compatibility
+    normalized_items = []
+    for item in items:
+        if 'value' in item and 'name' not in item:
+            item['name'] = item['value']
+        normalized_items.append(item)
+    
+    # Sort by name/value
+    normalized_items.sort(key=lambda x: x.get('name') or x.get('value') or '')
+    
+    return config_list_rows(normalized_items)
+
+async def cached_config_list(category: str):
+    """Cache entry for one category; its value is the list GET /config-lists/{category} returns"""
+    return await reference_cache.get(CONFIG_LIST_CACHE_PREFIX + category, lambda: load_config_list(category))
+
+async def get_dealer_address(dealer_name: str) -> Optional[str]:
+    """Address of a dealer by name, from the cached dealer list"""
+    for dealer in (await cached_config_list("dealer")).value:
+        if dealer.get("name") == dealer_name:
+            return dealer.get("address")
+    return None
+
+def invalidate_config_lists():
+    reference_cache.invalidate_prefix(CONFIG_LIST_CACHE_PREFIX)
+
+@router.get("/config-lists/{category}", response_model=List[ConfigListItemResponse])
+async def get_config_list(category: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Get all items in a configurable list (cached; supports If-None-Match)"""
+    valid_categories = ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']
+    if category not in valid_categories:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}")
+    
+    return cached_json_response(request, await cached_config_list(category))
+
+@router.post("/config-lists", response_model=ConfigListItemResponse)
+async def create_config_list_item(item: ConfigListItem, current_user: dict = Depends(get_current_user)):
+    """Add a new item to a configurable list (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    valid_categories = ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']
+    if item.category not in valid_categories:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}")
+    
+    # Check for duplicate
+    existing = await db.config_lists.find_one({"name": {"$regex": f"^{item.name}$", "$options": "i"}, "category": item.category})
+    if existing:
+        raise HTTPException(status_code=400, detail=f"{item.name} already exists in {item.category} list")
+    
+    item_doc = {
+        "id": str(uuid.uuid4()),
+        "name": item.name,
+        "category": item.category,
+        "address": item.address if item.category == "dealer" else None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_by": current_user["id"]
+    }
+    await db.config_lists.insert_one(item_doc)
+    invalidate_config_lists()
+    del item_doc["_id"]
+    return item_doc
+
+@router.delete("/config-lists/{item_id}")
+async def delete_config_list_item(item_id: str, current_user: dict = Depends(get_current_user)):
+    """Delete an item from a configurable list (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await db.config_lists.delete_one({"id": item_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_config_lists()
+    return {"message": "Item deleted"}
+
+@router.put("/config-lists/{item_id}")
+async def update_config_list_item(item_id: str, item: ConfigListItem, current_user: dict = Depends(get_current_user)):
+    """Update an item in a configurable list (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    update_data = {"name": item.name}
+    if item.category == "dealer" and item.address:
+        update_data["address"] = item.address
+    
+    result = await db.config_lists.update_one(
+        {"id": item_id},
+        {"$set": update_data}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_config_lists()
+    
+    updated = await db.config_lists.find_one({"id": item_id}, {"_id": 0})
+    return updated
+
+# ==================== FORCE INITIALIZE CONFIG LISTS (Admin) ====================
+
+@router.post("/admin/init-config-lists")
+async def force_init_config_lists(current_user: dict = Depends(get_current_user)):
+    """Force initialize default config lists - Admin only"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    await initialize_default_config_lists()
+    
+    # Return counts
+    counts = {}
+    for category in ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']:
+        counts[category] = await db.config_lists.count_documents({"category": category})
+    
+    return {"message": "Config lists initialized", "counts": counts}
+
+async def initialize_default_config_lists():
+    """Initialize default banks, dealers, cars, ID types, POI types, and POR types if lists are empty"""
+    now = datetime.now(timezone.utc).isoformat()
+    
+    # Default US Banks
+    default_banks = [
+        "Chase", "Bank of America", "Wells Fargo", "Citibank", "US Bank",
+        "Capital One", "PNC Bank", "TD Bank", "Truist", "Ally Bank",
+        "Discover Bank", "Fifth Third Bank", "KeyBank", "Huntington Bank",
+        "Santander", "BMO Harris", "Regions Bank", "Citizens Bank", "M&T Bank",
+        "First Republic", "USAA", "Navy Federal", "Charles Schwab", "Goldman Sachs",
+        "American Express", "Synchrony Bank", "Marcus by Goldman Sachs", "SoFi",
+        "Chime", "Varo Bank", "Current", "Simple", "Aspiration"
+    ]
+    
+    # Default Dealers with addresses
+    default_dealers = [
+        {"name": "Downey", "address": "7444 Florence Ave, Downey, CA 90240"},
+        {"name": "Fullerton", "address": "1100 S Harbor Blvd, Fullerton, CA 92832"},
+        {"name": "Hollywood", "address": "6200 Hollywood Blvd, Los Angeles, CA 90028"},
+        {"name": "Long Beach", "address": "1500 E Anaheim St, Long Beach, CA 90813"}
+    ]
+    
+    # Default Car Makes/Models
+    default_cars = [
+        "Silverado", "Ram 1500", "F-150", "Tacoma", "Tundra", "Sierra",
+        "Colorado", "Ranger", "Frontier", "Titan", "Gladiator",
+        "Camry", "Accord", "Civic", "Corolla", "Altima", "Sentra",
+        "Malibu", "Impala", "Fusion", "Sonata", "Elantra", "Optima",
+        "CR-V", "RAV4", "Rogue", "Escape", "Explorer", "Highlander",
+        "Pilot", "4Runner", "Pathfinder", "Tahoe", "Suburban", "Expedition",
+        "Wrangler", "Grand Cherokee", "Cherokee", "Compass", "Durango",
+        "Mustang", "Camaro", "Challenger", "Charger", "Corvette",
+        "Model 3", "Model Y", "Model S", "Model X", "Mach-E",
+        "BMW 3 Series", "BMW 5 Series", "Mercedes C-Class", "Mercedes E-Class",
+        "Audi A4", "Audi Q5", "Lexus ES", "Lexus RX", "Acura TLX", "Acura MDX"
+    ]
+    
+    # Default ID Types (for identification documents) - in Spanish
+    default_id_types = [
+        "Licencia de Conducir", "Pasaporte", "Pasaporte USA", "Matrícula", 
+        "Credencial de Elector", "ID de Residente", "Otro"
+    ]
+    
+    # Default POI Types (Proof of Income)
+    default_poi_types = [
+        "Cash", "Company Check", "Personal Check", "Talon de Cheque"
+    ]
+    
+    # Default POR Types (Proof of Residence)
+    default_por_types = [
+        "Agua", "Luz", "Gas", "Internet", "TV Cable", "Telefono", "Car Insurance", "Bank Statements"
+    ]
+    
+    # Initialize dealers with addresses (special handling)
+    dealer_count = await db.config_lists.count_documents({"category": "dealer"})
+    if dealer_count == 0:
+        dealer_docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": dealer["name"],
+                "address": dealer["address"],
+                "category": "dealer",
+                "created_at": now,
+                "created_by": "system"
+            }
+            for dealer in default_dealers
+        ]
+        if dealer_docs:
+            await db.config_lists.insert_many(dealer_docs)
+            logger.info(f"Initialized {len(dealer_docs)} default dealers with addresses")
+    
+    # Check if other lists are empty and populate
+    simple_categories = [
+        ('bank', default_banks), 
+        ('car', default_cars),
+        ('id_type', default_id_types),
+        ('poi_type', default_poi_types),
+        ('por_type', default_por_types)
+    ]
+    
+    for category, items in simple_categories:
+        count = await db.config_lists.count_documents({"category": category})
+        if count == 0:
+            docs = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "name": item,
+                    "category": category,
+                    "created_at": now,
+                    "created_by": "system"
+                }
+                for item in items
+            ]
+            if docs:
+                await db.config_lists.insert_many(docs)
+                logger.info(f"Initialized {len(docs)} default {category}s")
+    
+    invalidate_config_lists()
@@ -0,0 +1,41 @@
+"""Observability endpoints: Prometheus metrics and the MongoDB query-shape profile"""
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import Response
+from auth import get_current_user
+from config import METRICS_TOKEN, SLOW_QUERY_MS
+from database import metrics_registry, query_profiler
+
+# Served at the root (/metrics) where scrapers expect it
+router = APIRouter()
+api_router = APIRouter(prefix="/api")
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of the request and MongoDB metrics"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total", pattern="^(total|p99|max|count)$"),
+    reset: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Top MongoDB query shapes since startup (or the last reset) by total time,
+    p99, max or count, with the routes issuing them, plus the most recent
+    commands over SLOW_QUERY_MS. Per process. (Admin only)
+    """
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "shapes": query_profiler.top(limit, sort),
+        "recent_slow": query_profiler.recent_slow()
+    }
+    if reset:
+        query_profiler.reset()
+    return result
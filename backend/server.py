@@ -1,81 +1,67 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from dotenv import load_dotenv
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request, Query
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
 import os
-import logging
 import shutil
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
-import jwt
-import bcrypt
-from twilio.rest import Client as TwilioClient
-import pandas as pd
 import io
 import re
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
 import asyncio
-import resend
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 import json as json_lib
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-# JWT Settings
-JWT_SECRET = os.environ.get('JWT_SECRET', 'dealercrm-secret-key-2024')
-JWT_ALGORITHM = "HS256"
-JWT_EXPIRATION_HOURS = 24
-
-# Twilio Configuration
-TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
-TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
-TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
-TWILIO_MESSAGING_SERVICE_SID = os.environ.get('TWILIO_MESSAGING_SERVICE_SID')
-
-# Resend Email Configuration (optional - can use SMTP instead)
-RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
-SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
-if RESEND_API_KEY:
-    resend.api_key = RESEND_API_KEY
-
-# SMTP Email Configuration (FREE - Gmail, Outlook, etc.)
-SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
-SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
-SMTP_USER = os.environ.get('SMTP_USER', '')  # Your email
-SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')  # App password
-SMTP_FROM_NAME = os.environ.get('SMTP_FROM_NAME', 'DealerCRM')
-
-# Company Logo URL for emails and public forms
-COMPANY_LOGO_URL = "https://carplusautosalesgroup.com/img/carplus.png"
-COMPANY_NAME = "CARPLUS AUTOSALE"
-COMPANY_TAGLINE = "Friendly Brokerage"
-
-# Initialize Twilio client
-twilio_client = None
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    try:
-        twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-    except Exception as e:
-        print(f"Warning: Could not initialize Twilio client: {e}")
+import time
+from config import ROOT_DIR, COMPANY_LOGO_URL, COMPANY_NAME, COMPANY_TAGLINE, logger
+from database import client, db, analytics_db, request_metrics, reference_cache
+from auth import hash_password, get_current_user, get_user_from_token
+from models import (
+    ClientCreate, ClientResponse, UserRecordCreate, UserRecordResponse,
+    AppointmentCreate, AppointmentUpdate, AppointmentResponse,
+    CoSignerRelationCreate, CoSignerRelationResponse,
+    PreQualifySubmission, PreQualifyResponse
+)
+from services.metrics import RequestMetricsMiddleware
+from services.sms import get_twilio_client, normalize_phone, send_sms_twilio
+from services.email import send_email_notification
+from services.json_response import FastJSONResponse, ModelRows
+from services.reference_cache import cached_json_response
+from services.projections import ListView, CLIENT_SUMMARY, USER_RECORD_SUMMARY, PREQUALIFY_SUMMARY
+from routes import auth as auth_routes, config_lists as config_list_routes, metrics as metrics_routes
+from routes.config_lists import initialize_default_config_lists, cached_config_list, get_dealer_address, invalidate_config_lists
+
+# Heavy optional libraries (twilio, resend, pandas, apscheduler) are imported on
+# first use so workers that never send SMS or read spreadsheets don't pay for them.
+# PRELOAD_HEAVY_IMPORTS=true imports them in the background right after startup instead.
+PRELOAD_HEAVY_IMPORTS = os.environ.get('PRELOAD_HEAVY_IMPORTS', 'false').lower() == 'true'
+# Only one worker per deployment needs to run the scheduled jobs
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
+
+def read_spreadsheet(contents: bytes, filename: str):
+    """Load an uploaded .csv/.xlsx/.xls into a DataFrame (pandas is imported here, on first use)"""
+    import pandas as pd
+    if filename.lower().endswith('.csv'):
+        return pd.read_csv(io.BytesIO(contents))
+    return pd.read_excel(io.BytesIO(contents))
+
+def preload_heavy_imports():
+    """Warm-up: import the lazily loaded libraries so the first request using them isn't slow"""
+    started = time.perf_counter()
+    for module in ("twilio.rest", "resend", "pandas"):
+        try:
+            __import__(module)
+        except ImportError as e:
+            logger.warning(f"Preloading {module} failed: {e}")
+    logger.info(f"Preloaded heavy imports in {time.perf_counter() - started:.2f}s")
 
 # Create the main app
 app = FastAPI(title="DealerCRM Pro API")
 api_router = APIRouter(prefix="/api")
-security = HTTPBearer()
+
+# Per-route latency and MongoDB round-trip counts; responses carry X-DB-Calls to make N+1 loops visible
+app.add_middleware(RequestMetricsMiddleware, metrics=request_metrics)
 
 # Mount static files for uploads
 from fastapi.staticfiles import StaticFiles
@@ -83,13 +69,77 @@ uploads_path = Path(__file__).parent / "uploads"
 uploads_path.mkdir(exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=str(uploads_path)), name="uploads")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+# ISO-string timestamps are dual-written with "<field>_dt" BSON dates; range queries
+# switch to the mirrors once tools/backfill_datetimes.py has run (checked at startup)
+from services.datetimes import with_datetime_mirrors, dt_field, mirrors_ready, DATETIME_FIELDS
+datetime_mirrors_ready = False
+
+# Client search matches prefixes of indexed name/phone tokens once every client
+# has them (backfilled at startup); until then it falls back to regex scans
+from services.client_search import (
+    with_search_tokens, parse_search_query, search_filter, rank_by_relevance, ranked_search_pipeline,
+    search_index_ready, backfill_search_tokens, SEARCH_FIELD
+)
+client_search_ready = False
+
+# Typeahead for the client search box: in-memory prefix index, loaded at startup,
+# refreshed per client on writes and reloaded periodically to pick up other workers' writes
+from services.client_suggest import ClientSuggestIndex
+client_suggest_index = ClientSuggestIndex()
+CLIENT_SUGGEST_RELOAD_MINUTES = int(os.environ.get('CLIENT_SUGGEST_RELOAD_MINUTES', '15'))
+
+# ==================== REAL-TIME EVENTS ====================
+
+from services.events import EventBus, ChangeStreamFeed, format_sse, user_channel, inbox_channels, sms_event
+from services.unread_counters import UnreadCounters, notifications_key, inbox_key, INBOX_TOTAL
+
+# "memory": writers publish directly (single worker process)
+# "change_streams": events come from MongoDB change streams (multiple workers, needs a replica set)
+EVENT_BUS_BACKEND = os.environ.get('EVENT_BUS_BACKEND', 'memory')
+event_bus = EventBus(local_publish=EVENT_BUS_BACKEND != 'change_streams')
+event_feed = ChangeStreamFeed(db, event_bus) if EVENT_BUS_BACKEND == 'change_streams' else None
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '25'))
+
+# Badge counts (unread notifications per user, unread inbound SMS per client)
+unread_counters = UnreadCounters(db)
+
+async def insert_notifications(*notifications: dict):
+    """Store in-app notifications and push them to the recipients' open streams"""
+    if not notifications:
+        return
+    if len(notifications) == 1:
+        await db.notifications.insert_one(notifications[0])
+    else:
+        await db.notifications.insert_many(list(notifications))
+    
+    deltas = {}
+    for notification in notifications:
+        if not notification.get("is_read"):
+            key = notifications_key(notification["user_id"])
+            deltas[key] = deltas.get(key, 0) + 1
+    await unread_counters.increment(deltas)
+    
+    for notification in notifications:
+        event_bus.publish(
+            user_channel(notification["user_id"]),
+            "notification",
+            {k: v for k, v in notification.items() if k != "_id"}
+        )
+
+@app.on_event("startup")
+async def start_event_feed():
+    if event_feed:
+        event_feed.start()
+
+@app.on_event("shutdown")
+async def stop_event_feed():
+    if event_feed:
+        await event_feed.stop()
 
 # ==================== SCHEDULER ====================
 
-scheduler = AsyncIOScheduler()
+# Created in startup_event (apscheduler is only imported when SCHEDULER_ENABLED)
+scheduler = None
 
 async def send_marketing_sms_job():
     """
@@ -98,7 +148,7 @@ async def send_marketing_sms_job():
     """
     logger.info("Running scheduled marketing SMS job...")
     
-    if not twilio_client:
+    if not get_twilio_client():
         logger.warning("Twilio client not configured - skipping SMS job")
         return
     
@@ -119,7 +169,7 @@ async def send_marketing_sms_job():
             {
                 "sms_sent": True,
                 "sms_count": {"$lt": 5},
-                "last_sms_sent": {"$lt": (now - timedelta(days=7)).isoformat()}
+                (dt_field("last_sms_sent") if datetime_mirrors_ready else "last_sms_sent"): {"$lt": ts_value(now - timedelta(days=7))}
             }
         ]
     }, {"_id": 0}).to_list(100)
@@ -135,7 +185,7 @@ async def send_marketing_sms_job():
             if contact.get("sms_count", 0) > 0:
                 template_key = "marketing_reminder"
             
-            template = await db.sms_templates.find_one({"template_key": template_key}, {"_id": 0})
+            template = await find_sms_template(template_key)
             if not template:
                 logger.warning(f"Template {template_key} not found")
                 continue
@@ -160,12 +210,12 @@ async def send_marketing_sms_job():
             # Update contact
             await db.imported_contacts.update_one(
                 {"id": contact["id"]},
-                {"$set": {
+                {"$set": with_datetime_mirrors({
                     "sms_sent": True,
                     "sms_count": contact.get("sms_count", 0) + 1,
                     "last_sms_sent": now.isoformat(),
                     "status": "contacted"
-                }}
+                })}
             )
             
             # Log SMS
@@ -181,7 +231,7 @@ async def send_marketing_sms_job():
                 "sent_at": now.isoformat(),
                 "sent_by": "scheduler"
             }
-            await db.sms_logs.insert_one(sms_log)
+            await log_outbound_sms(sms_log)
             
             if result["success"]:
                 logger.info(f"Marketing SMS sent to {contact['phone_formatted']}")
@@ -211,14 +261,16 @@ async def check_comment_reminders_job():
     one_day_from_now = (now + timedelta(days=1)).isoformat()
     
     # Find client comments with reminders that are due within the next 24 hours
+    reminder_field = dt_field("reminder_at") if datetime_mirrors_ready else "reminder_at"
+    reminder_cutoff = now + timedelta(days=1) if datetime_mirrors_ready else one_day_from_now
     due_client_reminders = await db.client_comments.find({
-        "reminder_at": {"$ne": None, "$lte": one_day_from_now},
+        reminder_field: {"$ne": None, "$lte": reminder_cutoff},
         "reminder_sent": {"$ne": True}
     }, {"_id": 0}).to_list(100)
     
     # Find record comments with reminders that are due within the next 24 hours
     due_record_reminders = await db.record_comments.find({
-        "reminder_at": {"$ne": None, "$lte": one_day_from_now},
+        reminder_field: {"$ne": None, "$lte": reminder_cutoff},
         "reminder_sent": {"$ne": True}
     }, {"_id": 0}).to_list(100)
     
@@ -245,7 +297,7 @@ async def check_comment_reminders_job():
                 "is_read": False,
                 "created_at": now_iso
             }
-            await db.notifications.insert_one(notif_doc)
+            await insert_notifications(notif_doc)
             
             await db.client_comments.update_one(
                 {"id": comment["id"]},
@@ -288,7 +340,7 @@ async def check_comment_reminders_job():
                 "is_read": False,
                 "created_at": now_iso
             }
-            await db.notifications.insert_one(notif_doc)
+            await insert_notifications(notif_doc)
             
             await db.record_comments.update_one(
                 {"id": comment["id"]},
@@ -342,7 +394,7 @@ async def check_appointment_reminders_job():
                 "is_read": False,
                 "created_at": now.isoformat()
             }
-            await db.notifications.insert_one(notif_doc)
+            await insert_notifications(notif_doc)
             
             # Mark appointment as reminded
             await db.appointments.update_one(
@@ -356,9 +408,93 @@ async def check_appointment_reminders_job():
     
     logger.info("Appointment reminders job completed")
 
+async def collect_document_blobs_job():
+    """
+    Scheduled job to delete document blobs that no client references anymore.
+    Runs daily at 3:00 AM Pacific and also repairs drifted reference counts.
+    """
+    logger.info("Running document blob garbage collection...")
+    try:
+        await document_blobs.collect_garbage()
+    except Exception as e:
+        logger.error(f"Document blob garbage collection failed: {e}")
+
+# Retention (days; 0 keeps rows forever). Old rows are moved to gzipped NDJSON under ARCHIVE_DIR.
+from services.retention import Archiver, RetentionPolicy, ensure_ttl_index
+ARCHIVE_DIR = Path(os.environ.get('ARCHIVE_DIR', str(ROOT_DIR / "archive")))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+SMS_LOG_RETENTION_DAYS = int(os.environ.get('SMS_LOG_RETENTION_DAYS', '365'))
+EMAIL_LOG_RETENTION_DAYS = int(os.environ.get('EMAIL_LOG_RETENTION_DAYS', '365'))
+SMS_CONVERSATION_RETENTION_DAYS = int(os.environ.get('SMS_CONVERSATION_RETENTION_DAYS', '0'))
+# Expired public links are deleted by a TTL index this many days after expires_at.
+# Until then the public pages still answer "link expired" rather than "not found".
+PUBLIC_LINK_GRACE_DAYS = int(os.environ.get('PUBLIC_LINK_GRACE_DAYS', '30'))
+
+archiver = Archiver(db, ARCHIVE_DIR, [
+    # Unread notifications stay so the badge counters remain exact
+    RetentionPolicy("notifications", "created_at", NOTIFICATION_RETENTION_DAYS, {"is_read": True}),
+    RetentionPolicy("sms_logs", "sent_at", SMS_LOG_RETENTION_DAYS),
+    RetentionPolicy("email_logs", "sent_at", EMAIL_LOG_RETENTION_DAYS),
+    RetentionPolicy("sms_conversations", "timestamp", SMS_CONVERSATION_RETENTION_DAYS, {"is_read": {"$ne": False}}),
+])
+
+async def archive_old_records_job():
+    """
+    Scheduled job to archive old notifications and logs.
+    Runs daily at 3:30 AM Pacific.
+    """
+    logger.info("Running retention/archive job...")
+    try:
+        await archiver.run()
+    except Exception as e:
+        logger.error(f"Retention/archive job failed: {e}")
+
+async def load_client_suggest_index():
+    """(Re)build the in-memory client typeahead index from MongoDB"""
+    try:
+        await client_suggest_index.load(db)
+    except Exception as e:
+        logger.error(f"Error loading client suggest index: {e}")
+
+async def client_suggest_reload_loop():
+    """
+    Reload the client typeahead index every CLIENT_SUGGEST_RELOAD_MINUTES (covers
+    writes made by other workers). Runs on every worker, not on the scheduler:
+    each worker serves /clients/suggest from its own copy of the index.
+    """
+    while True:
+        await asyncio.sleep(CLIENT_SUGGEST_RELOAD_MINUTES * 60)
+        await load_client_suggest_index()
+
+client_suggest_reload_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_client_suggest_reload():
+    global client_suggest_reload_task
+    client_suggest_reload_task = asyncio.create_task(client_suggest_reload_loop())
+
+@app.on_event("shutdown")
+async def stop_client_suggest_reload():
+    if client_suggest_reload_task is not None:
+        client_suggest_reload_task.cancel()
+        await asyncio.gather(client_suggest_reload_task, return_exceptions=True)
+
 @app.on_event("startup")
 async def startup_event():
     """Start the scheduler when the app starts"""
+    if PRELOAD_HEAVY_IMPORTS:
+        asyncio.get_running_loop().run_in_executor(None, preload_heavy_imports)
+    
+    if not SCHEDULER_ENABLED:
+        logger.info("Scheduler disabled on this worker (SCHEDULER_ENABLED=false)")
+        return
+    
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+    global scheduler
+    scheduler = AsyncIOScheduler()
+    
     # Schedule the marketing SMS job to run at 11:00 AM every day (US Eastern time)
     scheduler.add_job(
         send_marketing_sms_job,
@@ -368,7 +504,6 @@ async def startup_event():
     )
     
     # Schedule comment reminders job to run every 5 minutes
-    from apscheduler.triggers.interval import IntervalTrigger
     scheduler.add_job(
         check_comment_reminders_job,
         IntervalTrigger(minutes=5),
@@ -384,473 +519,48 @@ async def startup_event():
         replace_existing=True
     )
     
-    scheduler.start()
-    logger.info("Scheduler started - Marketing SMS at 11:00 AM, Comment reminders every 5 min, Appointment reminders at 9:00 AM Pacific")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Stop the scheduler when the app stops"""
-    scheduler.shutdown()
-    logger.info("SMS Scheduler stopped")
-
-# ==================== MODELS ====================
-
-class UserCreate(BaseModel):
-    email: EmailStr
-    password: str
-    name: str
-    phone: Optional[str] = None
-
-class UserActivate(BaseModel):
-    user_id: str
-    is_active: bool
-
-class UserRoleUpdate(BaseModel):
-    user_id: str
-    role: str
-
-class UserLogin(BaseModel):
-    email: str  # Can be email or username
-    password: str
-
-class UserResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    email: str
-    name: str
-    role: str
-    phone: Optional[str] = None
-    created_at: str
-
-class ClientCreate(BaseModel):
-    first_name: str
-    last_name: str
-    phone: str
-    email: Optional[str] = None
-    address: Optional[str] = None
-    apartment: Optional[str] = None
-    # Date of birth
-    date_of_birth: Optional[str] = None
-    # ID fields (admin only for id_number)
-    id_type: Optional[str] = None  # Licencia, Pasaporte, Matrícula Consular, etc.
-    id_number: Optional[str] = None  # ID/License number (admin only)
-    # SSN/ITIN fields
-    ssn_type: Optional[str] = None  # SSN, ITIN, Ninguno
-    ssn: Optional[str] = None  # Last 4 digits (admin only)
-    # Time at address (accept str or int)
-    time_at_address_years: Optional[Any] = None
-    time_at_address_months: Optional[Any] = None
-    # Housing type: Dueño, Renta, Vivo con familiares
-    housing_type: Optional[str] = None
-    rent_amount: Optional[str] = None  # Only when housing_type is "Renta"
-
-class ClientResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    first_name: str
-    last_name: str
-    phone: str
-    email: Optional[str] = None
-    address: Optional[str] = None
-    apartment: Optional[str] = None
-    # Date of birth
-    date_of_birth: Optional[str] = None
-    # ID fields (admin only for id_number)
-    id_type: Optional[str] = None
-    id_number: Optional[str] = None  # Admin only
-    # SSN/ITIN fields
-    ssn_type: Optional[str] = None
-    ssn: Optional[str] = None  # Admin only
-    # Time at address (can be int or str)
-    time_at_address_years: Optional[Any] = None
-    time_at_address_months: Optional[Any] = None
-    # Housing type
-    housing_type: Optional[str] = None
-    rent_amount: Optional[str] = None
-    id_uploaded: bool = False
-    income_proof_uploaded: bool = False
-    residence_proof_uploaded: bool = False
-    id_file_url: Optional[str] = None
-    income_proof_file_url: Optional[str] = None
-    residence_proof_file_url: Optional[str] = None
-    last_record_date: Optional[str] = None  # Date of last record created (not last_contact)
-    created_at: str
-    created_by: str
-    is_deleted: bool = False
-
-class UserRecordCreate(BaseModel):
-    client_id: str
-    # ID/DL fields (renamed from dl to id_type)
-    has_id: bool = False
-    id_type: Optional[str] = None  # DL, Passport, Matricula, Votacion ID, US Passport, Resident ID, Other
-    # POI (Proof of Income) - renamed from checks
-    has_poi: bool = False
-    poi_type: Optional[str] = None  # Cash, Company Check, Personal Check, Talon de Cheque
-    # SSN
-    ssn: bool = False
-    # ITIN
-    itin: bool = False
-    # Employment type: Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
-    self_employed: bool = False  # Legacy field
-    employment_type: Optional[str] = None  # Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
-    employment_company_name: Optional[str] = None  # Company name when Company or Self employed
-    employment_time_years: Optional[Any] = None  # Years at employment (accepts str or int)
-    employment_time_months: Optional[Any] = None  # Months at employment (accepts str or int)
-    # Income fields
-    income_frequency: Optional[str] = None  # Semanal, Cada dos semanas, Dos veces al mes, Mensual
-    net_income_amount: Optional[str] = None  # Net income amount
-    # POR (Proof of Residence) - new
-    has_por: bool = False
-    por_types: Optional[List[str]] = None  # Agua, Luz, Gas, Internet, etc. (multiple selection)
-    # Bank info with deposit type
-    bank: Optional[str] = None
-    bank_deposit_type: Optional[str] = None  # Deposito Directo, No deposito directo
-    # Other fields
-    auto: Optional[str] = None
-    credit: Optional[str] = None
-    # Auto Loan fields - Paid, Late, On Time (with bank and amount for On Time)
-    first_time_buyer: bool = False  # New field
-    auto_loan: Optional[str] = None  # Legacy field
-    auto_loan_status: Optional[str] = None  # Paid, Late, On Time
-    auto_loan_bank: Optional[str] = None  # Bank name when On Time
-    auto_loan_amount: Optional[str] = None  # Amount when On Time
-    # Down Payment with type
-    down_payment_type: Optional[str] = None  # Cash, Tarjeta, Trade
-    down_payment_types: Optional[List[str]] = None  # Multiple selection
-    down_payment_cash: Optional[str] = None
-    down_payment_card: Optional[str] = None
-    # Trade-in vehicle info
-    trade_make: Optional[str] = None
-    trade_model: Optional[str] = None
-    trade_year: Optional[str] = None
-    trade_title: Optional[str] = None  # Clean Title, Salvaged
-    trade_miles: Optional[str] = None
-    trade_plate: Optional[str] = None  # CA, Out of State
-    trade_estimated_value: Optional[str] = None
-    # Dealer/Location
-    dealer: Optional[str] = None
-    # Finance status: financiado, lease, no (fixed typo)
-    finance_status: str = "no"  # financiado, lease, no
-    # Vehicle info (only when finance_status is financiado or lease)
-    vehicle_make: Optional[str] = None
-    vehicle_year: Optional[str] = None
-    sale_month: Optional[int] = None
-    sale_day: Optional[int] = None
-    sale_year: Optional[int] = None
-    previous_record_id: Optional[str] = None  # For "New Opportunity" - links to previous record
-    # Collaborator - shared user working on this record
-    collaborator_id: Optional[str] = None
-    collaborator_name: Optional[str] = None
-    # Record completion status: null, completed, no_show
-    record_status: Optional[str] = None
-    # Commission fields (admin only) - only visible when record_status is completed
-    commission_percentage: Optional[float] = None  # 1-100
-    commission_value: Optional[float] = None  # Dollar amount
-    commission_locked: Optional[bool] = False  # When true, record_status cannot be changed by non-admins
-    # Legacy fields for backward compatibility
-    dl: Optional[bool] = None
-    checks: Optional[bool] = None
-    down_payment: Optional[str] = None
-
-class UserRecordResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    client_id: str
-    salesperson_id: Optional[str] = None
-    salesperson_name: Optional[str] = None
-    # ID fields
-    has_id: bool = False
-    id_type: Optional[str] = None
-    # POI fields
-    has_poi: bool = False
-    poi_type: Optional[str] = None
-    # Other checks
-    ssn: bool = False
-    itin: bool = False
-    self_employed: bool = False  # Legacy
-    # Employment fields
-    employment_type: Optional[str] = None  # Company, Retired/workcomp/SSN/SDI, Unemployed, Self employed
-    employment_company_name: Optional[str] = None
-    employment_time_years: Optional[Any] = None
-    employment_time_months: Optional[Any] = None
-    # Income fields
-    income_frequency: Optional[str] = None  # Semanal, Cada dos semanas, Dos veces al mes, Mensual
-    net_income_amount: Optional[str] = None  # Net income amount
-    # POR fields
-    has_por: bool = False
-    por_types: Optional[List[str]] = None
-    # Bank info
-    bank: Optional[str] = None
-    bank_deposit_type: Optional[str] = None
-    direct_deposit_amount: Optional[str] = None
-    # Other fields
-    auto: Optional[str] = None
-    credit: Optional[str] = None
-    # Auto Loan fields - Paid, Late, On Time (with bank and amount for On Time)
-    auto_loan: Optional[str] = None  # Legacy field
-    auto_loan_status: Optional[str] = None  # Paid, Late, On Time
-    auto_loan_bank: Optional[str] = None  # Bank name when On Time
-    auto_loan_amount: Optional[str] = None  # Amount when On Time
-    # Down Payment
-    down_payment_type: Optional[str] = None
-    down_payment_types: Optional[List[str]] = None  # Multiple selection
-    down_payment_cash: Optional[str] = None
-    down_payment_card: Optional[str] = None
-    # Trade-in
-    trade_make: Optional[str] = None
-    trade_model: Optional[str] = None
-    trade_year: Optional[str] = None
-    trade_title: Optional[str] = None
-    trade_miles: Optional[str] = None
-    trade_plate: Optional[str] = None
-    trade_estimated_value: Optional[str] = None
-    # Dealer
-    dealer: Optional[str] = None
-    # Finance status
-    finance_status: str = "no"  # financiado, lease, no
-    # Vehicle info
-    vehicle_make: Optional[str] = None
-    vehicle_year: Optional[str] = None
-    sale_month: Optional[int] = None
-    sale_day: Optional[int] = None
-    sale_year: Optional[int] = None
-    created_at: str
-    is_deleted: bool = False
-    previous_record_id: Optional[str] = None
-    opportunity_number: int = 1
-    # Collaborator
-    collaborator_id: Optional[str] = None
-    collaborator_name: Optional[str] = None
-    # Record status
-    record_status: Optional[str] = None
-    # Commission fields (admin only)
-    commission_percentage: Optional[float] = None
-    commission_value: Optional[float] = None
-    commission_locked: Optional[bool] = False
-    # Legacy fields
-    dl: Optional[bool] = False
-    checks: Optional[bool] = False
-    down_payment: Optional[str] = None
-
-class AppointmentCreate(BaseModel):
-    user_record_id: str
-    client_id: str
-    date: Optional[str] = None
-    time: Optional[str] = None
-    dealer: Optional[str] = None
-    language: str = "en"  # en or es
-    change_time: Optional[str] = None
-
-class AppointmentUpdate(BaseModel):
-    date: Optional[str] = None
-    time: Optional[str] = None
-    dealer: Optional[str] = None
-    language: Optional[str] = None
-    change_time: Optional[str] = None
-
-class AppointmentResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    user_record_id: str
-    client_id: str
-    salesperson_id: str
-    date: Optional[str] = None
-    time: Optional[str] = None
-    dealer: Optional[str] = None
-    language: str = "en"
-    change_time: Optional[str] = None
-    status: str = "sin_configurar"  # agendado, sin_configurar, cambio_hora, tres_semanas, no_show, cumplido
-    link_sent_at: Optional[str] = None
-    reminder_count: int = 0
-    created_at: str
-
-class CoSignerRelationCreate(BaseModel):
-    buyer_client_id: str
-    cosigner_client_id: str
-
-class CoSignerRelationResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    buyer_client_id: str
-    cosigner_client_id: str
-    created_at: str
-
-class SMSLogCreate(BaseModel):
-    client_id: str
-    phone: str
-    message_type: str  # documents, appointment, reminder
-    status: str = "pending"
-
-# ==================== AUTH HELPERS ====================
-
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-
-def create_token(user_id: str, email: str, role: str) -> str:
-    payload = {
-        "user_id": user_id,
-        "email": email,
-        "role": role,
-        "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
-    }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-# ==================== AUTH ROUTES ====================
-
-@api_router.post("/auth/register", response_model=dict)
-async def register(user: UserCreate):
-    existing = await db.users.find_one({"email": user.email})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    user_doc = {
-        "id": str(uuid.uuid4()),
-        "email": user.email,
-        "password": hash_password(user.password),
-        "name": user.name,
-        "role": "telemarketer",  # All new users are telemarketer by default (previously salesperson)
-        "phone": user.phone,
-        "is_active": False,  # Users must be activated by admin
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.users.insert_one(user_doc)
-    
-    # Return success but no token - user needs admin activation
-    return {"message": "Registration successful. Please wait for admin approval.", "user": {k: v for k, v in user_doc.items() if k != "password" and k != "_id"}}
-
-@api_router.post("/auth/login", response_model=dict)
-async def login(credentials: UserLogin):
-    user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user["password"]):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Check if user is active (admin accounts are always active)
-    if not user.get("is_active", False) and user.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Account not activated. Please wait for admin approval.")
-    
-    token = create_token(user["id"], user["email"], user["role"])
-    return {"token": token, "user": {k: v for k, v in user.items() if k != "password"}}
-
-@api_router.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: dict = Depends(get_current_user)):
-    return current_user
-
-# ==================== USERS ROUTES ====================
-
-@api_router.get("/users", response_model=List[dict])
-async def get_users(current_user: dict = Depends(get_current_user)):
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
-    return users
-
-@api_router.put("/users/activate")
-async def activate_user(data: UserActivate, current_user: dict = Depends(get_current_user)):
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    result = await db.users.update_one(
-        {"id": data.user_id},
-        {"$set": {"is_active": data.is_active}}
+    # Schedule document blob garbage collection daily at 3:00 AM Pacific
+    scheduler.add_job(
+        collect_document_blobs_job,
+        CronTrigger(hour=3, minute=0, timezone='America/Los_Angeles'),
+        id='document_blobs_gc_job',
+        replace_existing=True
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="User not found")
     
-    return {"message": f"User {'activated' if data.is_active else 'deactivated'} successfully"}
-
-@api_router.put("/users/role")
-async def update_user_role(data: UserRoleUpdate, current_user: dict = Depends(get_current_user)):
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    # Valid roles: admin, bdc_manager, telemarketer (previously salesperson)
-    valid_roles = ["admin", "bdc_manager", "telemarketer", "salesperson"]  # Keep salesperson for backwards compatibility
-    if data.role not in valid_roles:
-        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
-    
-    result = await db.users.update_one(
-        {"id": data.user_id},
-        {"$set": {"role": data.role}}
+    # Schedule archiving of old notifications/logs daily at 3:30 AM Pacific
+    scheduler.add_job(
+        archive_old_records_job,
+        CronTrigger(hour=3, minute=30, timezone='America/Los_Angeles'),
+        id='archive_old_records_job',
+        replace_existing=True
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="User not found")
     
-    return {"message": f"User role updated to {data.role}"}
+    scheduler.start()
+    logger.info(f"Scheduler started - Marketing SMS at 11:00 AM, Comment reminders every 5 min, Appointment reminders at 9:00 AM, Document GC at 3:00 AM, Archiving at 3:30 AM Pacific")
 
-@api_router.put("/users/{user_id}/email")
-async def update_user_email(user_id: str, data: dict, current_user: dict = Depends(get_current_user)):
-    """Update user email - Admin only"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    new_email = data.get("email")
-    if not new_email:
-        raise HTTPException(status_code=400, detail="Email is required")
-    
-    # Check if email already exists
-    existing = await db.users.find_one({"email": new_email, "id": {"$ne": user_id}})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already in use")
-    
-    result = await db.users.update_one(
-        {"id": user_id},
-        {"$set": {"email": new_email}}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return {"message": f"Email updated to {new_email}"}
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the scheduler when the app stops"""
+    if scheduler is not None:
+        scheduler.shutdown()
+        logger.info("SMS Scheduler stopped")
 
 # ==================== CLIENTS ROUTES ====================
 
-def normalize_phone_number(phone: str) -> str:
+def phone_lookup_key(phone: str) -> Optional[str]:
     """
-    Normalize phone number to E.164 format for US numbers: +1XXXXXXXXXX
-    Accepts various formats: 1234567890, (123) 456-7890, 123-456-7890, +1 123 456 7890, etc.
+    Canonical key for matching a phone number regardless of formatting: its last 10 digits.
+    Stored on clients as `phone_key` (indexed) so inbound SMS can be matched without a regex scan.
     """
     if not phone:
-        return phone
-    
-    # Remove all non-digit characters except +
+        return None
     digits = re.sub(r'[^\d]', '', phone)
-    
-    # Handle different cases
-    if len(digits) == 10:
-        # US number without country code: 2134629914 -> +12134629914
-        return f"+1{digits}"
-    elif len(digits) == 11 and digits.startswith('1'):
-        # US number with country code: 12134629914 -> +12134629914
-        return f"+{digits}"
-    elif len(digits) > 11:
-        # International number or has extra digits
-        if not phone.startswith('+'):
-            return f"+{digits}"
-        return f"+{digits}"
-    else:
-        # Return as-is with + prefix if missing
-        if not phone.startswith('+'):
-            return f"+{digits}"
-        return phone
+    return digits[-10:] or None
 
 @api_router.post("/clients", response_model=dict)
 async def create_client(client: ClientCreate, current_user: dict = Depends(get_current_user)):
     # Normalize phone number to E.164 format
-    normalized_phone = normalize_phone_number(client.phone)
+    normalized_phone = normalize_phone(client.phone)
     
     # Check for existing client by phone (check both original and normalized)
     existing = await db.clients.find_one({
@@ -883,6 +593,7 @@ async def create_client(client: ClientCreate, current_user: dict = Depends(get_c
         "first_name": client.first_name,
         "last_name": client.last_name,
         "phone": normalized_phone,  # Store normalized phone
+        "phone_key": phone_lookup_key(normalized_phone),
         "email": client.email,
         "address": client.address,
         "apartment": client.apartment,
@@ -898,14 +609,45 @@ async def create_client(client: ClientCreate, current_user: dict = Depends(get_c
         "created_by": current_user["id"],
         "is_deleted": False
     }
-    await db.clients.insert_one(client_doc)
+    await db.clients.insert_one(with_datetime_mirrors(with_search_tokens(client_doc)))
     del client_doc["_id"]
+    del client_doc[SEARCH_FIELD]
+    client_suggest_index.upsert(client_doc)
     return client_doc
 
 import re as regex_module
 
+def client_search_query(search: str) -> tuple:
+    """
+    Filter for the `search` box on client lists and the terms used to rank the
+    results. Terms are empty when the regex fallback is used (no ranking).
+    """
+    terms = parse_search_query(search) if client_search_ready else []
+    if terms:
+        return search_filter(terms), terms
+    escaped_search = regex_module.escape(search)
+    search_regex = {"$regex": escaped_search, "$options": "i"}
+    return {"$or": [
+        {"first_name": search_regex},
+        {"last_name": search_regex},
+        {"phone": search_regex}
+    ]}, []
+
+def list_projection(view: ListView, fields: Optional[str]) -> dict:
+    """MongoDB projection for a list endpoint's `fields` parameter (400 on unknown fields)"""
+    try:
+        return view.projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+FIELDS_QUERY_DESCRIPTION = "'summary' for the list columns only, or comma-separated field names; omit for full documents"
+
+# Derived per client: ranking (search tokens) and status color (last contact / created)
+client_list_view = ListView(CLIENT_SUMMARY, required=("created_at", "last_contact", SEARCH_FIELD))
+
 @api_router.get("/clients", response_model=List[dict])
-async def get_clients(include_deleted: bool = False, search: Optional[str] = None, salesperson_id: Optional[str] = None, exclude_sold: bool = False, owner_filter: Optional[str] = None, sort_by: Optional[str] = None, from_notification: bool = False, current_user: dict = Depends(get_current_user)):
+async def get_clients(include_deleted: bool = False, search: Optional[str] = None, salesperson_id: Optional[str] = None, exclude_sold: bool = False, owner_filter: Optional[str] = None, sort_by: Optional[str] = None, from_notification: bool = False, fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION), current_user: dict = Depends(get_current_user)):
+    projection = list_projection(client_list_view, fields)
     # Debug log
     logger.info(f"GET /clients - search={search}, salesperson_id={salesperson_id}, exclude_sold={exclude_sold}, owner_filter={owner_filter}")
     
@@ -971,15 +713,11 @@ async def get_clients(include_deleted: bool = False, search: Optional[str] = Non
     if exclude_sold:
         query["is_sold"] = {"$ne": True}
     
-    # Add search filter for name and phone (escape special regex characters)
+    # Add search filter for name and phone
+    search_terms = []
     if search:
-        escaped_search = regex_module.escape(search)
-        search_regex = {"$regex": escaped_search, "$options": "i"}
-        query["$or"] = [
-            {"first_name": search_regex},
-            {"last_name": search_regex},
-            {"phone": search_regex}
-        ]
+        search_query, search_terms = client_search_query(search)
+        query.update(search_query)
     
     # Debug: log final query
     logger.info(f"GET /clients - FINAL QUERY: {query}")
@@ -994,7 +732,15 @@ async def get_clients(include_deleted: bool = False, search: Optional[str] = Non
         # Default: most recently created first
         sort_field = [("created_at", -1)]
     
-    clients = await db.clients.find(query, {"_id": 0}).sort(sort_field).to_list(1000)
+    if search_terms and not sort_by:
+        # Best matches first, ranked in the query so the 1000-row limit keeps the best ones
+        clients = await db.clients.aggregate(
+            ranked_search_pipeline(query, search_terms, projection, sort_field, 1000)
+        ).to_list(1000)
+    else:
+        clients = await db.clients.find(query, projection).sort(sort_field).to_list(1000)
+        # Explicit sort: keep it, but still report each match's search_score
+        rank_by_relevance(clients, search_terms, sort=False)
     
     now = datetime.now(timezone.utc)
     
@@ -1039,7 +785,7 @@ async def get_clients(include_deleted: bool = False, search: Optional[str] = Non
         else:
             client["status_color"] = "gray"
     
-    return clients
+    return FastJSONResponse(clients)
 
 @api_router.get("/clients/sold/list", response_model=List[dict])
 async def get_sold_clients(search: Optional[str] = None, salesperson_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
@@ -1056,16 +802,17 @@ async def get_sold_clients(search: Optional[str] = None, salesperson_id: Optiona
         query["created_by"] = current_user["id"]
     
     # Add search filter for name and phone
+    search_terms = []
     if search:
-        escaped_search = regex_module.escape(search)
-        search_regex = {"$regex": escaped_search, "$options": "i"}
-        query["$or"] = [
-            {"first_name": search_regex},
-            {"last_name": search_regex},
-            {"phone": search_regex}
-        ]
+        search_query, search_terms = client_search_query(search)
+        query.update(search_query)
     
-    clients = await db.clients.find(query, {"_id": 0}).sort("sold_at", -1).to_list(1000)
+    if search_terms:
+        clients = await db.clients.aggregate(
+            ranked_search_pipeline(query, search_terms, {"_id": 0}, [("sold_at", -1)], 1000)
+        ).to_list(1000)
+    else:
+        clients = await db.clients.find(query, {"_id": 0, SEARCH_FIELD: 0}).sort("sold_at", -1).to_list(1000)
     
     # For each client, get the sold record info
     for client in clients:
@@ -1078,6 +825,42 @@ async def get_sold_clients(search: Optional[str] = None, salesperson_id: Optiona
     
     return clients
 
+@api_router.get("/clients/suggest", response_model=List[dict])
+async def suggest_clients(q: str, limit: int = Query(10, ge=1, le=50), current_user: dict = Depends(get_current_user)):
+    """
+    Typeahead for the client search box: top `limit` clients whose name words or
+    phone digits start with the typed terms, best match first (`score` 0..1).
+    Same ownership scope as GET /clients without filters.
+    """
+    owners, exclude_owners = None, []
+    if current_user["role"] == "bdc_manager":
+        admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
+        exclude_owners = [u["id"] for u in admin_users]
+    elif current_user["role"] != "admin":
+        owners = [current_user["id"]]
+    
+    if client_suggest_index.ready:
+        return client_suggest_index.suggest(q, owners=owners, exclude_owners=exclude_owners, limit=limit)
+    
+    # Index still loading: same ranking from an indexed query
+    query = {"is_deleted": {"$ne": True}}
+    if owners is not None:
+        query["created_by"] = {"$in": owners}
+    elif exclude_owners:
+        query["created_by"] = {"$nin": exclude_owners}
+    search_query, terms = client_search_query(q)
+    query.update(search_query)
+    projection = {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "phone": 1, "created_by": 1}
+    if terms:
+        clients = await db.clients.aggregate(
+            ranked_search_pipeline(query, terms, projection, [("created_at", -1)], limit)
+        ).to_list(limit)
+    else:
+        clients = await db.clients.find(query, projection).limit(limit).to_list(limit)
+    for client in clients:
+        client["score"] = client.pop("search_score", 0.0)
+    return clients
+
 @api_router.get("/clients/{client_id}", response_model=ClientResponse)
 async def get_client(client_id: str, current_user: dict = Depends(get_current_user)):
     client = await db.clients.find_one({"id": client_id}, {"_id": 0})
@@ -1102,14 +885,20 @@ async def update_client(client_id: str, client: ClientCreate, current_user: dict
         update_data.pop("ssn", None)
     
     # Normalize phone number if provided
-    if "phone" in update_data and update_data["phone"]:
-        update_data["phone"] = normalize_phone_number(update_data["phone"])
-    
-    result = await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    if "phone" in update_data:
+        if update_data["phone"]:
+            update_data["phone"] = normalize_phone(update_data["phone"])
+        # Also when the phone is cleared, so inbound SMS from the old number stop matching this client
+        update_data["phone_key"] = phone_lookup_key(update_data["phone"])
+    # ClientCreate always carries first_name, last_name and phone
+    with_search_tokens(update_data)
+    
+    result = await db.clients.update_one({"id": client_id}, {"$set": with_datetime_mirrors(update_data)})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Client not found")
     
     updated = await db.clients.find_one({"id": client_id}, {"_id": 0})
+    client_suggest_index.upsert(updated)
     
     # Hide sensitive fields from non-admin users
     if current_user["role"] != "admin":
@@ -1126,6 +915,7 @@ async def delete_client(client_id: str, permanent: bool = False, current_user: d
         await db.clients.delete_one({"id": client_id})
     else:
         await db.clients.update_one({"id": client_id}, {"$set": {"is_deleted": True, "deleted_at": datetime.now(timezone.utc).isoformat(), "deleted_by": current_user["id"]}})
+    client_suggest_index.remove(client_id)
     return {"message": "Client deleted"}
 
 @api_router.post("/clients/{client_id}/restore")
@@ -1133,6 +923,7 @@ async def restore_client(client_id: str, current_user: dict = Depends(get_curren
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     await db.clients.update_one({"id": client_id}, {"$set": {"is_deleted": False}, "$unset": {"deleted_at": "", "deleted_by": ""}})
+    await client_suggest_index.refresh(db, client_id)
     return {"message": "Client restored"}
 
 @api_router.put("/clients/{client_id}/documents")
@@ -1164,6 +955,25 @@ from fastapi.responses import Response
 UPLOAD_DIR = Path(__file__).parent / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Combined PDF cache - keyed by document-set fingerprint, LRU-evicted by total size
+from services.document_cache import CombinedPdfCache, document_set_fingerprint
+from services.file_serving import serve_file
+from services.uploads import save_upload_stream
+from services.blob_store import BlobStore
+from services.images import ensure_image_derivative, document_output_path
+from services.webhook_queue import WebhookQueue
+
+# Content-addressed document store (deduplicated by SHA-256, reference-counted)
+document_blobs = BlobStore(UPLOAD_DIR / "blobs", db)
+
+# Per-file upload size limit (enforced while streaming to disk)
+MAX_UPLOAD_SIZE_MB = int(os.environ.get('MAX_UPLOAD_SIZE_MB', '25'))
+MAX_UPLOAD_SIZE_BYTES = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+COMBINED_PDF_CACHE_DIR = Path(os.environ.get('COMBINED_PDF_CACHE_DIR', str(ROOT_DIR / "cache" / "combined_pdfs")))
+COMBINED_PDF_CACHE_MAX_MB = int(os.environ.get('COMBINED_PDF_CACHE_MAX_MB', '512'))
+combined_pdf_cache = CombinedPdfCache(COMBINED_PDF_CACHE_DIR, COMBINED_PDF_CACHE_MAX_MB * 1024 * 1024)
+
 @api_router.post("/clients/{client_id}/documents/upload")
 async def upload_client_document(
     client_id: str, 
@@ -1181,10 +991,6 @@ async def upload_client_document(
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    # Create client upload directory
-    client_upload_dir = UPLOAD_DIR / "clients" / client_id
-    client_upload_dir.mkdir(parents=True, exist_ok=True)
-    
     # Get existing documents list
     doc_field = f"{doc_type}_documents"
     existing_docs = client.get(doc_field, [])
@@ -1193,17 +999,16 @@ async def upload_client_document(
     
     for file in files:
         try:
-            content = await file.read()
             file_ext = file.filename.split('.')[-1].lower() if '.' in file.filename else 'pdf'
-            
-            # Create unique filename
             file_id = uuid.uuid4().hex[:8]
-            filename = f"{doc_type}_{file_id}.{file_ext}"
-            file_path = client_upload_dir / filename
             
-            # Save original file
-            with open(file_path, 'wb') as f:
-                f.write(content)
+            # Stream original file to disk in chunks, then store it by content hash
+            staged_path = document_blobs.staging_path()
+            saved = await save_upload_stream(file, staged_path, MAX_UPLOAD_SIZE_BYTES)
+            file_path = await document_blobs.commit(staged_path, saved["sha256"], f".{file_ext}", saved["size"])
+            
+            # Size-capped JPEG used by the PDF combiner and email attachments (images only)
+            derivative_path = await ensure_image_derivative(file_path)
             
             # Add to documents list
             doc_info = {
@@ -1211,10 +1016,19 @@ async def upload_client_document(
                 "filename": file.filename,
                 "path": str(file_path),
                 "type": file.content_type or f"application/{file_ext}",
+                "size": saved["size"],
+                "sha256": saved["sha256"],
                 "uploaded_at": datetime.now(timezone.utc).isoformat(),
                 "uploaded_by": current_user["id"]
             }
+            if derivative_path:
+                doc_info["derivative_path"] = str(derivative_path)
             uploaded_files.append(doc_info)
+        except HTTPException:
+            # Size limit exceeded - drop the references taken for this request
+            for doc in uploaded_files:
+                await document_blobs.release(doc["sha256"])
+            raise
         except Exception as e:
             logger.error(f"Error uploading file {file.filename}: {e}")
             continue
@@ -1233,6 +1047,7 @@ async def upload_client_document(
         update_data[f"{doc_type}_proof_uploaded"] = True
     
     await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    combined_pdf_cache.invalidate(client_id, doc_type)
     
     return {
         "message": f"{len(uploaded_files)} documento(s) subido(s) correctamente",
@@ -1298,13 +1113,16 @@ async def delete_single_document(
     if len(new_docs) == len(documents):
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Delete the file from disk
+    # Release the blob (removed by the GC once unreferenced) or delete a legacy per-client file
     for doc in documents:
         if doc.get("id") == doc_id:
             try:
-                file_path = Path(doc.get("path", ""))
-                if file_path.exists():
-                    file_path.unlink()
+                if doc.get("sha256") and document_blobs.is_blob(doc.get("path", "")):
+                    await document_blobs.release(doc["sha256"])
+                else:
+                    file_path = Path(doc.get("path", ""))
+                    if file_path.exists():
+                        file_path.unlink()
             except Exception as e:
                 logger.error(f"Error deleting file: {e}")
     
@@ -1315,6 +1133,7 @@ async def delete_single_document(
         update_data[uploaded_field] = False
     
     await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    combined_pdf_cache.invalidate(client_id, doc_type)
     
     return {"message": "Documento eliminado", "remaining": len(new_docs)}
 
@@ -1322,6 +1141,7 @@ async def delete_single_document(
 async def download_client_document(
     client_id: str,
     doc_type: str,
+    request: Request,
     doc_id: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
@@ -1350,23 +1170,25 @@ async def download_client_document(
             raise HTTPException(status_code=404, detail="Document not found")
         
         file_path = Path(doc.get("path", ""))
-        if not file_path.exists():
+        if not file_path.is_file():
             raise HTTPException(status_code=404, detail="Document file not found")
         
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
         file_ext = file_path.suffix.lower()
         content_type = 'application/pdf' if file_ext == '.pdf' else f'image/{file_ext[1:]}'
         
-        return Response(
-            content=content,
-            media_type=content_type,
-            headers={"Content-Disposition": f"attachment; filename={doc.get('filename', 'document')}"}
-        )
+        return serve_file(request, file_path, content_type, doc.get('filename', 'document'))
     
     # If multiple documents exist, combine them into one PDF
     if documents and len(documents) > 0:
+        safe_filename = f"{client.get('first_name', 'client')}_{client.get('last_name', 'doc')}_{doc_type}_combined.pdf".replace(' ', '_')
+        
+        # Serve from cache if this exact document set was already combined
+        fingerprint = document_set_fingerprint(documents)
+        if fingerprint:
+            cached_path = combined_pdf_cache.get(client_id, doc_type, fingerprint)
+            if cached_path:
+                return serve_file(request, cached_path, 'application/pdf', safe_filename)
+        
         pdf_writer = PdfWriter()
         
         for doc in documents:
@@ -1383,8 +1205,8 @@ async def download_client_document(
                     for page in pdf_reader.pages:
                         pdf_writer.add_page(page)
                 else:
-                    # Convert image to PDF page
-                    img = PILImage.open(file_path)
+                    # Convert image to PDF page (from the normalized derivative when available)
+                    img = PILImage.open(document_output_path(doc))
                     if img.mode in ('RGBA', 'LA', 'P'):
                         img = img.convert('RGB')
                     
@@ -1405,12 +1227,13 @@ async def download_client_document(
         # Write combined PDF
         output = io.BytesIO()
         pdf_writer.write(output)
-        output.seek(0)
+        content = output.getvalue()
         
-        safe_filename = f"{client.get('first_name', 'client')}_{client.get('last_name', 'doc')}_{doc_type}_combined.pdf".replace(' ', '_')
+        if fingerprint:
+            combined_pdf_cache.put(client_id, doc_type, fingerprint, content)
         
         return Response(
-            content=output.read(),
+            content=content,
             media_type='application/pdf',
             headers={"Content-Disposition": f"attachment; filename={safe_filename}"}
         )
@@ -1441,16 +1264,13 @@ async def download_client_document(
     else:
         file_path = Path(file_url)
     
-    if not file_path.exists():
+    if not file_path.is_file():
         filename = Path(file_url).name if '/' in str(file_url) else file_url
         file_path = UPLOAD_DIR / filename
         
-        if not file_path.exists():
+        if not file_path.is_file():
             raise HTTPException(status_code=404, detail=f"Document file not found")
     
-    with open(file_path, 'rb') as f:
-        content = f.read()
-    
     file_ext = file_path.suffix.lower()
     content_type = 'application/pdf'
     if file_ext in ['.jpg', '.jpeg']:
@@ -1462,11 +1282,7 @@ async def download_client_document(
     
     safe_filename = f"{client.get('first_name', 'client')}_{client.get('last_name', 'doc')}_{doc_type}{file_ext}".replace(' ', '_')
     
-    return Response(
-        content=content,
-        media_type=content_type,
-        headers={"Content-Disposition": f"attachment; filename={safe_filename}"}
-    )
+    return serve_file(request, file_path, content_type, safe_filename)
 
 # ==================== USER RECORDS (CARTILLAS) ROUTES ====================
 
@@ -1498,14 +1314,14 @@ async def create_user_record(record: UserRecordCreate, current_user: dict = Depe
         "first_sms_sent": False,
         "last_reminder_sent": None
     }
-    await db.user_records.insert_one(record_doc)
+    await db.user_records.insert_one(with_datetime_mirrors(record_doc))
     
     # Update client last_record_date
     await db.clients.update_one({"id": record.client_id}, {"$set": {"last_record_date": now}})
     
     # Send automatic SMS if this is the first record for the client
     sms_sent = False
-    if is_first_record and twilio_client:
+    if is_first_record and get_twilio_client():
         client = await db.clients.find_one({"id": record.client_id}, {"_id": 0})
         if client and client.get("phone"):
             client_name = f"{client['first_name']} {client['last_name']}"
@@ -1528,7 +1344,7 @@ async def create_user_record(record: UserRecordCreate, current_user: dict = Depe
                 "sent_by": current_user["id"],
                 "automatic": True
             }
-            await db.sms_logs.insert_one(sms_log)
+            await log_outbound_sms(sms_log)
             
             if result["success"]:
                 sms_sent = True
@@ -1539,13 +1355,16 @@ async def create_user_record(record: UserRecordCreate, current_user: dict = Depe
     record_doc["auto_sms_sent"] = sms_sent
     return record_doc
 
+user_record_list_view = ListView(USER_RECORD_SUMMARY)
+
 @api_router.get("/user-records", response_model=List[dict])
-async def get_user_records(client_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+async def get_user_records(client_id: Optional[str] = None, fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION), current_user: dict = Depends(get_current_user)):
+    projection = list_projection(user_record_list_view, fields)
     query = {"is_deleted": {"$ne": True}}
     if client_id:
         query["client_id"] = client_id
-    records = await db.user_records.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return records
+    records = await db.user_records.find(query, projection).sort("created_at", -1).to_list(1000)
+    return FastJSONResponse(records)
 
 @api_router.get("/user-records/{record_id}", response_model=UserRecordResponse)
 async def get_user_record(record_id: str, current_user: dict = Depends(get_current_user)):
@@ -1593,7 +1412,7 @@ async def update_user_record(record_id: str, record_data: dict, current_user: di
         client_update["is_sold"] = True
         client_update["sold_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.clients.update_one({"id": client_id}, {"$set": client_update})
+    await db.clients.update_one({"id": client_id}, {"$set": with_datetime_mirrors(client_update)})
     
     updated = await db.user_records.find_one({"id": record_id}, {"_id": 0})
     
@@ -1674,7 +1493,7 @@ async def add_record_comment(record_id: str, comment: str = Form(...), reminder_
         "reminder_at": reminder_at,
         "reminder_sent": send_notification_now
     }
-    await db.record_comments.insert_one(comment_doc)
+    await db.record_comments.insert_one(with_datetime_mirrors(comment_doc))
     
     # If reminder is within 24 hours, create notification immediately
     notification_created = False
@@ -1705,7 +1524,7 @@ async def add_record_comment(record_id: str, comment: str = Form(...), reminder_
                 "is_read": False,
                 "created_at": now_iso
             }
-            await db.notifications.insert_one(notif_doc)
+            await insert_notifications(notif_doc)
             notification_created = True
             logger.info(f"Immediate reminder notification created for record {record_id}")
         except Exception as e:
@@ -1773,7 +1592,7 @@ async def add_client_comment(client_id: str, comment: str = Form(...), reminder_
         "reminder_at": reminder_at,  # ISO datetime string for when to remind
         "reminder_sent": send_notification_now  # Mark as sent if we're sending now
     }
-    await db.client_comments.insert_one(comment_doc)
+    await db.client_comments.insert_one(with_datetime_mirrors(comment_doc))
     
     # If reminder is within 24 hours, create notification immediately
     notification_created = False
@@ -1798,7 +1617,7 @@ async def add_client_comment(client_id: str, comment: str = Form(...), reminder_
                 "is_read": False,
                 "created_at": now_iso
             }
-            await db.notifications.insert_one(notif_doc)
+            await insert_notifications(notif_doc)
             notification_created = True
             logger.info(f"Immediate reminder notification created for client {client_id}")
         except Exception as e:
@@ -2166,30 +1985,30 @@ body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
         if request.attach_documents:
             uploads_dir = "/app/backend/uploads"
             
-            # Client documents
-            if client.get('id_file_url'):
-                file_path = os.path.join(uploads_dir, os.path.basename(client['id_file_url']))
-                if os.path.exists(file_path):
-                    attachments.append({
-                        'path': file_path,
-                        'name': f"{client.get('first_name', 'Cliente')}_{client.get('last_name', '')}_ID{os.path.splitext(file_path)[1]}"
-                    })
-            
-            if client.get('income_proof_file_url'):
-                file_path = os.path.join(uploads_dir, os.path.basename(client['income_proof_file_url']))
-                if os.path.exists(file_path):
-                    attachments.append({
-                        'path': file_path,
-                        'name': f"{client.get('first_name', 'Cliente')}_{client.get('last_name', '')}_Ingresos{os.path.splitext(file_path)[1]}"
-                    })
-            
-            if client.get('residence_proof_file_url'):
-                file_path = os.path.join(uploads_dir, os.path.basename(client['residence_proof_file_url']))
-                if os.path.exists(file_path):
-                    attachments.append({
-                        'path': file_path,
-                        'name': f"{client.get('first_name', 'Cliente')}_{client.get('last_name', '')}_Residencia{os.path.splitext(file_path)[1]}"
-                    })
+            # Client documents - multi-document uploads first (normalized image derivatives),
+            # falling back to the legacy single file per type
+            client_prefix = f"{client.get('first_name', 'Cliente')}_{client.get('last_name', '')}"
+            for doc_type, legacy_field, label in [
+                ('id', 'id_file_url', 'ID'),
+                ('income', 'income_proof_file_url', 'Ingresos'),
+                ('residence', 'residence_proof_file_url', 'Residencia'),
+            ]:
+                documents = client.get(f"{doc_type}_documents") or []
+                if documents:
+                    for idx, doc in enumerate(documents, 1):
+                        file_path = document_output_path(doc)
+                        if file_path.exists():
+                            attachments.append({
+                                'path': str(file_path),
+                                'name': f"{client_prefix}_{label}_{idx}{file_path.suffix}"
+                            })
+                elif client.get(legacy_field):
+                    file_path = os.path.join(uploads_dir, os.path.basename(client[legacy_field]))
+                    if os.path.exists(file_path):
+                        attachments.append({
+                            'path': file_path,
+                            'name': f"{client_prefix}_{label}{os.path.splitext(file_path)[1]}"
+                        })
             
             # Also include co-signer documents if available
             for idx, cosigner in enumerate(cosigners_data, 1):
@@ -2372,7 +2191,7 @@ async def create_appointment(appt: AppointmentCreate, current_user: dict = Depen
     }
     
     try:
-        await db.appointments.insert_one(appt_doc)
+        await db.appointments.insert_one(with_datetime_mirrors(appt_doc))
     except Exception as e:
         logger.error(f"Error inserting appointment: {e}")
         raise HTTPException(status_code=500, detail="Error al crear la cita")
@@ -2398,20 +2217,53 @@ async def create_appointment(appt: AppointmentCreate, current_user: dict = Depen
                     "is_read": False,
                     "created_at": now
                 }
-                await db.notifications.insert_one(notif_doc)
+                await insert_notifications(notif_doc)
     except Exception as e:
         logger.error(f"Error creating notifications: {e}")
         # Don't fail the appointment creation if notifications fail
     
     return appt_doc
 
+# Default agenda window when the caller does not send from/to
+AGENDA_DEFAULT_PAST_DAYS = int(os.environ.get('AGENDA_DEFAULT_PAST_DAYS', '31'))
+AGENDA_DEFAULT_FUTURE_DAYS = int(os.environ.get('AGENDA_DEFAULT_FUTURE_DAYS', '62'))
+
+def appointment_date_window(date_from: Optional[str], date_to: Optional[str]) -> tuple:
+    """
+    Resolve a from/to window (inclusive YYYY-MM-DD dates). Missing bounds default
+    to AGENDA_DEFAULT_PAST_DAYS before / AGENDA_DEFAULT_FUTURE_DAYS after today.
+    """
+    today = datetime.now(timezone.utc).date()
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else today - timedelta(days=AGENDA_DEFAULT_PAST_DAYS)
+        end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else today + timedelta(days=AGENDA_DEFAULT_FUTURE_DAYS)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to must be dates in YYYY-MM-DD format")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    return start.isoformat(), end.isoformat()
+
+def appointment_window_query(start: str, end: str) -> dict:
+    """Appointments dated inside the window, plus those without a date yet (sin configurar)"""
+    return {"$or": [
+        {"date": {"$gte": start, "$lte": end}},
+        {"date": {"$in": [None, ""]}}
+    ]}
+
 @api_router.get("/appointments", response_model=List[AppointmentResponse])
 async def get_appointments(
     salesperson_id: Optional[str] = None,
     client_id: Optional[str] = None,
     status: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    List appointments, oldest date first. A client's appointments are returned in
+    full; otherwise results are limited to the from/to date window (default:
+    the agenda window around today).
+    """
     query = {}
     if salesperson_id:
         query["salesperson_id"] = salesperson_id
@@ -2419,16 +2271,61 @@ async def get_appointments(
         query["client_id"] = client_id
     if status:
         query["status"] = status
+    if date_from or date_to or not client_id:
+        query.update(appointment_window_query(*appointment_date_window(date_from, date_to)))
     
-    appointments = await db.appointments.find(query, {"_id": 0}).sort("date", 1).to_list(1000)
+    appointments = await db.appointments.find(query, {"_id": 0}).sort([("date", 1), ("time", 1)]).to_list(1000)
     return appointments
 
+def reminder_agenda_pipeline(reminder_match: dict) -> list:
+    """$unionWith sub-pipeline turning comment reminders into agenda items (type "reminder")"""
+    return [
+        {"$match": reminder_match},
+        {"$lookup": {
+            "from": "clients",
+            "localField": "client_id",
+            "foreignField": "id",
+            "pipeline": [
+                {"$project": {
+                    "_id": 0,
+                    "first_name": {"$ifNull": ["$first_name", ""]},
+                    "last_name": {"$ifNull": ["$last_name", ""]},
+                    "phone": {"$ifNull": ["$phone", ""]}
+                }},
+                {"$limit": 1}
+            ],
+            "as": "client"
+        }},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "type": {"$literal": "reminder"},  # Mark as reminder, not appointment
+            "date": {"$substrCP": ["$reminder_at", 0, 10]},  # YYYY-MM-DD
+            "time": {"$substrCP": ["$reminder_at", 11, 5]},  # HH:MM
+            "client_id": 1,
+            "client": {"$ifNull": [{"$first": "$client"}, None]},
+            "comment": {"$ifNull": ["$comment", ""]},
+            "reminder_sent": {"$ifNull": ["$reminder_sent", False]},
+            "salesperson_id": "$user_id",
+            "salesperson_name": {"$ifNull": ["$user_name", ""]},
+            "created_at": 1
+        }}
+    ]
+
 @api_router.get("/appointments/agenda", response_model=List[dict])
-async def get_agenda(current_user: dict = Depends(get_current_user)):
-    """Get appointments for the agenda view with client info.
-    Admins see ALL appointments, others see only their own."""
+async def get_agenda(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get appointments and reminders for the agenda view with client info.
+    Admins see ALL appointments, others see only their own.
+    Only items dated within from/to (YYYY-MM-DD, inclusive) are returned, plus
+    appointments without a date; the frontend sends the visible calendar range."""
+    window_start, window_end = appointment_date_window(date_from, date_to)
     
     # Build match query based on role
+    admin_ids = []
     if current_user["role"] == "admin":
         # Admins see all appointments
         match_query = {}
@@ -2442,6 +2339,9 @@ async def get_agenda(current_user: dict = Depends(get_current_user)):
         # Telemarketers see only their own appointments
         match_query = {"salesperson_id": current_user["id"]}
     
+    # (salesperson_id, date, time) index: equality on the scope, range on the date
+    match_query.update(appointment_window_query(window_start, window_end))
+    
     pipeline = [
         {"$match": match_query},
         {"$lookup": {
@@ -2464,60 +2364,28 @@ async def get_agenda(current_user: dict = Depends(get_current_user)):
             "salesperson._id": 0,
             "salesperson.password": 0
         }},
-        {"$sort": {"date": 1, "time": 1}}
     ]
-    appointments = await db.appointments.aggregate(pipeline).to_list(1000)
     
-    # Also get reminders (from client_comments and record_comments)
-    reminder_match = {"reminder_at": {"$ne": None}}
+    # Reminders (from client_comments and record_comments) are unioned into the same pipeline
+    # reminder_at is an ISO string, so "< day after window end" keeps the whole last day
+    next_day = (datetime.strptime(window_end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    reminder_match = {"reminder_at": {"$type": "string", "$gte": window_start, "$lt": next_day}}
     if current_user["role"] == "admin":
         pass  # Admin sees all reminders
     elif current_user["role"] == "bdc_manager":
-        admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
-        admin_ids = [u["id"] for u in admin_users]
         reminder_match["user_id"] = {"$nin": admin_ids}
     else:
         reminder_match["user_id"] = current_user["id"]
     
-    # Get client comment reminders
-    client_reminders = await db.client_comments.find(reminder_match, {"_id": 0}).to_list(500)
-    
-    # Get record comment reminders
-    record_reminders = await db.record_comments.find(reminder_match, {"_id": 0}).to_list(500)
-    
-    # Transform reminders to agenda format
-    for reminder in client_reminders + record_reminders:
-        client_id = reminder.get("client_id")
-        client = await db.clients.find_one({"id": client_id}, {"_id": 0, "first_name": 1, "last_name": 1, "phone": 1}) if client_id else None
-        
-        # Parse reminder date
-        reminder_at = reminder.get("reminder_at", "")
-        reminder_date = reminder_at[:10] if reminder_at else ""  # YYYY-MM-DD
-        reminder_time = reminder_at[11:16] if len(reminder_at) > 11 else ""  # HH:MM
-        
-        agenda_item = {
-            "id": reminder.get("id"),
-            "type": "reminder",  # Mark as reminder, not appointment
-            "date": reminder_date,
-            "time": reminder_time,
-            "client_id": client_id,
-            "client": {
-                "first_name": client.get("first_name", "") if client else "",
-                "last_name": client.get("last_name", "") if client else "",
-                "phone": client.get("phone", "") if client else ""
-            } if client else None,
-            "comment": reminder.get("comment", ""),
-            "reminder_sent": reminder.get("reminder_sent", False),
-            "salesperson_id": reminder.get("user_id"),
-            "salesperson_name": reminder.get("user_name", ""),
-            "created_at": reminder.get("created_at")
-        }
-        appointments.append(agenda_item)
-    
-    # Sort all items by date and time
-    appointments.sort(key=lambda x: (x.get("date", ""), x.get("time", "")))
+    pipeline += [
+        {"$unionWith": {"coll": "client_comments", "pipeline": reminder_agenda_pipeline(reminder_match)}},
+        {"$unionWith": {"coll": "record_comments", "pipeline": reminder_agenda_pipeline(reminder_match)}},
+        # Sort all items by date and time
+        {"$sort": {"date": 1, "time": 1}}
+    ]
+    appointments = await db.appointments.aggregate(pipeline).to_list(2000)
     
-    return appointments
+    return FastJSONResponse(appointments)
 
 @api_router.put("/appointments/{appt_id}", response_model=AppointmentResponse)
 async def update_appointment(appt_id: str, appt: AppointmentUpdate, current_user: dict = Depends(get_current_user)):
@@ -2612,6 +2480,29 @@ async def search_client_by_phone(phone: str, current_user: dict = Depends(get_cu
 
 # ==================== DASHBOARD ROUTES ====================
 
+def ts_value(value: datetime):
+    """Comparison value for a timestamp range: a BSON date once mirrors are backfilled, else ISO"""
+    return value if datetime_mirrors_ready else value.isoformat()
+
+def created_at_field() -> str:
+    return dt_field("created_at") if datetime_mirrors_ready else "created_at"
+
+def period_date_filter(period: str, month: Optional[str], now: datetime) -> dict:
+    """created_at range for the dashboard period selector ("all", "6months", "month" or a YYYY-MM month)"""
+    if month:  # Specific month selected (e.g., "2026-01")
+        year, mon = month.split("-")
+        start_date = datetime(int(year), int(mon), 1, tzinfo=timezone.utc)
+        if int(mon) == 12:
+            end_date = datetime(int(year) + 1, 1, 1, tzinfo=timezone.utc)
+        else:
+            end_date = datetime(int(year), int(mon) + 1, 1, tzinfo=timezone.utc)
+        return {"$gte": ts_value(start_date), "$lt": ts_value(end_date)}
+    if period == "month":  # Current month
+        return {"$gte": ts_value(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))}
+    if period == "6months":  # Last 6 months
+        return {"$gte": ts_value(now - timedelta(days=180))}
+    return {}  # "all" - no date filter
+
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats(
     current_user: dict = Depends(get_current_user),
@@ -2621,13 +2512,13 @@ async def get_dashboard_stats(
     user_role: str = None  # Optional role filter (Admin only): "admin", "bdc_manager", "telemarketer"
 ):
     # Get list of admin user IDs (to exclude their data from non-admins)
-    admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
+    admin_users = await analytics_db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
     admin_ids = [u["id"] for u in admin_users]
     
     # Get users by role if filtering by role
     role_user_ids = None
     if user_role and current_user["role"] == "admin":
-        role_users = await db.users.find({"role": user_role}, {"_id": 0, "id": 1}).to_list(100)
+        role_users = await analytics_db.users.find({"role": user_role}, {"_id": 0, "id": 1}).to_list(100)
         role_user_ids = [u["id"] for u in role_users]
     
     # Base query for records/appointments - depends on role
@@ -2653,57 +2544,42 @@ async def get_dashboard_stats(
     
     # Calculate date filters based on period
     now = datetime.now(timezone.utc)
-    date_filter = {}
-    
-    if month:  # Specific month selected (e.g., "2026-01")
-        year, mon = month.split("-")
-        start_date = datetime(int(year), int(mon), 1, tzinfo=timezone.utc)
-        if int(mon) == 12:
-            end_date = datetime(int(year) + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            end_date = datetime(int(year), int(mon) + 1, 1, tzinfo=timezone.utc)
-        date_filter = {"$gte": start_date.isoformat(), "$lt": end_date.isoformat()}
-    elif period == "month":  # Current month
-        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        date_filter = {"$gte": start_date.isoformat()}
-    elif period == "6months":  # Last 6 months
-        start_date = now - timedelta(days=180)
-        date_filter = {"$gte": start_date.isoformat()}
-    # else "all" - no date filter
+    date_filter = period_date_filter(period, month, now)
+    created_field = created_at_field()
     
     # Build queries with date filter AND owner filter
     clients_query = {"is_deleted": {"$ne": True}}
     if clients_owner_filter:
         clients_query.update(clients_owner_filter)
     if date_filter:
-        clients_query["created_at"] = date_filter
+        clients_query[created_field] = date_filter
     
     # Total clients (filtered by period and owner)
-    total_clients = await db.clients.count_documents(clients_query)
+    total_clients = await analytics_db.clients.count_documents(clients_query)
     
     # Total clients overall (for reference) - also filtered by owner
     clients_all_query = {"is_deleted": {"$ne": True}}
     if clients_owner_filter:
         clients_all_query.update(clients_owner_filter)
-    total_clients_all = await db.clients.count_documents(clients_all_query)
+    total_clients_all = await analytics_db.clients.count_documents(clients_all_query)
     
     # New clients this month (always current month for comparison) - also filtered by owner
     first_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     new_clients_query = {
         "is_deleted": {"$ne": True},
-        "created_at": {"$gte": first_of_month.isoformat()}
+        created_field: {"$gte": ts_value(first_of_month)}
     }
     if clients_owner_filter:
         new_clients_query.update(clients_owner_filter)
-    new_clients_month = await db.clients.count_documents(new_clients_query)
+    new_clients_month = await analytics_db.clients.count_documents(new_clients_query)
     
     # Appointments query with date filter
     appt_query = {**base_query}
     if date_filter:
-        appt_query["created_at"] = date_filter
+        appt_query[created_field] = date_filter
     
     # Appointments by status
-    appt_stats = await db.appointments.aggregate([
+    appt_stats = await analytics_db.appointments.aggregate([
         {"$match": appt_query},
         {"$group": {"_id": "$status", "count": {"$sum": 1}}}
     ]).to_list(100)
@@ -2716,43 +2592,43 @@ async def get_dashboard_stats(
     if clients_owner_filter:
         docs_query_complete.update(clients_owner_filter)
         docs_query_pending.update(clients_owner_filter)
-    docs_complete = await db.clients.count_documents(docs_query_complete)
-    docs_pending = await db.clients.count_documents(docs_query_pending)
+    docs_complete = await analytics_db.clients.count_documents(docs_query_complete)
+    docs_pending = await analytics_db.clients.count_documents(docs_query_pending)
     
     # Sales count - now based on is_sold in clients collection (consistent with Sold page)
     # Filtered by owner
     sales_client_query = {"is_sold": True, "is_deleted": {"$ne": True}}
     if clients_owner_filter:
         sales_client_query.update(clients_owner_filter)
-    sales_count = await db.clients.count_documents(sales_client_query)
+    sales_count = await analytics_db.clients.count_documents(sales_client_query)
     
     # Sales this month - check sold_at field if exists, otherwise count all sold
     # First try to count clients with sold_at in this month - filtered by owner
     sales_month_query = {
         "is_sold": True, 
         "is_deleted": {"$ne": True},
-        "sold_at": {"$gte": first_of_month.isoformat()}
+        (dt_field("sold_at") if datetime_mirrors_ready else "sold_at"): {"$gte": ts_value(first_of_month)}
     }
     if clients_owner_filter:
         sales_month_query.update(clients_owner_filter)
-    sales_month = await db.clients.count_documents(sales_month_query)
+    sales_month = await analytics_db.clients.count_documents(sales_month_query)
     
     # If no sold_at dates exist, use sales_count as fallback (for backwards compatibility)
     if sales_month == 0 and sales_count > 0:
         # Check if any client has sold_at field
-        has_sold_at = await db.clients.count_documents({"is_sold": True, "sold_at": {"$exists": True}})
+        has_sold_at = await analytics_db.clients.count_documents({"is_sold": True, "sold_at": {"$exists": True}})
         if has_sold_at == 0:
             # No sold_at dates tracked yet, show all sales as this month's
             sales_month = sales_count
     
     # Today's appointments
     today = now.strftime("%Y-%m-%d")
-    today_appointments = await db.appointments.count_documents({"date": today, **base_query})
+    today_appointments = await analytics_db.appointments.count_documents({"date": today, **base_query})
     
     # This week's appointments
     week_start = (now - timedelta(days=now.weekday())).strftime("%Y-%m-%d")
     week_end = (now + timedelta(days=6-now.weekday())).strftime("%Y-%m-%d")
-    week_appointments = await db.appointments.count_documents({
+    week_appointments = await analytics_db.appointments.count_documents({
         "date": {"$gte": week_start, "$lte": week_end},
         **base_query
     })
@@ -2762,33 +2638,32 @@ async def get_dashboard_stats(
     if base_query:
         records_query.update(base_query)
     if date_filter:
-        records_query["created_at"] = date_filter
-    total_records = await db.user_records.count_documents(records_query)
+        records_query[created_field] = date_filter
+    total_records = await analytics_db.user_records.count_documents(records_query)
     
     # Co-signers count
-    total_cosigners = await db.cosigner_relations.count_documents({})
+    total_cosigners = await analytics_db.cosigner_relations.count_documents({})
     
     # Sold clients count (clients with is_sold = true) - filtered by owner
     sold_clients_query = {"is_sold": True, "is_deleted": {"$ne": True}}
     if clients_owner_filter:
         sold_clients_query.update(clients_owner_filter)
-    sold_clients = await db.clients.count_documents(sold_clients_query)
+    sold_clients = await analytics_db.clients.count_documents(sold_clients_query)
     
     # Recent activity - clients contacted in last 7 days - filtered by owner
-    week_ago = (now - timedelta(days=7)).isoformat()
     active_clients_query = {
         "is_deleted": {"$ne": True},
-        "last_contact": {"$gte": week_ago}
+        (dt_field("last_contact") if datetime_mirrors_ready else "last_contact"): {"$gte": ts_value(now - timedelta(days=7))}
     }
     if clients_owner_filter:
         active_clients_query.update(clients_owner_filter)
-    active_clients = await db.clients.count_documents(active_clients_query)
+    active_clients = await analytics_db.clients.count_documents(active_clients_query)
     
     # Finance type breakdown with date filter
     finance_match = {"finance_status": {"$in": ["financiado", "lease"]}, "is_deleted": {"$ne": True}}
     if date_filter:
-        finance_match["created_at"] = date_filter
-    finance_stats = await db.user_records.aggregate([
+        finance_match[created_field] = date_filter
+    finance_stats = await analytics_db.user_records.aggregate([
         {"$match": finance_match},
         {"$group": {"_id": "$finance_status", "count": {"$sum": 1}}}
     ]).to_list(10)
@@ -2796,38 +2671,63 @@ async def get_dashboard_stats(
     
     # Monthly sales trend (last 6 months or based on period)
     trend_start = now - timedelta(days=180)
-    monthly_sales = await db.user_records.aggregate([
-        {
-            "$match": {
-                "finance_status": {"$in": ["financiado", "lease"]},
-                "is_deleted": {"$ne": True},
-                "created_at": {"$gte": trend_start.isoformat()}
-            }
-        },
-        {
-            "$group": {
-                "_id": {"$substr": ["$created_at", 0, 7]},  # YYYY-MM
-                "count": {"$sum": 1}
-            }
-        },
-        {"$sort": {"_id": 1}}
-    ]).to_list(12)
-    
-    # Get available months for filter dropdown
-    available_months = await db.user_records.aggregate([
-        {"$match": {"is_deleted": {"$ne": True}}},
-        {"$group": {"_id": {"$substr": ["$created_at", 0, 7]}}},
-        {"$sort": {"_id": -1}},
-        {"$limit": 12}
-    ]).to_list(12)
+    if datetime_mirrors_ready:
+        # Bucket on real dates, then label the buckets YYYY-MM
+        month_bucket = {"$dateTrunc": {"date": "$created_at_dt", "unit": "month"}}
+        monthly_sales = await analytics_db.user_records.aggregate([
+            {
+                "$match": {
+                    "finance_status": {"$in": ["financiado", "lease"]},
+                    "is_deleted": {"$ne": True},
+                    "created_at_dt": {"$gte": trend_start}
+                }
+            },
+            {"$group": {"_id": month_bucket, "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+            {"$project": {"_id": {"$dateToString": {"date": "$_id", "format": "%Y-%m"}}, "count": 1}}
+        ]).to_list(12)
+        
+        # Get available months for filter dropdown
+        available_months = await analytics_db.user_records.aggregate([
+            {"$match": {"is_deleted": {"$ne": True}, "created_at_dt": {"$ne": None}}},
+            {"$group": {"_id": month_bucket}},
+            {"$sort": {"_id": -1}},
+            {"$limit": 12},
+            {"$project": {"_id": {"$dateToString": {"date": "$_id", "format": "%Y-%m"}}}}
+        ]).to_list(12)
+    else:
+        monthly_sales = await analytics_db.user_records.aggregate([
+            {
+                "$match": {
+                    "finance_status": {"$in": ["financiado", "lease"]},
+                    "is_deleted": {"$ne": True},
+                    "created_at": {"$gte": trend_start.isoformat()}
+                }
+            },
+            {
+                "$group": {
+                    "_id": {"$substr": ["$created_at", 0, 7]},  # YYYY-MM
+                    "count": {"$sum": 1}
+                }
+            },
+            {"$sort": {"_id": 1}}
+        ]).to_list(12)
+        
+        # Get available months for filter dropdown
+        available_months = await analytics_db.user_records.aggregate([
+            {"$match": {"is_deleted": {"$ne": True}}},
+            {"$group": {"_id": {"$substr": ["$created_at", 0, 7]}}},
+            {"$sort": {"_id": -1}},
+            {"$limit": 12}
+        ]).to_list(12)
     
     # Calculate total down payment collected
     dp_match = {"is_deleted": {"$ne": True}}
     if date_filter:
-        dp_match["created_at"] = date_filter
+        dp_match[created_field] = date_filter
     
     # Get all records with down payment info
-    records_with_dp = await db.user_records.find(
+    records_with_dp = await analytics_db.user_records.find(
         dp_match,
         {"down_payment_cash": 1, "down_payment_card": 1, "trade_estimated_value": 1, "_id": 0}
     ).to_list(None)
@@ -2901,28 +2801,13 @@ async def get_salesperson_performance(
         raise HTTPException(status_code=403, detail="Admin or BDC Manager access required")
     
     # Get admin IDs to filter them out for BDC Managers
-    admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
+    admin_users = await analytics_db.users.find({"role": "admin"}, {"_id": 0, "id": 1}).to_list(100)
     admin_ids = [u["id"] for u in admin_users]
     
     # Calculate date filters based on period
     now = datetime.now(timezone.utc)
-    date_filter = {}
-    
-    if month:  # Specific month selected (e.g., "2026-01")
-        year, mon = month.split("-")
-        start_date = datetime(int(year), int(mon), 1, tzinfo=timezone.utc)
-        if int(mon) == 12:
-            end_date = datetime(int(year) + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            end_date = datetime(int(year), int(mon) + 1, 1, tzinfo=timezone.utc)
-        date_filter = {"$gte": start_date.isoformat(), "$lt": end_date.isoformat()}
-    elif period == "month":  # Current month
-        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        date_filter = {"$gte": start_date.isoformat()}
-    elif period == "6months":  # Last 6 months
-        start_date = now - timedelta(days=180)
-        date_filter = {"$gte": start_date.isoformat()}
-    # else "all" - no date filter
+    date_filter = period_date_filter(period, month, now)
+    created_field = created_at_field()
     
     # Build match filter based on role and date
     match_filter = {"is_deleted": {"$ne": True}}
@@ -2930,12 +2815,12 @@ async def get_salesperson_performance(
         # BDC Manager should NOT see admin performance
         match_filter["salesperson_id"] = {"$nin": admin_ids}
     if date_filter:
-        match_filter["created_at"] = date_filter
+        match_filter[created_field] = date_filter
     
     # Build appointment match filter for the lookup
     appt_match_filter = {}
     if date_filter:
-        appt_match_filter["created_at"] = date_filter
+        appt_match_filter[created_field] = date_filter
     
     pipeline = [
         {"$match": match_filter},
@@ -2951,7 +2836,7 @@ async def get_salesperson_performance(
             "pipeline": [
                 {"$match": {
                     "$expr": {"$eq": ["$salesperson_id", "$$sp_id"]},
-                    **({"created_at": date_filter} if date_filter else {})
+                    **({created_field: date_filter} if date_filter else {})
                 }}
             ],
             "as": "appointments"
@@ -2980,7 +2865,7 @@ async def get_salesperson_performance(
         {"$sort": {"total_records": -1}}  # Sort by total records descending
     ]
     
-    performance = await db.user_records.aggregate(pipeline).to_list(100)
+    performance = await analytics_db.user_records.aggregate(pipeline).to_list(100)
     return performance
 
 # ==================== TRASH ROUTES (ADMIN) ====================
@@ -2992,47 +2877,76 @@ async def get_trash_clients(current_user: dict = Depends(get_current_user)):
     clients = await db.clients.find({"is_deleted": True}, {"_id": 0}).to_list(1000)
     return clients
 
+user_record_rows = ModelRows(UserRecordResponse)
+
 @api_router.get("/trash/user-records", response_model=List[UserRecordResponse])
-async def get_trash_user_records(current_user: dict = Depends(get_current_user)):
+async def get_trash_user_records(fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION), current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    records = await db.user_records.find({"is_deleted": True}, {"_id": 0}).to_list(1000)
-    return records
+    if fields:
+        records = await db.user_records.find({"is_deleted": True}, list_projection(user_record_list_view, fields)).to_list(1000)
+        return FastJSONResponse(records)
+    # Full view: only what UserRecordResponse returns, skipping the embedded documents and other extras
+    records = await db.user_records.find({"is_deleted": True}, user_record_rows.projection).to_list(1000)
+    return FastJSONResponse(user_record_rows(records))
 
 # ==================== SMS ROUTES (TWILIO) ====================
 
-async def send_sms_twilio(to_phone: str, message: str) -> dict:
-    """Send SMS using Twilio with A2P 10DLC Messaging Service. Returns status dict."""
-    if not twilio_client:
-        logger.warning("Twilio client not configured - SMS not sent")
-        return {"success": False, "error": "Twilio not configured"}
+def sms_log_to_conversation(log: dict) -> dict:
+    """Conversation-timeline entry for an outbound SMS recorded in sms_logs"""
+    return {
+        "id": log.get("id", str(uuid.uuid4())),
+        "client_id": log["client_id"],
+        "direction": "outbound",
+        "message": log.get("message", ""),
+        "timestamp": log.get("sent_at"),
+        "sender_id": log.get("sent_by"),
+        "sender_name": log.get("sender_name", "System"),
+        "twilio_sid": log.get("twilio_sid"),
+        "status": log.get("status", "sent"),
+        "message_type": log.get("message_type")
+    }
+
+async def log_outbound_sms(sms_log: dict):
+    """
+    Record an outbound SMS in sms_logs (audit) and, when it belongs to a client,
+    in that client's sms_conversations timeline.
+    """
+    await db.sms_logs.insert_one(sms_log)
+    if sms_log.get("client_id") and sms_log.get("twilio_sid"):
+        await db.sms_conversations.update_one(
+            {"twilio_sid": sms_log["twilio_sid"], "direction": "outbound"},
+            {"$setOnInsert": sms_log_to_conversation(sms_log)},
+            upsert=True
+        )
+
+async def migrate_sms_logs_to_conversations():
+    """One-time copy of historical client SMS logs into sms_conversations"""
+    if await db.migrations.find_one({"_id": "sms_logs_to_conversations"}):
+        return
     
-    try:
-        # Ensure phone number is in E.164 format
-        if not to_phone.startswith('+'):
-            to_phone = '+1' + to_phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
-        
-        # Use Messaging Service SID for A2P 10DLC compliance (required)
-        # Falls back to phone number if Messaging Service not configured
-        if TWILIO_MESSAGING_SERVICE_SID:
-            message_obj = twilio_client.messages.create(
-                body=message,
-                messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID,
-                to=to_phone
-            )
-            logger.info(f"SMS sent via Messaging Service to {to_phone}: SID={message_obj.sid}")
-        else:
-            message_obj = twilio_client.messages.create(
-                body=message,
-                from_=TWILIO_PHONE_NUMBER,
-                to=to_phone
-            )
-            logger.info(f"SMS sent via phone number to {to_phone}: SID={message_obj.sid}")
-        
-        return {"success": True, "sid": message_obj.sid, "status": message_obj.status}
-    except Exception as e:
-        logger.error(f"Failed to send SMS to {to_phone}: {str(e)}")
-        return {"success": False, "error": str(e)}
+    copied = 0
+    batch = []
+    cursor = db.sms_logs.find(
+        {"client_id": {"$nin": [None, ""]}, "twilio_sid": {"$nin": [None, ""]}},
+        {"_id": 0}
+    )
+    async for log in cursor:
+        batch.append(UpdateOne(
+            {"twilio_sid": log["twilio_sid"], "direction": "outbound"},
+            {"$setOnInsert": sms_log_to_conversation(log)},
+            upsert=True
+        ))
+        if len(batch) >= 500:
+            result = await db.sms_conversations.bulk_write(batch, ordered=False)
+            copied += result.upserted_count
+            batch = []
+    if batch:
+        result = await db.sms_conversations.bulk_write(batch, ordered=False)
+        copied += result.upserted_count
+    
+    await db.migrations.insert_one({"_id": "sms_logs_to_conversations", "done_at": datetime.now(timezone.utc).isoformat(), "copied": copied})
+    logger.info(f"Copied {copied} SMS logs into sms_conversations")
 
 @api_router.post("/sms/test")
 async def test_sms(phone: str, message: str = "Prueba de SMS desde CARPLUS CRM", current_user: dict = Depends(get_current_user)):
@@ -3081,7 +2995,7 @@ async def send_documents_sms(client_id: str, record_id: str, current_user: dict
         "sent_at": datetime.now(timezone.utc).isoformat(),
         "sent_by": current_user["id"]
     }
-    await db.sms_logs.insert_one(sms_log)
+    await log_outbound_sms(sms_log)
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=f"Failed to send SMS: {result.get('error')}")
@@ -3257,12 +3171,7 @@ async def send_appointment_sms(client_id: str, appointment_id: str, current_user
     # Get dealer address if available
     dealer_location = dealer_name
     if dealer_name:
-        dealer_doc = await db.config_lists.find_one(
-            {"category": "dealer", "name": dealer_name},
-            {"_id": 0, "address": 1}
-        )
-        if dealer_doc and dealer_doc.get("address"):
-            dealer_location = dealer_doc["address"]
+        dealer_location = await get_dealer_address(dealer_name) or dealer_name
     
     if appointment.get("language") == "es":
         message = f"Hola {client_name}, tiene una cita para el {date_str} a las {time_str} en {dealer_location}. Para ver, reprogramar o cancelar: {appointment_link} - DealerCRM"
@@ -3286,15 +3195,15 @@ async def send_appointment_sms(client_id: str, appointment_id: str, current_user
         "sent_at": datetime.now(timezone.utc).isoformat(),
         "sent_by": current_user["id"]
     }
-    await db.sms_logs.insert_one(sms_log)
+    await log_outbound_sms(sms_log)
     
     # Update appointment link_sent_at
     await db.appointments.update_one(
         {"id": appointment_id}, 
-        {"$set": {
+        {"$set": with_datetime_mirrors({
             "link_sent_at": datetime.now(timezone.utc).isoformat(),
             "last_sms_sent": datetime.now(timezone.utc).isoformat()
-        }}
+        })}
     )
     
     if not result["success"]:
@@ -3340,12 +3249,7 @@ async def send_appointment_email(client_id: str, appointment_id: str, current_us
     # Get dealer address if available (use full address instead of just name)
     dealer_str = dealer_name
     if dealer_name:
-        dealer_doc = await db.config_lists.find_one(
-            {"category": "dealer", "name": dealer_name},
-            {"_id": 0, "address": 1}
-        )
-        if dealer_doc and dealer_doc.get("address"):
-            dealer_str = dealer_doc["address"]
+        dealer_str = await get_dealer_address(dealer_name) or dealer_name
     
     email_body = f"""
 <html>
@@ -3498,7 +3402,7 @@ async def send_reminder_sms(client_id: str, record_id: str, current_user: dict =
         "sent_at": datetime.now(timezone.utc).isoformat(),
         "sent_by": current_user["id"]
     }
-    await db.sms_logs.insert_one(sms_log)
+    await log_outbound_sms(sms_log)
     
     # Update record with last reminder date
     await db.user_records.update_one(
@@ -3517,7 +3421,7 @@ async def process_weekly_reminders(current_user: dict = Depends(get_current_user
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    if not twilio_client:
+    if not get_twilio_client():
         return {"message": "Twilio not configured", "sent": 0, "skipped": 0}
     
     now = datetime.now(timezone.utc)
@@ -3570,7 +3474,7 @@ async def process_weekly_reminders(current_user: dict = Depends(get_current_user
                 "sent_by": "system_scheduler",
                 "automatic": True
             }
-            await db.sms_logs.insert_one(sms_log)
+            await log_outbound_sms(sms_log)
             
             if result["success"]:
                 sent_count += 1
@@ -3605,135 +3509,77 @@ async def get_sms_logs(client_id: Optional[str] = None, limit: int = 50, current
 
 # ==================== SMS INBOX & CONVERSATIONS ====================
 
-def is_valid_email(email: str) -> bool:
-    """Check if email is valid format"""
-    if not email or '@' not in email:
-        return False
-    # Basic email validation - must have @ and a domain
-    parts = email.split('@')
-    if len(parts) != 2:
-        return False
-    local, domain = parts
-    if not local or not domain:
-        return False
-    if '.' not in domain:
-        return False
-    # Exclude test/fake emails
-    fake_domains = ['dealer.com', 'test.com', 'example.com', 'localhost']
-    if any(domain.lower().endswith(fake) for fake in fake_domains):
-        logger.warning(f"Skipping email to test/fake domain: {email}")
-        return False
-    return True
-
-async def send_email_notification(to_email: str, subject: str, html_content: str) -> dict:
-    """
-    Send email notification using SMTP (FREE) or Resend (paid).
-    Supports Gmail, Outlook, Yahoo, etc.
-    """
-    # Validate email before sending
-    if not is_valid_email(to_email):
-        logger.warning(f"Invalid email address, skipping: {to_email}")
-        return {"success": False, "error": f"Invalid email: {to_email}"}
-    
-    # Try SMTP first (FREE)
-    if SMTP_USER and SMTP_PASSWORD:
-        try:
-            def send_smtp_email():
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = f"{SMTP_FROM_NAME} <{SMTP_USER}>"
-                msg['To'] = to_email
-                
-                # Create HTML part
-                html_part = MIMEText(html_content, 'html')
-                msg.attach(html_part)
-                
-                # Connect and send
-                with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-                    server.starttls()
-                    server.login(SMTP_USER, SMTP_PASSWORD)
-                    server.sendmail(SMTP_USER, to_email, msg.as_string())
-                
-                return True
-            
-            # Run in thread to not block async
-            result = await asyncio.to_thread(send_smtp_email)
-            logger.info(f"Email notification sent via SMTP to {to_email}")
-            return {"success": True, "method": "smtp"}
-            
-        except Exception as e:
-            logger.error(f"Failed to send email via SMTP: {str(e)}")
-            # Fall through to try Resend if configured
-    
-    # Try Resend as fallback (paid)
-    if RESEND_API_KEY:
-        try:
-            params = {
-                "from": SENDER_EMAIL,
-                "to": [to_email],
-                "subject": subject,
-                "html": html_content
-            }
-            email = await asyncio.to_thread(resend.Emails.send, params)
-            logger.info(f"Email notification sent via Resend to {to_email}")
-            return {"success": True, "email_id": email.get("id"), "method": "resend"}
-        except Exception as e:
-            logger.error(f"Failed to send email via Resend: {str(e)}")
-            return {"success": False, "error": str(e)}
-    
-    logger.warning("No email service configured - skipping email notification")
-    return {"success": False, "error": "Email not configured"}
+def encode_timeline_cursor(message: dict) -> str:
+    return base64.urlsafe_b64encode(f"{message.get('timestamp') or ''}|{message['id']}".encode()).decode()
+
+def decode_timeline_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, _, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return timestamp, message_id
+
+# Registered before /inbox/{client_id}, which would otherwise match "unread-count" as a client id
+@api_router.get("/inbox/unread-count")
+async def get_unread_count(current_user: dict = Depends(get_current_user)):
+    """Get total unread messages count for notification badge"""
+    count = await unread_counters.get(INBOX_TOTAL)
+    return {"unread_count": count}
 
 @api_router.get("/inbox/{client_id}")
-async def get_client_inbox(client_id: str, current_user: dict = Depends(get_current_user)):
-    """Get all SMS messages for a client (conversation inbox)"""
+async def get_client_inbox(
+    client_id: str,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get a page of a client's SMS conversation, oldest first.
+
+    Without a cursor returns the latest `limit` messages. `before` pages back
+    to older messages and `after` fetches anything newer (for polling); use the
+    before_cursor / after_cursor values from a previous response.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    limit = max(1, min(limit, 200))
+    
     # Get client info
     client = await db.clients.find_one({"id": client_id}, {"_id": 0})
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    # Get all messages for this client (both sent and received)
-    messages = await db.sms_conversations.find(
-        {"client_id": client_id},
-        {"_id": 0}
-    ).sort("timestamp", 1).to_list(500)
-    
-    # Also get SMS logs for historical messages
-    sms_logs = await db.sms_logs.find(
-        {"client_id": client_id},
-        {"_id": 0}
-    ).sort("sent_at", 1).to_list(500)
-    
-    # Merge logs into conversation format if not already in conversations
-    existing_sids = {m.get("twilio_sid") for m in messages if m.get("twilio_sid")}
-    for log in sms_logs:
-        if log.get("twilio_sid") and log["twilio_sid"] not in existing_sids:
-            messages.append({
-                "id": log.get("id", str(uuid.uuid4())),
-                "client_id": client_id,
-                "direction": "outbound",
-                "message": log.get("message", ""),
-                "timestamp": log.get("sent_at"),
-                "sender_id": log.get("sent_by"),
-                "sender_name": log.get("sender_name", "System"),
-                "twilio_sid": log.get("twilio_sid"),
-                "status": log.get("status", "sent")
-            })
-    
-    # Sort by timestamp
-    messages.sort(key=lambda x: x.get("timestamp", ""))
-    
-    # Get unread count
-    unread_count = await db.sms_conversations.count_documents({
-        "client_id": client_id,
-        "direction": "inbound",
-        "is_read": False
-    })
+    # Keyset pagination on (timestamp, id), served by the (client_id, timestamp, id) index
+    query = {"client_id": client_id}
+    if after:
+        timestamp, message_id = decode_timeline_cursor(after)
+        query["$or"] = [{"timestamp": {"$gt": timestamp}}, {"timestamp": timestamp, "id": {"$gt": message_id}}]
+        sort_direction = 1
+    else:
+        if before:
+            timestamp, message_id = decode_timeline_cursor(before)
+            query["$or"] = [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "id": {"$lt": message_id}}]
+        sort_direction = -1
+    
+    # One extra row tells us whether there is another page in that direction
+    messages = await db.sms_conversations.find(query, {"_id": 0}).sort(
+        [("timestamp", sort_direction), ("id", sort_direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if sort_direction == -1:
+        messages.reverse()
+    
+    unread_count = await unread_counters.get(inbox_key(client_id))
     
     return {
         "client": client,
         "messages": messages,
-        "unread_count": unread_count
+        "unread_count": unread_count,
+        "has_more": has_more,  # another page exists in the requested direction
+        "before_cursor": encode_timeline_cursor(messages[0]) if messages else before,
+        "after_cursor": encode_timeline_cursor(messages[-1]) if messages else after
     }
 
 @api_router.post("/inbox/{client_id}/send")
@@ -3783,19 +3629,15 @@ async def mark_messages_read(client_id: str, current_user: dict = Depends(get_cu
     """Mark all inbound messages for a client as read"""
     result = await db.sms_conversations.update_many(
         {"client_id": client_id, "direction": "inbound", "is_read": False},
-        {"$set": {"read": True, "read_by": current_user["id"], "read_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"is_read": True, "read": True, "read_by": current_user["id"], "read_at": datetime.now(timezone.utc).isoformat()}}
     )
+    if result.modified_count:
+        await unread_counters.increment({
+            inbox_key(client_id): -result.modified_count,
+            INBOX_TOTAL: -result.modified_count
+        })
     return {"message": f"Marked {result.modified_count} messages as read"}
 
-@api_router.get("/inbox/unread-count")
-async def get_unread_count(current_user: dict = Depends(get_current_user)):
-    """Get total unread messages count for notification badge"""
-    count = await db.sms_conversations.count_documents({
-        "direction": "inbound",
-        "is_read": False
-    })
-    return {"unread_count": count}
-
 @api_router.get("/notifications")
 async def get_notifications(current_user: dict = Depends(get_current_user), limit: int = 20):
     """Get in-app notifications for the current user"""
@@ -3804,17 +3646,15 @@ async def get_notifications(current_user: dict = Depends(get_current_user), limi
         {"_id": 0}
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
-    unread_count = await db.notifications.count_documents({
-        "user_id": current_user["id"],
-        "is_read": False
-    })
+    unread_count = await unread_counters.get(notifications_key(current_user["id"]))
     
     return {"notifications": notifications, "unread_count": unread_count}
 
 @api_router.post("/notifications/mark-read")
 async def mark_notifications_read(notification_ids: List[str] = None, current_user: dict = Depends(get_current_user)):
     """Mark notifications as read"""
-    query = {"user_id": current_user["id"]}
+    # Only unread ones, so modified_count is exactly the number of badge decrements
+    query = {"user_id": current_user["id"], "is_read": False}
     if notification_ids:
         query["id"] = {"$in": notification_ids}
     
@@ -3822,167 +3662,288 @@ async def mark_notifications_read(notification_ids: List[str] = None, current_us
         query,
         {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc).isoformat()}}
     )
+    if result.modified_count:
+        await unread_counters.increment({notifications_key(current_user["id"]): -result.modified_count})
     return {"message": f"Marked {result.modified_count} notifications as read"}
 
+@api_router.get("/events/stream")
+async def stream_events(request: Request, token: Optional[str] = None):
+    """
+    Server-Sent Events stream of the current user's new notifications and inbound SMS.
+    EventSource cannot send headers, so the JWT may be passed as ?token=.
+
+    Events: "snapshot" (unread counts, once on connect), "notification",
+    "sms_received" ({id, client_id, timestamp} for inbound SMS of the user's
+    clients, or of every client for inbox supervisors) and "resync" (events
+    were dropped - refetch).
+    """
+    if not token:
+        auth_header = request.headers.get("authorization", "")
+        token = auth_header[7:] if auth_header.lower().startswith("bearer ") else None
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    current_user = await get_user_from_token(token)
+    
+    subscription = event_bus.subscribe(current_user["id"], current_user.get("role"))
+    
+    async def event_generator():
+        try:
+            counts = await unread_counters.get_many([notifications_key(current_user["id"]), INBOX_TOTAL])
+            yield format_sse("snapshot", {
+                "notifications_unread": counts[notifications_key(current_user["id"])],
+                "inbox_unread": counts[INBOX_TOTAL]
+            })
+            
+            while True:
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield format_sse("resync", {})
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event["type"], event["data"])
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==================== TWILIO WEBHOOK (Receive SMS) ====================
 
-@app.post("/webhook/twilio/sms")
-async def twilio_sms_webhook(request: Request):
+async def process_inbound_sms(item: dict):
     """
-    Webhook endpoint to receive incoming SMS messages from Twilio.
-    Configure this URL in your Twilio console: https://your-domain.com/webhook/twilio/sms
+    Queue consumer for inbound SMS: match the sender to a client, store the
+    message and notify the assigned salespeople. Safe to run more than once
+    for the same message: storing is an upsert on the Twilio SID and each
+    side effect is a queue step, so a retry after a partial failure only
+    redoes the steps that had not finished.
     """
-    try:
-        form_data = await request.form()
+    form_data = item["payload"]
+    from_number = form_data.get("From", "")
+    body = form_data.get("Body", "")
+    message_sid = item["key"]
+    
+    now = datetime.fromisoformat(item["received_at"])
+    
+    # Find client by the indexed canonical phone key (last 10 digits)
+    normalized_phone = re.sub(r'[^\d+]', '', from_number)
+    phone_key = phone_lookup_key(from_number)
+    client = None
+    if phone_key:
+        client = await db.clients.find_one(
+            {"phone_key": phone_key},
+            {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "phone": 1,
+             "collaboration_users": 1, "last_active_user_id": 1}
+        )
+    
+    if not client:
+        # Try imported contacts
+        contact = await db.imported_contacts.find_one({
+            "phone_formatted": {"$in": list({from_number, normalized_phone})}
+        }, {"_id": 0})
         
-        from_number = form_data.get("From", "")
-        to_number = form_data.get("To", "")
-        body = form_data.get("Body", "")
-        message_sid = form_data.get("MessageSid", "")
+        if contact:
+            client = {
+                "id": contact["id"],
+                "first_name": contact.get("first_name", ""),
+                "last_name": contact.get("last_name", ""),
+                "phone": contact.get("phone_formatted", from_number),
+                "is_imported_contact": True
+            }
+    
+    if client:
+        # Store the message
+        conversation_msg = {
+            "id": str(uuid.uuid4()),
+            "client_id": client["id"],
+            "direction": "inbound",
+            "message": body,
+            "timestamp": now.isoformat(),
+            "from_phone": from_number,
+            "twilio_sid": message_sid,
+            "status": "received",
+            "is_read": False
+        }
+        # Keyed on the Twilio SID so a re-processed queue item never stores the message twice
+        conversation_msg = await db.sms_conversations.find_one_and_update(
+            {"twilio_sid": message_sid, "direction": "inbound"},
+            {"$setOnInsert": conversation_msg},
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
         
-        logger.info(f"Received SMS from {from_number}: {body[:50]}...")
+        await inbound_sms_queue.run_step(
+            item, "unread_counter",
+            lambda: unread_counters.increment({inbox_key(client["id"]): 1, INBOX_TOTAL: 1})
+        )
         
-        now = datetime.now(timezone.utc)
+        # Update client's last activity
+        await db.clients.update_one(
+            {"id": client["id"]},
+            {"$set": {
+                "last_sms_activity": now.isoformat(),
+                "last_client_response": now.isoformat()
+            }}
+        )
         
-        # Find client by phone number
-        # Normalize phone number for matching
-        normalized_phone = re.sub(r'[^\d+]', '', from_number)
-        client = await db.clients.find_one({
-            "$or": [
-                {"phone": from_number},
-                {"phone": normalized_phone},
-                {"phone": {"$regex": normalized_phone[-10:] + "$"}}
-            ]
-        }, {"_id": 0})
+        # Find assigned salesperson(s) - get the most recent record's salesperson
+        recent_record = await db.user_records.find_one(
+            {"client_id": client["id"]},
+            {"_id": 0, "salesperson_id": 1},
+            sort=[("created_at", -1)]
+        )
         
-        if not client:
-            # Try imported contacts
-            contact = await db.imported_contacts.find_one({
-                "$or": [
-                    {"phone_formatted": from_number},
-                    {"phone_formatted": normalized_phone}
-                ]
-            }, {"_id": 0})
-            
-            if contact:
-                client = {
-                    "id": contact["id"],
-                    "first_name": contact.get("first_name", ""),
-                    "last_name": contact.get("last_name", ""),
-                    "phone": contact.get("phone_formatted", from_number),
-                    "is_imported_contact": True
-                }
+        salespeople_to_notify = set()
         
-        if client:
-            # Store the message
-            conversation_msg = {
+        if recent_record and recent_record.get("salesperson_id"):
+            salespeople_to_notify.add(recent_record["salesperson_id"])
+        
+        # Also check if there's a collaboration
+        if client.get("collaboration_users"):
+            salespeople_to_notify.update(client["collaboration_users"])
+        
+        # Also check last_active_user_id
+        if client.get("last_active_user_id"):
+            salespeople_to_notify.add(client["last_active_user_id"])
+        
+        # Create notifications for each salesperson
+        client_name = f"{client.get('first_name', '')} {client.get('last_name', '')}".strip() or "Unknown Client"
+        
+        # One query for every recipient, one write for every notification
+        users = []
+        if salespeople_to_notify:
+            users = await db.users.find(
+                {"id": {"$in": list(salespeople_to_notify)}},
+                {"_id": 0, "id": 1, "email": 1}
+            ).to_list(len(salespeople_to_notify))
+        
+        notifications = [
+            {
                 "id": str(uuid.uuid4()),
+                "user_id": user["id"],
+                "type": "sms_received",
+                "title": f"Nuevo SMS de {client_name}",
+                "message": body[:100] + ("..." if len(body) > 100 else ""),
                 "client_id": client["id"],
-                "direction": "inbound",
-                "message": body,
-                "timestamp": now.isoformat(),
-                "from_phone": from_number,
-                "twilio_sid": message_sid,
-                "status": "received",
-                "is_read": False
+                "client_name": client_name,
+                "is_read": False,
+                "created_at": now.isoformat()
             }
-            await db.sms_conversations.insert_one(conversation_msg)
-            
-            # Update client's last activity
-            await db.clients.update_one(
-                {"id": client["id"]},
-                {"$set": {
-                    "last_sms_activity": now.isoformat(),
-                    "last_client_response": now.isoformat()
-                }}
-            )
-            
-            # Find assigned salesperson(s) - get the most recent record's salesperson
-            recent_record = await db.user_records.find_one(
-                {"client_id": client["id"]},
-                {"_id": 0}
-            )
-            
-            salespeople_to_notify = set()
-            
-            if recent_record and recent_record.get("salesperson_id"):
-                salespeople_to_notify.add(recent_record["salesperson_id"])
-            
-            # Also check if there's a collaboration
-            if client.get("collaboration_users"):
-                salespeople_to_notify.update(client["collaboration_users"])
-            
-            # Also check last_active_user_id
-            if client.get("last_active_user_id"):
-                salespeople_to_notify.add(client["last_active_user_id"])
-            
-            # Create notifications for each salesperson
-            client_name = f"{client.get('first_name', '')} {client.get('last_name', '')}".strip() or "Unknown Client"
-            
-            for user_id in salespeople_to_notify:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if not user:
-                    continue
-                
-                # Create in-app notification
-                notification = {
-                    "id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "type": "sms_received",
-                    "title": f"Nuevo SMS de {client_name}",
-                    "message": body[:100] + ("..." if len(body) > 100 else ""),
-                    "client_id": client["id"],
-                    "client_name": client_name,
-                    "is_read": False,
-                    "created_at": now.isoformat()
-                }
-                await db.notifications.insert_one(notification)
-                
+            for user in users
+        ]
+        async def notify():
+            await insert_notifications(*notifications)
+            # Only the people working this client and the inbox supervisors, and without the message itself
+            event_bus.publish_to(inbox_channels(salespeople_to_notify), "sms_received", sms_event(conversation_msg))
+        await inbound_sms_queue.run_step(item, "notifications", notify)
+        
+        async def send_emails():
+            sends = []
+            for user in users:
                 # Send email notification if user has email
-                if user.get("email"):
-                    email_html = f"""
-                    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                        <h2 style="color: #3b82f6;">📱 Nuevo mensaje SMS</h2>
-                        <p><strong>Cliente:</strong> {client_name}</p>
-                        <p><strong>Teléfono:</strong> {from_number}</p>
-                        <div style="background-color: #f1f5f9; padding: 15px; border-radius: 8px; margin: 15px 0;">
-                            <p style="margin: 0; color: #334155;">{body}</p>
-                        </div>
-                        <p style="color: #64748b; font-size: 12px;">
-                            Responde desde el CRM para mantener el historial de conversación.
-                        </p>
+                if not user.get("email"):
+                    continue
+                email_html = f"""
+                <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                    <h2 style="color: #3b82f6;">📱 Nuevo mensaje SMS</h2>
+                    <p><strong>Cliente:</strong> {client_name}</p>
+                    <p><strong>Teléfono:</strong> {from_number}</p>
+                    <div style="background-color: #f1f5f9; padding: 15px; border-radius: 8px; margin: 15px 0;">
+                        <p style="margin: 0; color: #334155;">{body}</p>
                     </div>
-                    """
-                    # Send email in background (don't wait)
-                    asyncio.create_task(send_email_notification(
-                        user["email"],
-                        f"Nuevo SMS de {client_name}",
-                        email_html
-                    ))
-            
-            logger.info(f"Processed incoming SMS from {from_number} for client {client['id']}")
-        else:
-            # Unknown sender - log it anyway
-            unknown_msg = {
-                "id": str(uuid.uuid4()),
-                "client_id": None,
-                "direction": "inbound",
-                "message": body,
-                "timestamp": now.isoformat(),
-                "from_phone": from_number,
-                "twilio_sid": message_sid,
-                "status": "received_unknown",
-                "is_read": False
-            }
-            await db.sms_conversations.insert_one(unknown_msg)
-            logger.warning(f"Received SMS from unknown number: {from_number}")
+                    <p style="color: #64748b; font-size: 12px;">
+                        Responde desde el CRM para mantener el historial de conversación.
+                    </p>
+                </div>
+                """
+                sends.append(send_email_notification(user["email"], f"Nuevo SMS de {client_name}", email_html))
+            # Awaited (this runs in the queue consumer, not the webhook) so the step is only recorded once sent
+            await asyncio.gather(*sends)
+        await inbound_sms_queue.run_step(item, "emails", send_emails)
+        
+        logger.info(f"Processed incoming SMS from {from_number} for client {client['id']}")
+    else:
+        # Unknown sender - log it anyway
+        unknown_msg = {
+            "id": str(uuid.uuid4()),
+            "client_id": None,
+            "direction": "inbound",
+            "message": body,
+            "timestamp": now.isoformat(),
+            "from_phone": from_number,
+            "twilio_sid": message_sid,
+            "status": "received_unknown",
+            "is_read": False
+        }
+        unknown_msg = await db.sms_conversations.find_one_and_update(
+            {"twilio_sid": message_sid, "direction": "inbound"},
+            {"$setOnInsert": unknown_msg},
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        async def count_unread():
+            await unread_counters.increment({INBOX_TOTAL: 1})
+            # Unknown sender: inbox supervisors only
+            event_bus.publish_to(inbox_channels(), "sms_received", sms_event(unknown_msg))
+        await inbound_sms_queue.run_step(item, "unread_counter", count_unread)
+        logger.warning(f"Received SMS from unknown number: {from_number}")
+
+inbound_sms_queue = WebhookQueue(db, "inbound_sms_queue", process_inbound_sms)
+
+@app.on_event("startup")
+async def start_inbound_sms_consumer():
+    inbound_sms_queue.start()
+
+@app.on_event("shutdown")
+async def stop_inbound_sms_consumer():
+    await inbound_sms_queue.stop()
+
+@app.post("/webhook/twilio/sms")
+async def twilio_sms_webhook(request: Request):
+    """
+    Webhook endpoint to receive incoming SMS messages from Twilio.
+    Configure this URL in your Twilio console: https://your-domain.com/webhook/twilio/sms
+
+    Only stores the message in the inbound queue and answers right away, so
+    Twilio never retries because of a slow response. Matching, notifications
+    and emails are handled by process_inbound_sms(). Deliveries are
+    deduplicated on MessageSid.
+    """
+    try:
+        form_data = await request.form()
+        payload = {
+            "From": form_data.get("From", ""),
+            "To": form_data.get("To", ""),
+            "Body": form_data.get("Body", ""),
+            "MessageSid": form_data.get("MessageSid", ""),
+        }
+        message_sid = payload["MessageSid"] or f"local-{uuid.uuid4()}"
         
-        # Return TwiML response (empty response = don't auto-reply)
-        return '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+        logger.info(f"Received SMS from {payload['From']}: {payload['Body'][:50]}...")
         
+        if not await inbound_sms_queue.enqueue(message_sid, payload):
+            logger.info(f"Duplicate Twilio delivery for {message_sid} - ignored")
     except Exception as e:
-        logger.error(f"Error processing Twilio webhook: {str(e)}")
-        return '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+        # Not stored: let Twilio retry / use the fallback URL
+        logger.error(f"Error enqueueing Twilio webhook: {str(e)}")
+        return Response(status_code=503)
+    
+    # Return TwiML response (empty response = don't auto-reply)
+    return Response(
+        content='<?xml version="1.0" encoding="UTF-8"?><Response></Response>',
+        media_type="application/xml"
+    )
 
 # ==================== CLIENT COLLABORATION ====================
 
@@ -4033,7 +3994,7 @@ async def request_collaboration(client_id: str, current_user: dict = Depends(get
         "is_read": False,
         "created_at": now
     }
-    await db.notifications.insert_one(notification)
+    await insert_notifications(notification)
     
     # Send email notification
     if original_user.get("email"):
@@ -4101,7 +4062,7 @@ async def respond_to_collaboration(request_id: str, accept: bool, current_user:
             "is_read": False,
             "created_at": now
         }
-        await db.notifications.insert_one(notification)
+        await insert_notifications(notification)
         
         return {"message": "Collaboration accepted", "client_id": collab_request["client_id"]}
     else:
@@ -4122,7 +4083,7 @@ async def respond_to_collaboration(request_id: str, accept: bool, current_user:
             "is_read": False,
             "created_at": now
         }
-        await db.notifications.insert_one(notification)
+        await insert_notifications(notification)
         
         return {"message": "Collaboration rejected"}
 
@@ -4137,10 +4098,7 @@ async def check_import_duplicates(file: UploadFile = File(...), current_user: di
     try:
         content = await file.read()
         
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content))
-        else:
-            df = pd.read_excel(io.BytesIO(content))
+        df = read_spreadsheet(content, file.filename)
         
         # Normalize column names
         df.columns = df.columns.str.strip().str.lower()
@@ -4290,6 +4248,8 @@ async def create_public_link(client_id: str, record_id: str, link_type: str) ->
         "link_type": link_type,  # 'documents' or 'appointment'
         "created_at": datetime.now(timezone.utc).isoformat(),
         "expires_at": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+        # Same instant as a BSON date - TTL indexes only act on dates
+        "expire_at": datetime.now(timezone.utc) + timedelta(days=30),
         "used": False
     }
     await db.public_links.insert_one(link_doc)
@@ -4406,6 +4366,10 @@ async def upload_public_documents(
     upload_dir = Path(__file__).parent / "uploads" / "clients" / client_id
     upload_dir.mkdir(parents=True, exist_ok=True)
     
+    # Staging area for streamed uploads (removed once the combined PDFs are written)
+    staging_dir = upload_dir / f".staging_{uuid.uuid4().hex[:8]}"
+    staging_dir.mkdir()
+    
     async def combine_files_to_pdf(files: List[UploadFile], output_name: str) -> str:
         """Combine multiple files (images/PDFs) into a single PDF"""
         if not files:
@@ -4413,14 +4377,15 @@ async def upload_public_documents(
         
         pdf_writer = PdfWriter()
         
-        for file in files:
-            content = await file.read()
-            await file.seek(0)  # Reset for potential reuse
+        for index, file in enumerate(files):
+            # Stream to disk in chunks instead of loading the whole upload into memory
+            staged_path = staging_dir / f"{output_name}_{index}"
+            await save_upload_stream(file, staged_path, MAX_UPLOAD_SIZE_BYTES)
             
             if file.content_type == 'application/pdf':
                 # Add PDF pages directly
                 try:
-                    pdf_reader = PdfReader(io.BytesIO(content))
+                    pdf_reader = PdfReader(str(staged_path))
                     for page in pdf_reader.pages:
                         pdf_writer.add_page(page)
                 except Exception as e:
@@ -4428,7 +4393,7 @@ async def upload_public_documents(
             elif file.content_type.startswith('image/'):
                 # Convert image to PDF page
                 try:
-                    img = PILImage.open(io.BytesIO(content))
+                    img = PILImage.open(staged_path)
                     
                     # Convert to RGB if necessary
                     if img.mode in ('RGBA', 'LA', 'P'):
@@ -4498,29 +4463,33 @@ async def upload_public_documents(
         "preferred_language": language
     }
     
-    # Process ID documents
-    if id_documents and len(id_documents) > 0 and id_documents[0].filename:
-        id_path = await combine_files_to_pdf(id_documents, "id_document")
-        if id_path:
-            update_data["id_uploaded"] = True
-            update_data["id_file_url"] = id_path
-    
-    # Process Income documents
-    if income_documents and len(income_documents) > 0 and income_documents[0].filename:
-        income_path = await combine_files_to_pdf(income_documents, "income_proof")
-        if income_path:
-            update_data["income_proof_uploaded"] = True
-            update_data["income_proof_file_url"] = income_path
-    
-    # Process Residence documents
-    if residence_documents and len(residence_documents) > 0 and residence_documents[0].filename:
-        residence_path = await combine_files_to_pdf(residence_documents, "residence_proof")
-        if residence_path:
-            update_data["residence_proof_uploaded"] = True
-            update_data["residence_proof_file_url"] = residence_path
+    try:
+        # Process ID documents
+        if id_documents and len(id_documents) > 0 and id_documents[0].filename:
+            id_path = await combine_files_to_pdf(id_documents, "id_document")
+            if id_path:
+                update_data["id_uploaded"] = True
+                update_data["id_file_url"] = id_path
+        
+        # Process Income documents
+        if income_documents and len(income_documents) > 0 and income_documents[0].filename:
+            income_path = await combine_files_to_pdf(income_documents, "income_proof")
+            if income_path:
+                update_data["income_proof_uploaded"] = True
+                update_data["income_proof_file_url"] = income_path
+        
+        # Process Residence documents
+        if residence_documents and len(residence_documents) > 0 and residence_documents[0].filename:
+            residence_path = await combine_files_to_pdf(residence_documents, "residence_proof")
+            if residence_path:
+                update_data["residence_proof_uploaded"] = True
+                update_data["residence_proof_file_url"] = residence_path
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
     
     # Update client with document info
     await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    combined_pdf_cache.invalidate(client_id)
     
     # Also update record if exists
     if link.get("record_id"):
@@ -4557,18 +4526,13 @@ async def get_public_appointment_info(token: str):
     client = await db.clients.find_one({"id": client_id}, {"_id": 0})
     
     # Get dealers list for rescheduling
-    dealers = await db.config_lists.find({"category": "dealer"}, {"_id": 0}).to_list(100)
+    dealers = (await cached_config_list("dealer")).value
     
     # Get full dealer address for current appointment
     dealer_name = appointment.get("dealer", "")
     dealer_address = dealer_name  # Default to name if no address found
     if dealer_name:
-        dealer_doc = await db.config_lists.find_one(
-            {"category": "dealer", "name": dealer_name},
-            {"_id": 0, "address": 1}
-        )
-        if dealer_doc and dealer_doc.get("address"):
-            dealer_address = dealer_doc["address"]
+        dealer_address = await get_dealer_address(dealer_name) or dealer_name
     
     # Add dealer_address to appointment for display
     appointment_with_address = {**appointment, "dealer_address": dealer_address}
@@ -4721,7 +4685,7 @@ async def notify_late_arrival(token: str, data: LateArrivalRequest):
         salesperson = await db.users.find_one({"id": record.get("salesperson_id")}, {"_id": 0})
         
         # Send SMS to salesperson if they have a phone number
-        if salesperson and salesperson.get("phone") and twilio_client:
+        if salesperson and salesperson.get("phone") and get_twilio_client():
             message = f"AVISO: {client_name} llegará tarde a su cita. Hora original: {original_time}. Nueva hora de llegada: {data.new_time}. - DealerCRM"
             result = await send_sms_twilio(salesperson["phone"], message)
             
@@ -4740,7 +4704,7 @@ async def notify_late_arrival(token: str, data: LateArrivalRequest):
                 "sent_by": "client_public",
                 "automatic": True
             }
-            await db.sms_logs.insert_one(sms_log)
+            await log_outbound_sms(sms_log)
             logger.info(f"Late notification sent to salesperson {salesperson['name']}: {result}")
     
     # Update appointment with late arrival info
@@ -4763,9 +4727,9 @@ class SMSTemplateUpdate(BaseModel):
     message_en: str
     message_es: str
 
-@api_router.get("/sms-templates")
-async def get_sms_templates(current_user: dict = Depends(get_current_user)):
-    """Get all SMS templates"""
+SMS_TEMPLATES_CACHE_KEY = "sms_templates"
+
+async def load_sms_templates() -> list:
     templates = await db.sms_templates.find({}, {"_id": 0}).to_list(100)
     
     # If no templates exist, create defaults
@@ -4775,6 +4739,16 @@ async def get_sms_templates(current_user: dict = Depends(get_current_user)):
     
     return templates
 
+async def find_sms_template(template_key: str) -> Optional[dict]:
+    """Template document by key, from the cached template list"""
+    templates = await reference_cache.value(SMS_TEMPLATES_CACHE_KEY, load_sms_templates)
+    return next((template for template in templates if template.get("template_key") == template_key), None)
+
+@api_router.get("/sms-templates")
+async def get_sms_templates(request: Request, current_user: dict = Depends(get_current_user)):
+    """Get all SMS templates (cached; supports If-None-Match)"""
+    return cached_json_response(request, await reference_cache.get(SMS_TEMPLATES_CACHE_KEY, load_sms_templates))
+
 @api_router.put("/sms-templates/{template_key}")
 async def update_sms_template(template_key: str, data: SMSTemplateUpdate, current_user: dict = Depends(get_current_user)):
     """Update an SMS template (admin only)"""
@@ -4793,6 +4767,7 @@ async def update_sms_template(template_key: str, data: SMSTemplateUpdate, curren
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Template not found")
+    reference_cache.invalidate(SMS_TEMPLATES_CACHE_KEY)
     
     return {"message": "Template updated successfully"}
 
@@ -4837,11 +4812,12 @@ async def initialize_default_sms_templates():
         }
     ]
     await db.sms_templates.insert_many(templates)
+    reference_cache.invalidate(SMS_TEMPLATES_CACHE_KEY)
     logger.info("Initialized default SMS templates")
 
 async def get_sms_template(template_key: str, language: str = "en") -> str:
     """Get SMS template message by key and language"""
-    template = await db.sms_templates.find_one({"template_key": template_key}, {"_id": 0})
+    template = await find_sms_template(template_key)
     if not template:
         return ""
     return template.get(f"message_{language}", template.get("message_en", ""))
@@ -4889,10 +4865,7 @@ async def import_contacts(file: UploadFile = File(...), current_user: dict = Dep
         contents = await file.read()
         
         # Read file based on type
-        if filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        df = read_spreadsheet(contents, filename)
         
         # Normalize column names (lowercase, strip spaces)
         df.columns = df.columns.str.lower().str.strip()
@@ -4949,6 +4922,7 @@ async def import_contacts(file: UploadFile = File(...), current_user: dict = Dep
                 "sms_sent": False,
                 "sms_count": 0,
                 "last_sms_sent": None,
+                "last_sms_sent_dt": None,
                 "next_sms_scheduled": None,
                 "appointment_created": False,
                 "appointment_id": None,
@@ -4991,7 +4965,7 @@ async def get_imported_contacts(
     contacts = await db.imported_contacts.find(query, {"_id": 0}).sort("imported_at", -1).skip(skip).limit(limit).to_list(limit)
     total = await db.imported_contacts.count_documents(query)
     
-    return {"contacts": contacts, "total": total}
+    return FastJSONResponse({"contacts": contacts, "total": total})
 
 @api_router.post("/imported-contacts/{contact_id}/send-sms-now")
 async def send_marketing_sms_now(contact_id: str, current_user: dict = Depends(get_current_user)):
@@ -5029,13 +5003,13 @@ async def send_marketing_sms_now(contact_id: str, current_user: dict = Depends(g
     # Update contact
     await db.imported_contacts.update_one(
         {"id": contact_id},
-        {"$set": {
+        {"$set": with_datetime_mirrors({
             "sms_sent": True,
             "sms_count": contact.get("sms_count", 0) + 1,
             "last_sms_sent": now,
             "status": "contacted",
             "next_sms_scheduled": None  # Clear scheduled since we sent now
-        }}
+        })}
     )
     
     # Log SMS
@@ -5051,7 +5025,7 @@ async def send_marketing_sms_now(contact_id: str, current_user: dict = Depends(g
         "sent_at": now,
         "sent_by": current_user["id"]
     }
-    await db.sms_logs.insert_one(sms_log)
+    await log_outbound_sms(sms_log)
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=f"Failed to send SMS: {result.get('error')}")
@@ -5099,119 +5073,6 @@ async def toggle_client_opt_out(client_id: str, opt_out: bool, current_user: dic
     
     return {"message": f"Client SMS {'disabled' if opt_out else 'enabled'} successfully"}
 
-# ==================== CONFIGURABLE LISTS (Banks, Dealers, Cars) ====================
-
-class ConfigListItem(BaseModel):
-    name: str
-    category: str  # 'bank', 'dealer', 'car'
-    address: Optional[str] = None  # Only for dealers
-
-class ConfigListItemResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    name: Optional[str] = None  # For banks, dealers, cars
-    value: Optional[str] = None  # For id_type, poi_type, por_type
-    category: str
-    address: Optional[str] = None
-    created_at: Optional[str] = None
-    created_by: Optional[str] = None
-
-@api_router.get("/config-lists/{category}", response_model=List[ConfigListItemResponse])
-async def get_config_list(category: str, current_user: dict = Depends(get_current_user)):
-    """Get all items in a configurable list"""
-    valid_categories = ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']
-    if category not in valid_categories:
-        raise HTTPException(status_code=400, detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}")
-    
-    items = await db.config_lists.find({"category": category}, {"_id": 0}).to_list(1000)
-    
-    # Normalize items - ensure 'name' field exists for frontend compatibility
-    normalized_items = []
-    for item in items:
-        if 'value' in item and 'name' not in item:
-            item['name'] = item['value']
-        normalized_items.append(item)
-    
-    # Sort by name/value
-    normalized_items.sort(key=lambda x: x.get('name') or x.get('value') or '')
-    
-    return normalized_items
-
-@api_router.post("/config-lists", response_model=ConfigListItemResponse)
-async def create_config_list_item(item: ConfigListItem, current_user: dict = Depends(get_current_user)):
-    """Add a new item to a configurable list (admin only)"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    valid_categories = ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']
-    if item.category not in valid_categories:
-        raise HTTPException(status_code=400, detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}")
-    
-    # Check for duplicate
-    existing = await db.config_lists.find_one({"name": {"$regex": f"^{item.name}$", "$options": "i"}, "category": item.category})
-    if existing:
-        raise HTTPException(status_code=400, detail=f"{item.name} already exists in {item.category} list")
-    
-    item_doc = {
-        "id": str(uuid.uuid4()),
-        "name": item.name,
-        "category": item.category,
-        "address": item.address if item.category == "dealer" else None,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "created_by": current_user["id"]
-    }
-    await db.config_lists.insert_one(item_doc)
-    del item_doc["_id"]
-    return item_doc
-
-@api_router.delete("/config-lists/{item_id}")
-async def delete_config_list_item(item_id: str, current_user: dict = Depends(get_current_user)):
-    """Delete an item from a configurable list (admin only)"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    result = await db.config_lists.delete_one({"id": item_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return {"message": "Item deleted"}
-
-@api_router.put("/config-lists/{item_id}")
-async def update_config_list_item(item_id: str, item: ConfigListItem, current_user: dict = Depends(get_current_user)):
-    """Update an item in a configurable list (admin only)"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    update_data = {"name": item.name}
-    if item.category == "dealer" and item.address:
-        update_data["address"] = item.address
-    
-    result = await db.config_lists.update_one(
-        {"id": item_id},
-        {"$set": update_data}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    updated = await db.config_lists.find_one({"id": item_id}, {"_id": 0})
-    return updated
-
-# ==================== FORCE INITIALIZE CONFIG LISTS (Admin) ====================
-
-@api_router.post("/admin/init-config-lists")
-async def force_init_config_lists(current_user: dict = Depends(get_current_user)):
-    """Force initialize default config lists - Admin only"""
-    if current_user["role"] != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    await initialize_default_config_lists()
-    
-    # Return counts
-    counts = {}
-    for category in ['bank', 'dealer', 'car', 'id_type', 'poi_type', 'por_type']:
-        counts[category] = await db.config_lists.count_documents({"category": category})
-    
-    return {"message": "Config lists initialized", "counts": counts}
-
 # ==================== CLIENT DELETE (Admin) ====================
 
 @api_router.delete("/clients/{client_id}")
@@ -5231,6 +5092,7 @@ async def delete_client(client_id: str, permanent: bool = False, current_user: d
         await db.user_records.delete_many({"client_id": client_id})
         await db.appointments.delete_many({"client_id": client_id})
         await db.cosigner_relations.delete_many({"$or": [{"buyer_client_id": client_id}, {"cosigner_client_id": client_id}]})
+        client_suggest_index.remove(client_id)
         return {"message": "Client permanently deleted"}
     else:
         # Soft delete
@@ -5238,6 +5100,7 @@ async def delete_client(client_id: str, permanent: bool = False, current_user: d
             {"id": client_id},
             {"$set": {"is_deleted": True, "deleted_at": datetime.now(timezone.utc).isoformat()}}
         )
+        client_suggest_index.remove(client_id)
         return {"message": "Client moved to trash"}
 
 @api_router.post("/clients/{client_id}/restore")
@@ -5252,6 +5115,7 @@ async def restore_client(client_id: str, current_user: dict = Depends(get_curren
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Deleted client not found")
+    await client_suggest_index.refresh(db, client_id)
     return {"message": "Client restored"}
 
 # ==================== CLIENT ACCESS REQUESTS ====================
@@ -5305,7 +5169,7 @@ async def create_client_request(client_id: str, current_user: dict = Depends(get
         "is_read": False,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.notifications.insert_one(notif_doc)
+    await insert_notifications(notif_doc)
     
     return {"message": "Request sent", "request_id": request_doc["id"]}
 
@@ -5365,6 +5229,7 @@ async def respond_to_request(request_id: str, action: str, current_user: dict =
                 "transferred_at": datetime.now(timezone.utc).isoformat()
             }}
         )
+        await client_suggest_index.refresh(db, request.get("client_id"))
     
     # Notify the requester
     notif_doc = {
@@ -5376,7 +5241,7 @@ async def respond_to_request(request_id: str, action: str, current_user: dict =
         "is_read": False,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.notifications.insert_one(notif_doc)
+    await insert_notifications(notif_doc)
     
     return {"message": f"Request {action}"}
 
@@ -5389,7 +5254,7 @@ async def get_bdc_salesperson_performance(current_user: dict = Depends(get_curre
         raise HTTPException(status_code=403, detail="BDC Manager or Admin access required")
     
     # Get all active telemarketers (exclude inactive and deleted users)
-    salespeople = await db.users.find(
+    salespeople = await analytics_db.users.find(
         {
             "role": {"$in": ["salesperson", "telemarketer", "vendedor"]},
             "is_active": {"$ne": False},  # Only active users
@@ -5408,67 +5273,67 @@ async def get_bdc_salesperson_performance(current_user: dict = Depends(get_curre
         sp_id = sp["id"]
         
         # Clients created
-        clients_today = await db.clients.count_documents({
+        clients_today = await analytics_db.clients.count_documents({
             "created_by": sp_id,
             "is_deleted": {"$ne": True},
             "created_at": {"$gte": today.isoformat()}
         })
-        clients_week = await db.clients.count_documents({
+        clients_week = await analytics_db.clients.count_documents({
             "created_by": sp_id,
             "is_deleted": {"$ne": True},
             "created_at": {"$gte": week_ago.isoformat()}
         })
-        clients_month = await db.clients.count_documents({
+        clients_month = await analytics_db.clients.count_documents({
             "created_by": sp_id,
             "is_deleted": {"$ne": True},
             "created_at": {"$gte": month_ago.isoformat()}
         })
-        clients_total = await db.clients.count_documents({
+        clients_total = await analytics_db.clients.count_documents({
             "created_by": sp_id,
             "is_deleted": {"$ne": True}
         })
         
         # Appointments created
-        appts_today = await db.appointments.count_documents({
+        appts_today = await analytics_db.appointments.count_documents({
             "salesperson_id": sp_id,
             "created_at": {"$gte": today.isoformat()}
         })
-        appts_week = await db.appointments.count_documents({
+        appts_week = await analytics_db.appointments.count_documents({
             "salesperson_id": sp_id,
             "created_at": {"$gte": week_ago.isoformat()}
         })
-        appts_month = await db.appointments.count_documents({
+        appts_month = await analytics_db.appointments.count_documents({
             "salesperson_id": sp_id,
             "created_at": {"$gte": month_ago.isoformat()}
         })
         
         # Sales (completed records)
-        sales_today = await db.user_records.count_documents({
+        sales_today = await analytics_db.user_records.count_documents({
             "salesperson_id": sp_id,
             "record_status": "completed",
             "is_deleted": {"$ne": True},
             "updated_at": {"$gte": today.isoformat()}
         })
-        sales_week = await db.user_records.count_documents({
+        sales_week = await analytics_db.user_records.count_documents({
             "salesperson_id": sp_id,
             "record_status": "completed",
             "is_deleted": {"$ne": True},
             "updated_at": {"$gte": week_ago.isoformat()}
         })
-        sales_month = await db.user_records.count_documents({
+        sales_month = await analytics_db.user_records.count_documents({
             "salesperson_id": sp_id,
             "record_status": "completed",
             "is_deleted": {"$ne": True},
             "updated_at": {"$gte": month_ago.isoformat()}
         })
-        sales_total = await db.user_records.count_documents({
+        sales_total = await analytics_db.user_records.count_documents({
             "salesperson_id": sp_id,
             "record_status": "completed",
             "is_deleted": {"$ne": True}
         })
         
         # Records total
-        records_total = await db.user_records.count_documents({
+        records_total = await analytics_db.user_records.count_documents({
             "salesperson_id": sp_id,
             "is_deleted": {"$ne": True}
         })
@@ -5539,7 +5404,7 @@ async def download_backup(current_user: dict = Depends(get_current_user)):
         
         for collection_name in collections_to_backup:
             try:
-                collection = db[collection_name]
+                collection = analytics_db[collection_name]
                 # Get all documents, excluding MongoDB _id
                 documents = await collection.find({}, {"_id": 0}).to_list(length=None)
                 backup_data["collections"][collection_name] = documents
@@ -5623,6 +5488,14 @@ async def restore_backup(
         for collection_name in collections_to_restore:
             if collection_name in backup_data["collections"]:
                 documents = backup_data["collections"][collection_name]
+                if collection_name in DATETIME_FIELDS:
+                    # The backup holds the "<field>_dt" mirrors as strings; rebuild them as BSON dates
+                    for doc in documents:
+                        with_datetime_mirrors(doc, DATETIME_FIELDS[collection_name])
+                if collection_name == "public_links":
+                    # The backup holds expire_at as a string, which the TTL index ignores
+                    for doc in documents:
+                        doc["expire_at"] = public_link_expire_at(doc)
                 
                 if documents:
                     if merge_mode == "merge":
@@ -5671,6 +5544,10 @@ async def restore_backup(
         
         # Save restore log
         await db.restore_logs.insert_one(restore_log)
+        invalidate_config_lists()
+        reference_cache.invalidate(SMS_TEMPLATES_CACHE_KEY)
+        # The badge counters are derived from notifications and sms_conversations
+        await unread_counters.rebuild()
         
         total_docs = sum(
             s.get("total", s.get("replaced", 0)) if isinstance(s, dict) else s 
@@ -5736,6 +5613,9 @@ async def delete_all_data(current_user: dict = Depends(get_current_user)):
             "stats": delete_stats
         }
         await db.delete_logs.insert_one(delete_log)
+        invalidate_config_lists()
+        reference_cache.invalidate(SMS_TEMPLATES_CACHE_KEY)
+        await unread_counters.rebuild()
         
         total_deleted = sum(v for v in delete_stats.values() if isinstance(v, int))
         
@@ -5774,6 +5654,7 @@ async def reset_id_types(current_user: dict = Depends(get_current_user)):
                 "created_at": datetime.now(timezone.utc).isoformat()
             })
         
+        invalidate_config_lists()
         logger.info(f"ID Types reset by {current_user['email']}")
         
         return {
@@ -5808,10 +5689,10 @@ async def sync_sold_clients(current_user: dict = Depends(get_current_user)):
                 # Mark client as sold
                 await db.clients.update_one(
                     {"id": client_id},
-                    {"$set": {
+                    {"$set": with_datetime_mirrors({
                         "is_sold": True,
                         "sold_at": record["created_at"]
-                    }}
+                    })}
                 )
                 synced_count += 1
         
@@ -5827,6 +5708,33 @@ async def sync_sold_clients(current_user: dict = Depends(get_current_user)):
         logger.error(f"Sync sold clients error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error al sincronizar: {str(e)}")
 
+@api_router.post("/admin/documents/gc")
+async def run_document_gc(current_user: dict = Depends(get_current_user)):
+    """Delete unreferenced document blobs now (Admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await document_blobs.collect_garbage()
+    return {"message": "Limpieza de documentos completada", **result}
+
+@api_router.post("/admin/retention/run")
+async def run_retention(current_user: dict = Depends(get_current_user)):
+    """Archive old notifications and logs now (Admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await archiver.run()
+    return {"message": "Archivado completado", "collections": result}
+
+@api_router.post("/admin/unread-counters/rebuild")
+async def rebuild_unread_counters(current_user: dict = Depends(get_current_user)):
+    """Recompute notification and inbox badge counters from the data (Admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    rebuilt = await unread_counters.rebuild()
+    return {"message": "Contadores recalculados", "counters": rebuilt}
+
 @api_router.get("/admin/debug-clients")
 async def debug_clients(current_user: dict = Depends(get_current_user)):
     """Debug endpoint to check client ownership (Admin only)"""
@@ -5888,7 +5796,7 @@ async def get_scheduler_status(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     jobs = []
-    for job in scheduler.get_jobs():
+    for job in (scheduler.get_jobs() if scheduler is not None else []):
         jobs.append({
             "id": job.id,
             "name": job.name,
@@ -5911,7 +5819,7 @@ async def get_scheduler_status(current_user: dict = Depends(get_current_user)):
     })
     
     return {
-        "scheduler_running": scheduler.running,
+        "scheduler_running": scheduler is not None and scheduler.running,
         "jobs": jobs,
         "pending_stats": {
             "contacts_awaiting_initial_sms": pending_initial,
@@ -5938,71 +5846,6 @@ async def root():
 
 # ==================== PRE-QUALIFY SUBMISSIONS ====================
 
-class PreQualifySubmission(BaseModel):
-    email: str
-    firstName: str
-    lastName: str
-    phone: str
-    idNumber: Optional[str] = None
-    ssn: Optional[str] = None
-    dateOfBirth: Optional[str] = None
-    address: Optional[str] = None
-    city: Optional[str] = None
-    state: Optional[str] = None
-    zipCode: Optional[str] = None
-    housingType: Optional[str] = None
-    rentAmount: Optional[str] = None
-    # Time at address - separated fields
-    timeAtAddressYears: Optional[int] = None
-    timeAtAddressMonths: Optional[int] = None
-    employerName: Optional[str] = None
-    # Time with employer - separated fields
-    timeWithEmployerYears: Optional[int] = None
-    timeWithEmployerMonths: Optional[int] = None
-    incomeType: Optional[str] = None
-    netIncome: Optional[str] = None
-    incomeFrequency: Optional[str] = None
-    estimatedDownPayment: Optional[str] = None
-    consentAccepted: bool = False
-
-class PreQualifyResponse(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    email: str
-    firstName: str
-    lastName: str
-    phone: str
-    idNumber: Optional[str] = None
-    idType: Optional[str] = None
-    ssn: Optional[str] = None
-    ssnType: Optional[str] = None
-    dateOfBirth: Optional[str] = None
-    address: Optional[str] = None
-    apartment: Optional[str] = None
-    city: Optional[str] = None
-    state: Optional[str] = None
-    zipCode: Optional[str] = None
-    housingType: Optional[str] = None
-    rentAmount: Optional[str] = None
-    # Time at address - separated fields
-    timeAtAddressYears: Optional[int] = None
-    timeAtAddressMonths: Optional[int] = None
-    employerName: Optional[str] = None
-    # Time with employer - separated fields
-    timeWithEmployerYears: Optional[int] = None
-    timeWithEmployerMonths: Optional[int] = None
-    incomeType: Optional[str] = None
-    netIncome: Optional[str] = None
-    incomeFrequency: Optional[str] = None
-    estimatedDownPayment: Optional[str] = None
-    consentAccepted: bool = False
-    language: Optional[str] = None
-    created_at: str
-    status: str = "pending"
-    matched_client_id: Optional[str] = None
-    matched_client_name: Optional[str] = None
-    id_file_url: Optional[str] = None  # URL del documento de ID subido
-
 @api_router.post("/prequalify/submit")
 async def submit_prequalify(submission: PreQualifySubmission):
     existing_client = await db.clients.find_one(
@@ -6187,7 +6030,7 @@ async def submit_prequalify(submission: PreQualifySubmission):
                 "is_read": False,
                 "created_at": datetime.now(timezone.utc).isoformat()
             }
-            await db.notifications.insert_one(notification_doc)
+            await insert_notifications(notification_doc)
             logger.info(f"In-app notification created for admin: {admin.get('email')}")
             
     except Exception as e:
@@ -6523,7 +6366,7 @@ async def submit_prequalify_with_file(
                 "is_read": False,
                 "created_at": datetime.now(timezone.utc).isoformat()
             }
-            await db.notifications.insert_one(notification_doc)
+            await insert_notifications(notification_doc)
             logger.info(f"In-app notification created for admin: {admin.get('email')}")
             
     except Exception as e:
@@ -6536,11 +6379,16 @@ async def submit_prequalify_with_file(
         "id_file_uploaded": id_file_url is not None
     }
 
+prequalify_rows = ModelRows(PreQualifyResponse)
+# Client matching reads phone and matched_client_id
+prequalify_list_view = ListView(PREQUALIFY_SUMMARY, required=("phone", "matched_client_id"), allowed=prequalify_rows.names)
+
 @api_router.get("/prequalify/submissions", response_model=List[PreQualifyResponse])
-async def get_prequalify_submissions(current_user: dict = Depends(get_current_user)):
+async def get_prequalify_submissions(fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION), current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    submissions = await db.prequalify_submissions.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    projection = list_projection(prequalify_list_view, fields) if fields else prequalify_rows.projection
+    submissions = await db.prequalify_submissions.find({}, projection).sort("created_at", -1).to_list(1000)
     for sub in submissions:
         if not sub.get("matched_client_id"):
             phone = sub.get("phone", "")
@@ -6552,7 +6400,7 @@ async def get_prequalify_submissions(current_user: dict = Depends(get_current_us
                 if existing_client:
                     sub["matched_client_id"] = existing_client["id"]
                     sub["matched_client_name"] = f"{existing_client['first_name']} {existing_client['last_name']}"
-    return submissions
+    return FastJSONResponse(submissions if fields else prequalify_rows(submissions))
 
 @api_router.get("/prequalify/submissions/{submission_id}")
 async def get_prequalify_submission(submission_id: str, current_user: dict = Depends(get_current_user)):
@@ -6603,24 +6451,19 @@ async def create_client_from_prequalify(submission_id: str, current_user: dict =
     
     if prequalify_id_file:
         try:
-            # Copy file to client's document location
             upload_dir = Path(__file__).parent / "uploads"
             
-            # Create client-specific upload directory
-            client_upload_dir = upload_dir / "clients" / client_id
-            client_upload_dir.mkdir(parents=True, exist_ok=True)
-            
             old_path = upload_dir / Path(prequalify_id_file).name
             logger.info(f"Looking for file at: {old_path}")
             if old_path.exists():
                 file_extension = old_path.suffix
                 file_id = uuid.uuid4().hex[:8]
-                new_filename = f"id_{file_id}{file_extension}"
-                new_path = client_upload_dir / new_filename
                 
-                shutil.copy2(old_path, new_path)
+                # Reference the file from the blob store (hard link, no byte copy)
+                blob = await document_blobs.ingest(old_path)
+                new_path = Path(blob["path"])
                 
-                id_file_url = f"/uploads/clients/{client_id}/{new_filename}"
+                id_file_url = f"/uploads/{new_path.relative_to(upload_dir).as_posix()}"
                 id_uploaded = True
                 
                 # Add to new multi-document system
@@ -6629,10 +6472,15 @@ async def create_client_from_prequalify(submission_id: str, current_user: dict =
                     "filename": f"ID_from_prequalify{file_extension}",
                     "path": str(new_path),
                     "type": "application/pdf" if file_extension == '.pdf' else f"image/{file_extension[1:]}",
+                    "size": blob["size"],
+                    "sha256": blob["sha256"],
                     "uploaded_at": datetime.now(timezone.utc).isoformat(),
                     "uploaded_by": current_user["id"],
                     "source": "prequalify"
                 }]
+                derivative_path = await ensure_image_derivative(new_path)
+                if derivative_path:
+                    id_documents[0]["derivative_path"] = str(derivative_path)
                 
                 logger.info(f"Transferred ID document from pre-qualify to client: {id_file_url}")
             else:
@@ -6670,6 +6518,7 @@ async def create_client_from_prequalify(submission_id: str, current_user: dict =
         "first_name": submission.get("firstName", ""),
         "last_name": submission.get("lastName", ""),
         "phone": submission.get("phone", ""),
+        "phone_key": phone_lookup_key(submission.get("phone", "")),
         "email": submission.get("email", ""),
         "address": full_address,
         "apartment": submission.get("apartment", ""),
@@ -6695,7 +6544,8 @@ async def create_client_from_prequalify(submission_id: str, current_user: dict =
         "created_by": current_user["id"],
         "is_deleted": False
     }
-    await db.clients.insert_one(client_doc)
+    await db.clients.insert_one(with_datetime_mirrors(with_search_tokens(client_doc)))
+    client_suggest_index.upsert(client_doc)
     
     # Format time at address for notes
     time_at_addr_str = "N/A"
@@ -6746,7 +6596,7 @@ Down Payment: {submission.get('estimatedDownPayment', 'N/A')}"""
         "finance_status": "no",
         "is_deleted": False
     }
-    await db.user_records.insert_one(record_doc)
+    await db.user_records.insert_one(with_datetime_mirrors(record_doc))
     note_doc = {
         "id": str(uuid.uuid4()),
         "record_id": record_doc["id"],
@@ -6758,7 +6608,7 @@ Down Payment: {submission.get('estimatedDownPayment', 'N/A')}"""
         "created_by_name": current_user.get("name") or current_user.get("email"),
         "admin_only": True  # Only admin can see pre-qualify data
     }
-    await db.record_comments.insert_one(note_doc)
+    await db.record_comments.insert_one(with_datetime_mirrors(note_doc))
     await db.prequalify_submissions.update_one(
         {"id": submission_id},
         {"$set": {"status": "converted", "matched_client_id": client_doc["id"], "matched_client_name": f"{client_doc['first_name']} {client_doc['last_name']}"}}
@@ -6784,11 +6634,15 @@ async def add_prequalify_to_notes(submission_id: str, record_id: str, current_us
         "created_by_name": current_user.get("name") or current_user.get("email"),
         "admin_only": True  # Only admin can see this note
     }
-    await db.record_comments.insert_one(note_doc)
+    await db.record_comments.insert_one(with_datetime_mirrors(note_doc))
     await db.prequalify_submissions.update_one({"id": submission_id}, {"$set": {"status": "reviewed"}})
     return {"message": "Data added to record notes", "note_id": note_doc["id"]}
 
 # Include router and middleware
+app.include_router(auth_routes.router)
+app.include_router(config_list_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(metrics_routes.api_router)
 app.include_router(api_router)
 
 app.add_middleware(
@@ -6797,8 +6651,153 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Calls", "X-DB-Time-Ms", "ETag"],
 )
 
+async def ensure_index(collection, keys, **kwargs):
+    """create_index that logs a failure instead of raising, so the indexes after it still get created"""
+    try:
+        await collection.create_index(keys, **kwargs)
+    except Exception as e:
+        logger.error(f"Error creating index {keys!r} on {collection.name}: {e}")
+
+@app.on_event("startup")
+async def create_indexes():
+    """Create the MongoDB indexes the API relies on (no-op if they already exist)"""
+    await ensure_index(db.document_blobs, "sha256", unique=True)
+    # Inbound SMS webhook
+    await ensure_index(db.clients, "phone_key")
+    await ensure_index(db.imported_contacts, "phone_formatted")
+    await ensure_index(db.user_records, [("client_id", 1), ("created_at", -1)])
+    await ensure_index(db.users, "id")
+    await ensure_index(db.sms_conversations, "twilio_sid")
+    await inbound_sms_queue.create_indexes()
+    await ensure_index(db.notifications, [("user_id", 1), ("created_at", -1)])
+    await ensure_index(db.sms_conversations, [("client_id", 1), ("direction", 1), ("is_read", 1)])
+    await ensure_index(db.sms_conversations, [("client_id", 1), ("timestamp", 1), ("id", 1)])
+    # Retention
+    await ensure_index(db.public_links, "token")
+    try:
+        await ensure_ttl_index(db.public_links, "expire_at", PUBLIC_LINK_GRACE_DAYS * 86400)
+    except Exception as e:
+        logger.error(f"Error creating public link TTL index: {e}")
+    await ensure_index(db.notifications, [("is_read", 1), ("created_at", 1)])
+    await ensure_index(db.sms_logs, "sent_at")
+    await ensure_index(db.email_logs, "sent_at")
+    # BSON date mirrors used by range queries and $dateTrunc bucketing
+    await ensure_index(db.clients, "created_at_dt")
+    await ensure_index(db.clients, [("is_sold", 1), ("sold_at_dt", 1)])
+    await ensure_index(db.clients, "last_contact_dt")
+    await ensure_index(db.user_records, [("is_deleted", 1), ("created_at_dt", 1)])
+    await ensure_index(db.appointments, "created_at_dt")
+    await ensure_index(db.client_comments, "reminder_at_dt")
+    await ensure_index(db.record_comments, "reminder_at_dt")
+    # Agenda: $lookup on clients.id and the reminder $unionWith branches
+    await ensure_index(db.clients, "id")
+    # Agenda / appointment date windows
+    await ensure_index(db.appointments, [("salesperson_id", 1), ("date", 1), ("time", 1)])
+    await ensure_index(db.appointments, [("date", 1), ("time", 1)])
+    await ensure_index(db.appointments, "client_id")
+    await ensure_index(db.client_comments, [("reminder_at", 1), ("user_id", 1)])
+    await ensure_index(db.record_comments, [("reminder_at", 1), ("user_id", 1)])
+    # Client search: prefix match on tokens, alone or within one owner's clients
+    await ensure_index(db.clients, SEARCH_FIELD)
+    await ensure_index(db.clients, [("created_by", 1), (SEARCH_FIELD, 1)])
+    
+    await backfill_phone_keys()
+    
+    global client_search_ready
+    try:
+        if not await search_index_ready(db):
+            await backfill_search_tokens(db)
+        client_search_ready = True
+    except Exception as e:
+        logger.error(f"Error backfilling client search tokens: {e}")
+    
+    # Built in the background: /clients/suggest queries MongoDB until it is ready
+    asyncio.create_task(load_client_suggest_index())
+    
+    global datetime_mirrors_ready
+    try:
+        datetime_mirrors_ready = await mirrors_ready(db)
+    except Exception as e:
+        logger.error(f"Error checking datetime backfill state: {e}")
+    if not datetime_mirrors_ready:
+        logger.warning("Datetime mirrors not backfilled yet - run tools/backfill_datetimes.py; using ISO-string queries")
+    
+    try:
+        await migrate_sms_logs_to_conversations()
+    except Exception as e:
+        logger.error(f"Error migrating SMS logs to conversations: {e}")
+    
+    await backfill_public_link_expiry()
+    await seed_unread_counters()
+
+async def seed_unread_counters():
+    """First start with maintained counters: seed them from the existing data"""
+    try:
+        if await db.unread_counters.estimated_document_count() == 0:
+            await unread_counters.rebuild()
+    except Exception as e:
+        logger.error(f"Error seeding unread counters: {e}")
+
+def public_link_expire_at(link: dict) -> datetime:
+    """The BSON-date expire_at for a link, from its ISO expires_at (or created_at + 30 days)"""
+    expires_at = link.get("expires_at")
+    try:
+        expire_at = datetime.fromisoformat(expires_at.replace("Z", "+00:00")) if expires_at else None
+    except (AttributeError, ValueError):
+        expire_at = None
+    if expire_at is None:
+        # No usable expiry: links were always issued for 30 days
+        try:
+            expire_at = datetime.fromisoformat(link["created_at"].replace("Z", "+00:00")) + timedelta(days=30)
+        except (KeyError, AttributeError, ValueError):
+            expire_at = datetime.now(timezone.utc) + timedelta(days=30)
+    return expire_at
+
+async def backfill_public_link_expiry():
+    """Give links created before the TTL index a BSON-date expire_at so they expire too"""
+    try:
+        batch = []
+        updated = 0
+        async for link in db.public_links.find({"expire_at": {"$exists": False}}, {"_id": 1, "expires_at": 1, "created_at": 1}):
+            batch.append(UpdateOne({"_id": link["_id"]}, {"$set": {"expire_at": public_link_expire_at(link)}}))
+            if len(batch) >= 500:
+                await db.public_links.bulk_write(batch, ordered=False)
+                updated += len(batch)
+                batch = []
+        if batch:
+            await db.public_links.bulk_write(batch, ordered=False)
+            updated += len(batch)
+        if updated:
+            logger.info(f"Backfilled expire_at on {updated} public links")
+    except Exception as e:
+        logger.error(f"Error backfilling public link expiry: {e}")
+
+async def backfill_phone_keys():
+    """Set phone_key on clients created before the field existed"""
+    try:
+        updated = 0
+        batch = []
+        cursor = db.clients.find(
+            {"phone_key": {"$exists": False}, "phone": {"$nin": [None, ""]}},
+            {"_id": 1, "phone": 1}
+        )
+        async for client in cursor:
+            batch.append(UpdateOne({"_id": client["_id"]}, {"$set": {"phone_key": phone_lookup_key(client["phone"])}}))
+            if len(batch) >= 500:
+                await db.clients.bulk_write(batch, ordered=False)
+                updated += len(batch)
+                batch = []
+        if batch:
+            await db.clients.bulk_write(batch, ordered=False)
+            updated += len(batch)
+        if updated:
+            logger.info(f"Backfilled phone_key on {updated} clients")
+    except Exception as e:
+        logger.error(f"Error backfilling phone keys: {e}")
+
 @app.on_event("startup")
 async def create_default_admin():
     """Create default admin account if it doesn't exist"""
@@ -6820,104 +6819,6 @@ async def create_default_admin():
     # Initialize default config lists if empty
     await initialize_default_config_lists()
 
-async def initialize_default_config_lists():
-    """Initialize default banks, dealers, cars, ID types, POI types, and POR types if lists are empty"""
-    now = datetime.now(timezone.utc).isoformat()
-    
-    # Default US Banks
-    default_banks = [
-        "Chase", "Bank of America", "Wells Fargo", "Citibank", "US Bank",
-        "Capital One", "PNC Bank", "TD Bank", "Truist", "Ally Bank",
-        "Discover Bank", "Fifth Third Bank", "KeyBank", "Huntington Bank",
-        "Santander", "BMO Harris", "Regions Bank", "Citizens Bank", "M&T Bank",
-        "First Republic", "USAA", "Navy Federal", "Charles Schwab", "Goldman Sachs",
-        "American Express", "Synchrony Bank", "Marcus by Goldman Sachs", "SoFi",
-        "Chime", "Varo Bank", "Current", "Simple", "Aspiration"
-    ]
-    
-    # Default Dealers with addresses
-    default_dealers = [
-        {"name": "Downey", "address": "7444 Florence Ave, Downey, CA 90240"},
-        {"name": "Fullerton", "address": "1100 S Harbor Blvd, Fullerton, CA 92832"},
-        {"name": "Hollywood", "address": "6200 Hollywood Blvd, Los Angeles, CA 90028"},
-        {"name": "Long Beach", "address": "1500 E Anaheim St, Long Beach, CA 90813"}
-    ]
-    
-    # Default Car Makes/Models
-    default_cars = [
-        "Silverado", "Ram 1500", "F-150", "Tacoma", "Tundra", "Sierra",
-        "Colorado", "Ranger", "Frontier", "Titan", "Gladiator",
-        "Camry", "Accord", "Civic", "Corolla", "Altima", "Sentra",
-        "Malibu", "Impala", "Fusion", "Sonata", "Elantra", "Optima",
-        "CR-V", "RAV4", "Rogue", "Escape", "Explorer", "Highlander",
-        "Pilot", "4Runner", "Pathfinder", "Tahoe", "Suburban", "Expedition",
-        "Wrangler", "Grand Cherokee", "Cherokee", "Compass", "Durango",
-        "Mustang", "Camaro", "Challenger", "Charger", "Corvette",
-        "Model 3", "Model Y", "Model S", "Model X", "Mach-E",
-        "BMW 3 Series", "BMW 5 Series", "Mercedes C-Class", "Mercedes E-Class",
-        "Audi A4", "Audi Q5", "Lexus ES", "Lexus RX", "Acura TLX", "Acura MDX"
-    ]
-    
-    # Default ID Types (for identification documents) - in Spanish
-    default_id_types = [
-        "Licencia de Conducir", "Pasaporte", "Pasaporte USA", "Matrícula", 
-        "Credencial de Elector", "ID de Residente", "Otro"
-    ]
-    
-    # Default POI Types (Proof of Income)
-    default_poi_types = [
-        "Cash", "Company Check", "Personal Check", "Talon de Cheque"
-    ]
-    
-    # Default POR Types (Proof of Residence)
-    default_por_types = [
-        "Agua", "Luz", "Gas", "Internet", "TV Cable", "Telefono", "Car Insurance", "Bank Statements"
-    ]
-    
-    # Initialize dealers with addresses (special handling)
-    dealer_count = await db.config_lists.count_documents({"category": "dealer"})
-    if dealer_count == 0:
-        dealer_docs = [
-            {
-                "id": str(uuid.uuid4()),
-                "name": dealer["name"],
-                "address": dealer["address"],
-                "category": "dealer",
-                "created_at": now,
-                "created_by": "system"
-            }
-            for dealer in default_dealers
-        ]
-        if dealer_docs:
-            await db.config_lists.insert_many(dealer_docs)
-            logger.info(f"Initialized {len(dealer_docs)} default dealers with addresses")
-    
-    # Check if other lists are empty and populate
-    simple_categories = [
-        ('bank', default_banks), 
-        ('car', default_cars),
-        ('id_type', default_id_types),
-        ('poi_type', default_poi_types),
-        ('por_type', default_por_types)
-    ]
-    
-    for category, items in simple_categories:
-        count = await db.config_lists.count_documents({"category": category})
-        if count == 0:
-            docs = [
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": item,
-                    "category": category,
-                    "created_at": now,
-                    "created_by": "system"
-                }
-                for item in items
-            ]
-            if docs:
-                await db.config_lists.insert_many(docs)
-                logger.info(f"Initialized {len(docs)} default {category}s")
-
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
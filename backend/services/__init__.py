@@ -1,13 +1,55 @@
 """
 Services module for DealerCRM
 """
-from .email import send_email_notification
-from .sms import send_sms_twilio, normalize_phone
+from .email import send_email_notification, is_valid_email
+from .sms import send_sms_twilio, normalize_phone, get_twilio_client
 from .pdf import merge_files_to_pdf
+from .document_cache import CombinedPdfCache, document_set_fingerprint
+from .file_serving import serve_file
+from .uploads import save_upload_stream
+from .blob_store import BlobStore
+from .images import ensure_image_derivative, document_output_path
+from .webhook_queue import WebhookQueue
+from .events import EventBus, ChangeStreamFeed
+from .unread_counters import UnreadCounters
+from .retention import Archiver, RetentionPolicy
+from .datetimes import with_datetime_mirrors, backfill_datetime_mirrors
+from .client_search import with_search_tokens, backfill_search_tokens
+from .client_suggest import ClientSuggestIndex
+from .metrics import MetricsRegistry, RequestMetrics, RequestMetricsMiddleware, MongoCommandMetrics, MongoPoolMetrics
+from .query_profiler import QueryProfiler
+from .reference_cache import ReferenceCache
 
 __all__ = [
     'send_email_notification',
+    'is_valid_email',
     'send_sms_twilio',
     'normalize_phone',
+    'get_twilio_client',
     'merge_files_to_pdf',
+    'CombinedPdfCache',
+    'document_set_fingerprint',
+    'serve_file',
+    'save_upload_stream',
+    'BlobStore',
+    'ensure_image_derivative',
+    'document_output_path',
+    'WebhookQueue',
+    'EventBus',
+    'ChangeStreamFeed',
+    'UnreadCounters',
+    'Archiver',
+    'RetentionPolicy',
+    'with_datetime_mirrors',
+    'backfill_datetime_mirrors',
+    'with_search_tokens',
+    'backfill_search_tokens',
+    'ClientSuggestIndex',
+    'MetricsRegistry',
+    'RequestMetrics',
+    'RequestMetricsMiddleware',
+    'MongoCommandMetrics',
+    'MongoPoolMetrics',
+    'QueryProfiler',
+    'ReferenceCache',
 ]
@@ -0,0 +1,169 @@
+"""Content-addressed storage for client documents"""
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Optional
+from pymongo import ReturnDocument
+from config import logger
+from .images import derivative_path_for
+
+DOCUMENT_FIELDS = ("id_documents", "income_documents", "residence_documents")
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file on disk in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class BlobStore:
+    """
+    Stores document bytes once per SHA-256 under root/ab/cd/<sha256><ext>.
+
+    Each blob has a row in the `document_blobs` collection whose ref_count is
+    incremented when a *_documents entry points at it and decremented when
+    that entry is removed. collect_garbage() reconciles the counters against
+    the clients collection and deletes blobs nobody references anymore.
+    """
+
+    def __init__(self, root: Path, db):
+        self.root = Path(root)
+        self.db = db
+        self.staging_dir = self.root / "staging"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, sha256: str, ext: str) -> Path:
+        ext = ext.lower() if ext else ""
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    def staging_path(self) -> Path:
+        """A unique path on the same filesystem as the blobs, for streaming uploads into"""
+        return self.staging_dir / uuid.uuid4().hex
+
+    async def commit(self, staged_path: Path, sha256: str, ext: str, size: Optional[int] = None) -> Path:
+        """
+        Move a staged file into the store and take a reference to it.
+        Identical content always maps to the same blob (the first upload's extension wins).
+        """
+        if size is None:
+            size = staged_path.stat().st_size
+        # Reference first so a concurrent GC pass sees a fresh updated_at and keeps the blob
+        path = await self._add_ref(sha256, self.blob_path(sha256, ext), size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged_path, path)
+        return path
+
+    async def ingest(self, source_path: Path) -> dict:
+        """
+        Take a reference to an existing file on disk without copying it when possible.
+        The blob is hard-linked to the source (falling back to a copy across filesystems).
+
+        Returns:
+            {"path": str, "sha256": str, "size": int}
+        """
+        sha256 = file_sha256(source_path)
+        size = source_path.stat().st_size
+        path = await self._add_ref(sha256, self.blob_path(sha256, source_path.suffix), size)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(source_path, path)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copy2(source_path, path)
+        return {"path": str(path), "sha256": sha256, "size": size}
+
+    async def release(self, sha256: str):
+        """Drop one reference; the file is removed later by collect_garbage()"""
+        await self.db.document_blobs.update_one(
+            {"sha256": sha256},
+            {"$inc": {"ref_count": -1}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}}
+        )
+
+    def is_blob(self, path: str) -> bool:
+        try:
+            return Path(path).resolve().is_relative_to(self.root.resolve())
+        except (OSError, ValueError):
+            return False
+
+    async def _add_ref(self, sha256: str, path: Path, size: int) -> Path:
+        """Increment the reference count and return the blob's canonical path"""
+        now = datetime.now(timezone.utc).isoformat()
+        blob = await self.db.document_blobs.find_one_and_update(
+            {"sha256": sha256},
+            {
+                "$inc": {"ref_count": 1},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"path": str(path), "size": size, "created_at": now}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return Path(blob["path"])
+
+    async def collect_garbage(self, grace_period: timedelta = timedelta(hours=1)) -> dict:
+        """
+        Reconcile reference counts with the clients collection and delete unreferenced blobs.
+
+        Blobs touched within the grace period are kept so an in-flight upload
+        that has committed its blob but not yet saved the client is never lost.
+        """
+        # Mark: count live references per hash across every *_documents array
+        live_refs = {}
+        for field in DOCUMENT_FIELDS:
+            pipeline = [
+                {"$match": {f"{field}.sha256": {"$exists": True}}},
+                {"$unwind": f"${field}"},
+                {"$match": {f"{field}.sha256": {"$ne": None}}},
+                {"$group": {"_id": f"${field}.sha256", "count": {"$sum": 1}}}
+            ]
+            async for row in self.db.clients.aggregate(pipeline):
+                live_refs[row["_id"]] = live_refs.get(row["_id"], 0) + row["count"]
+
+        cutoff = (datetime.now(timezone.utc) - grace_period).isoformat()
+        deleted = 0
+        freed_bytes = 0
+        repaired = 0
+
+        # Sweep
+        async for blob in self.db.document_blobs.find({}, {"_id": 0}):
+            sha256 = blob["sha256"]
+            actual = live_refs.get(sha256, 0)
+            if actual > 0:
+                if blob.get("ref_count") != actual:
+                    await self.db.document_blobs.update_one({"sha256": sha256}, {"$set": {"ref_count": actual}})
+                    repaired += 1
+                continue
+
+            if blob.get("updated_at", "") > cutoff:
+                continue
+
+            # Only delete if nobody took a new reference since we read the row
+            result = await self.db.document_blobs.delete_one({"sha256": sha256, "updated_at": blob.get("updated_at")})
+            if result.deleted_count == 0:
+                continue
+            try:
+                Path(blob["path"]).unlink(missing_ok=True)
+                derivative_path_for(blob["path"]).unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Error deleting blob {sha256}: {e}")
+                continue
+            deleted += 1
+            freed_bytes += blob.get("size", 0)
+
+        # Stale staging files left behind by interrupted uploads
+        cutoff_ts = (datetime.now(timezone.utc) - grace_period).timestamp()
+        for staged in self.staging_dir.iterdir():
+            try:
+                if staged.stat().st_mtime < cutoff_ts:
+                    staged.unlink()
+            except OSError:
+                pass
+
+        logger.info(f"Blob GC: deleted {deleted} blobs ({freed_bytes} bytes), repaired {repaired} ref counts")
+        return {"deleted": deleted, "freed_bytes": freed_bytes, "repaired": repaired}
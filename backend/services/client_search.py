@@ -0,0 +1,150 @@
+"""Indexed prefix search over client names and phone numbers"""
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import List
+from pymongo import UpdateOne
+
+# Multikey field holding the normalized tokens of a client; indexed
+SEARCH_FIELD = "search_tokens"
+MIGRATION_ID = "client_search_tokens"
+
+# Besides the full digit string, phone numbers are indexed by these trailing
+# lengths so "4629914" (local number) and "9914" (last four) match as prefixes
+PHONE_SUFFIX_LENGTHS = (10, 7, 4)
+
+def fold_text(value) -> str:
+    """Lowercase, strip accents ("José Peña" -> "jose pena") and turn punctuation into spaces"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", stripped.lower()).strip()
+
+def phone_tokens(phone) -> List[str]:
+    digits = re.sub(r"\D", "", phone or "")
+    if not digits:
+        return []
+    return [digits] + [digits[-n:] for n in PHONE_SUFFIX_LENGTHS if len(digits) > n]
+
+def client_search_tokens(first_name, last_name, phone) -> List[str]:
+    """Tokens stored on a client: folded name words plus phone digit strings"""
+    tokens = fold_text(f"{first_name or ''} {last_name or ''}").split() + phone_tokens(phone)
+    return sorted(set(tokens))
+
+def with_search_tokens(doc: dict) -> dict:
+    """Set search_tokens on an insert document or a full-name/phone $set dict. Returns the same dict."""
+    doc[SEARCH_FIELD] = client_search_tokens(doc.get("first_name"), doc.get("last_name"), doc.get("phone"))
+    return doc
+
+def parse_search_query(search: str) -> List[str]:
+    """
+    Split user input into prefix terms. Input without letters is treated as
+    one phone number ("(213) 462-99" -> ["21346299"]).
+    """
+    folded = fold_text(search)
+    if not re.search(r"[a-z]", folded):
+        digits = folded.replace(" ", "")
+        return [digits] if digits else []
+    return list(dict.fromkeys(folded.split()))
+
+def search_filter(terms: List[str]) -> dict:
+    """Every term must prefix-match some token. Anchored, case-sensitive regexes use the index."""
+    return {SEARCH_FIELD: {"$all": [re.compile("^" + re.escape(term)) for term in terms]}}
+
+def relevance_score(terms: List[str], tokens: List[str]) -> float:
+    """
+    0..1: for each term, 1.0 for an exact token match, otherwise the share of
+    the closest token it covers as a prefix ("mar" vs "maria" -> 0.6); averaged.
+    """
+    if not terms:
+        return 0.0
+    total = 0.0
+    for term in terms:
+        best = 0.0
+        for token in tokens:
+            if token.startswith(term):
+                best = max(best, len(term) / len(token))
+        total += best
+    return round(total / len(terms), 3)
+
+def rank_by_relevance(docs: List[dict], terms: List[str], sort: bool = True) -> List[dict]:
+    """
+    Drop each doc's tokens and, when there are terms, add its `search_score`;
+    stable-sort best first when `sort`.
+    """
+    for doc in docs:
+        tokens = doc.pop(SEARCH_FIELD, None) or []
+        if terms:
+            doc["search_score"] = relevance_score(terms, tokens)
+    if sort and terms:
+        docs.sort(key=lambda doc: doc["search_score"], reverse=True)
+    return docs
+
+def relevance_score_expr(terms: List[str]) -> dict:
+    """relevance_score() of a client as an aggregation expression"""
+    per_term = [
+        {"$ifNull": [{"$max": {"$map": {
+            "input": {"$ifNull": ["$" + SEARCH_FIELD, []]},
+            "as": "token",
+            "in": {"$cond": [
+                {"$eq": [{"$indexOfCP": ["$$token", term]}, 0]},
+                {"$divide": [len(term), {"$strLenCP": "$$token"}]},
+                0
+            ]}
+        }}}, 0]}
+        for term in terms
+    ]
+    return {"$round": [{"$avg": per_term}, 3]} if per_term else {"$literal": 0.0}
+
+def ranked_search_pipeline(query: dict, terms: List[str], projection: dict, sort: List[tuple], limit: int) -> List[dict]:
+    """
+    Aggregation returning the `limit` best matches of `query`, best first (ties
+    in `sort` order) with their `search_score`. Scoring happens before the
+    limit, so a broad prefix cannot push the best matches out of the page.
+    """
+    projection = {key: value for key, value in projection.items() if key != SEARCH_FIELD}
+    if any(value for key, value in projection.items() if key != "_id"):
+        projection["search_score"] = 1
+    else:
+        projection[SEARCH_FIELD] = 0
+    return [
+        {"$match": query},
+        {"$addFields": {"search_score": relevance_score_expr(terms)}},
+        {"$sort": {"search_score": -1, **dict(sort)}},
+        {"$limit": limit},
+        {"$project": projection},
+    ]
+
+async def search_index_ready(db) -> bool:
+    """True once backfill_search_tokens() has completed"""
+    return await db.migrations.find_one({"_id": MIGRATION_ID}) is not None
+
+async def backfill_search_tokens(db, batch_size: int = 1000) -> int:
+    """Write search_tokens on clients that predate it. Idempotent; records completion in db.migrations."""
+    # Imported here so the pure helpers above load without config (benchmarks, tests)
+    from config import logger
+    updated = 0
+    batch = []
+    cursor = db.clients.find(
+        {SEARCH_FIELD: {"$exists": False}},
+        {"_id": 1, "first_name": 1, "last_name": 1, "phone": 1}
+    )
+    async for client in cursor:
+        tokens = client_search_tokens(client.get("first_name"), client.get("last_name"), client.get("phone"))
+        batch.append(UpdateOne({"_id": client["_id"]}, {"$set": {SEARCH_FIELD: tokens}}))
+        if len(batch) >= batch_size:
+            await db.clients.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.clients.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"done_at": datetime.now(timezone.utc), "updated": updated}},
+        upsert=True
+    )
+    logger.info(f"Search tokens written on {updated} clients")
+    return updated
@@ -0,0 +1,210 @@
+"""In-process prefix index of client names and phone digits for typeahead suggestions"""
+import sys
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config import logger
+from .client_search import client_search_tokens, parse_search_query
+
+# Upper bound on clients matching every term collected per query, keeps the
+# worst case (a one-letter prefix over a large book) within a few milliseconds
+MAX_CANDIDATES = 500
+
+# Fields kept in memory per client: enough to render a suggestion and rebuild its tokens
+SUGGEST_PROJECTION = {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "phone": 1, "created_by": 1, "is_deleted": 1}
+
+class PrefixIndex:
+    """Sorted array of distinct tokens plus token -> client ids postings"""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.postings: Dict[str, Set[str]] = {}
+
+    def add(self, client_id: str, tokens: Iterable[str], keep_sorted: bool = True):
+        """Index a client. Bulk loads pass keep_sorted=False and call sort() once at the end."""
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                if keep_sorted:
+                    insort(self.tokens, token)
+            ids.add(client_id)
+
+    def sort(self):
+        self.tokens = sorted(self.postings)
+
+    def remove(self, client_id: str, tokens: Iterable[str]):
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(client_id)
+            if not ids:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def iter_prefix(self, prefix: str):
+        """(token, client ids) for every token starting with `prefix`, in token order (an exact match first)"""
+        i = bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            yield self.tokens[i], self.postings[self.tokens[i]]
+            i += 1
+
+    def __len__(self):
+        return len(self.tokens)
+
+class ClientSuggestIndex:
+    """
+    Typeahead over every non-deleted client, partitioned by owner (created_by)
+    so a telemarketer's lookup only walks their own clients.
+
+    load() builds it from MongoDB at startup; refresh(client_id) re-reads one
+    client after any write that changes its name, phone, owner or deleted
+    flag. The index lives in this process only: writes made by another worker
+    show up after this worker's next full load().
+    """
+
+    def __init__(self):
+        # client id -> (first_name, last_name, phone, owner, tokens)
+        self._clients: Dict[str, Tuple] = {}
+        self._by_owner: Dict[Optional[str], PrefixIndex] = {}
+        # While load() reads the collection: upserts/removes made meanwhile, replayed on the new index
+        self._pending: Optional[List[Tuple[str, dict]]] = None
+        self.ready = False
+
+    async def load(self, db):
+        if self._pending is not None:
+            logger.info("Client suggest index reload already running - skipped")
+            return
+        self._pending = []
+        try:
+            clients: Dict[str, Tuple] = {}
+            by_owner: Dict[Optional[str], PrefixIndex] = {}
+            async for doc in db.clients.find({"is_deleted": {"$ne": True}}, SUGGEST_PROJECTION):
+                entry = self._entry(doc)
+                clients[doc["id"]] = entry
+                by_owner.setdefault(entry[3], PrefixIndex()).add(doc["id"], entry[4], keep_sorted=False)
+            for owner_index in by_owner.values():
+                owner_index.sort()
+            # Swap in whole so queries during a reload see the old, complete index; then
+            # replay the writes made while the cursor was running (no await in between)
+            pending, self._pending = self._pending, None
+            self._clients, self._by_owner = clients, by_owner
+            for operation, doc in pending:
+                if operation == "upsert":
+                    self.upsert(doc)
+                else:
+                    self.remove(doc["id"])
+        finally:
+            self._pending = None
+        self.ready = True
+        logger.info(f"Client suggest index loaded: {len(clients)} clients, {len(by_owner)} owners, {len(pending)} replayed")
+
+    @staticmethod
+    def _entry(doc: dict) -> Tuple:
+        first_name, last_name, phone = doc.get("first_name") or "", doc.get("last_name") or "", doc.get("phone") or ""
+        # Interned: common name tokens are shared by many clients
+        tokens = tuple(sys.intern(token) for token in client_search_tokens(first_name, last_name, phone))
+        return (first_name, last_name, phone, doc.get("created_by"), tokens)
+
+    def upsert(self, doc: dict):
+        self.remove(doc["id"])
+        if self._pending is not None:
+            self._pending.append(("upsert", doc))
+        if doc.get("is_deleted"):
+            return
+        entry = self._entry(doc)
+        self._clients[doc["id"]] = entry
+        self._by_owner.setdefault(entry[3], PrefixIndex()).add(doc["id"], entry[4])
+
+    def remove(self, client_id: str):
+        if self._pending is not None:
+            self._pending.append(("remove", {"id": client_id}))
+        entry = self._clients.pop(client_id, None)
+        if entry is None:
+            return
+        owner_index = self._by_owner.get(entry[3])
+        if owner_index is not None:
+            owner_index.remove(client_id, entry[4])
+            if not len(owner_index):
+                del self._by_owner[entry[3]]
+
+    async def refresh(self, db, client_id: str):
+        """Re-read one client after a write; never fails the request that made the write"""
+        try:
+            doc = await db.clients.find_one({"id": client_id}, SUGGEST_PROJECTION)
+            if doc:
+                self.upsert(doc)
+            else:
+                self.remove(client_id)
+        except Exception as e:
+            logger.error(f"Error refreshing suggest index for client {client_id}: {e}")
+
+    def suggest(self, query: str, owners: Optional[Iterable[str]] = None,
+                exclude_owners: Iterable[str] = (), limit: int = 10) -> List[dict]:
+        """
+        Top `limit` clients whose tokens prefix-match every term of `query`.
+        `owners` restricts to those owners' clients (None = all owners).
+        """
+        terms = parse_search_query(query)
+        if not terms:
+            return []
+        # Walk the postings of the longest (usually most selective) term and
+        # check the others against each client's tokens as it comes up, so the
+        # MAX_CANDIDATES cap only ever counts clients that match every term
+        lead = max(terms, key=len)
+        others = [term for term in terms if term != lead]
+        excluded = set(exclude_owners)
+        owner_keys = list(self._by_owner) if owners is None else owners
+
+        # client id -> [best share of a token covered by the lead term, summed share of the others]
+        matches: Dict[str, list] = {}
+        rejected: Set[str] = set()
+        for owner in owner_keys:
+            owner_index = self._by_owner.get(owner)
+            if owner_index is None or owner in excluded:
+                continue
+            for token, client_ids in owner_index.iter_prefix(lead):
+                token_score = len(lead) / len(token)
+                for client_id in client_ids:
+                    match = matches.get(client_id)
+                    if match is not None:
+                        match[0] = max(match[0], token_score)
+                    elif client_id not in rejected:
+                        others_score = self._others_score(client_id, others)
+                        if others_score is None:
+                            rejected.add(client_id)
+                        else:
+                            matches[client_id] = [token_score, others_score]
+                if len(matches) >= MAX_CANDIDATES:
+                    break
+            if len(matches) >= MAX_CANDIDATES:
+                break
+
+        scored = [
+            (round((lead_score + others_score) / (len(others) + 1), 3), client_id)
+            for client_id, (lead_score, others_score) in matches.items()
+        ]
+
+        scored.sort(key=lambda item: (-item[0], self._clients[item[1]][:2]))
+        results = []
+        for score, client_id in scored[:limit]:
+            first_name, last_name, phone, owner, _ = self._clients[client_id]
+            results.append({
+                "id": client_id, "first_name": first_name, "last_name": last_name,
+                "phone": phone, "created_by": owner, "score": score
+            })
+        return results
+
+    def _others_score(self, client_id: str, terms: List[str]) -> Optional[float]:
+        """Summed best token share of each term for a client, None if some term matches no token"""
+        total = 0.0
+        tokens = self._clients[client_id][4]
+        for term in terms:
+            term_score = max((len(term) / len(token) for token in tokens if token.startswith(term)), default=0.0)
+            if not term_score:
+                return None
+            total += term_score
+        return total
+
+    def __len__(self):
+        return len(self._clients)
@@ -0,0 +1,86 @@
+"""BSON datetime mirrors for ISO-string timestamp fields"""
+from datetime import datetime, timezone
+from typing import Optional, Union
+from pymongo import UpdateOne
+
+# Timestamp fields that get a "<field>_dt" BSON date mirror, per collection.
+# The ISO strings stay the API contract; queries and aggregations use the mirrors.
+DATETIME_FIELDS = {
+    "clients": ("created_at", "sold_at", "last_contact"),
+    "user_records": ("created_at",),
+    "appointments": ("created_at", "last_sms_sent"),
+    "client_comments": ("created_at", "reminder_at"),
+    "record_comments": ("created_at", "reminder_at"),
+    "imported_contacts": ("last_sms_sent",),
+}
+
+MIGRATION_ID = "datetime_mirrors"
+
+def dt_field(field: str) -> str:
+    return f"{field}_dt"
+
+def parse_timestamp(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """
+    Parse a stored timestamp into an aware UTC datetime.
+    Accepts "Z" and "+00:00" suffixes, naive values (taken as UTC) and plain dates.
+    Returns None for empty or unparseable values.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def with_datetime_mirrors(doc: dict, fields=None) -> dict:
+    """
+    Add "<field>_dt" BSON dates next to ISO-string timestamps in an insert
+    document or a $set dict (dual-write). Returns the same dict.
+    """
+    for field in fields or {f for names in DATETIME_FIELDS.values() for f in names}:
+        if field in doc:
+            doc[dt_field(field)] = parse_timestamp(doc[field])
+    return doc
+
+async def mirrors_ready(db) -> bool:
+    """True once backfill_datetime_mirrors() has completed for every collection"""
+    return await db.migrations.find_one({"_id": MIGRATION_ID}) is not None
+
+async def backfill_datetime_mirrors(db, batch_size: int = 1000) -> dict:
+    """
+    Write the "<field>_dt" mirror on every document that predates dual-write.
+    Idempotent and resumable; records completion in db.migrations.
+    """
+    # Imported here so the pure helpers above load without config (benchmarks, tests)
+    from config import logger
+    totals = {}
+    for collection_name, fields in DATETIME_FIELDS.items():
+        collection = db[collection_name]
+        updated = 0
+        for field in fields:
+            query = {field: {"$exists": True}, dt_field(field): {"$exists": False}}
+            batch = []
+            async for doc in collection.find(query, {"_id": 1, field: 1}):
+                batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {dt_field(field): parse_timestamp(doc.get(field))}}))
+                if len(batch) >= batch_size:
+                    await collection.bulk_write(batch, ordered=False)
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                await collection.bulk_write(batch, ordered=False)
+                updated += len(batch)
+        totals[collection_name] = updated
+        logger.info(f"Datetime backfill: {collection_name} - {updated} fields written")
+
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"done_at": datetime.now(timezone.utc), "updated": totals}},
+        upsert=True
+    )
+    return totals
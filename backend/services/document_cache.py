@@ -0,0 +1,114 @@
+"""On-disk cache for combined client-document PDFs"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+from config import logger
+
+def document_set_fingerprint(documents: List[dict]) -> Optional[str]:
+    """
+    Build a fingerprint for an ordered list of client documents.
+
+    The hash covers the document IDs (in order) plus each file's mtime and size,
+    so re-uploading, deleting or replacing a file yields a new key.
+    Returns None if none of the files exist on disk.
+    """
+    hasher = hashlib.sha256()
+    found = False
+    for doc in documents:
+        file_path = Path(doc.get("path", ""))
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        found = True
+        hasher.update(f"{doc.get('id')}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return hasher.hexdigest()[:32] if found else None
+
+class CombinedPdfCache:
+    """
+    LRU cache of combined PDFs stored on disk.
+
+    Entries are named "{client_id}_{doc_type}_{fingerprint}.pdf". The file mtime
+    is bumped on every hit and used as the LRU clock, so the cache state lives
+    entirely on disk and is shared by every worker process.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, client_id: str, doc_type: str, fingerprint: str) -> Path:
+        return self.cache_dir / f"{client_id}_{doc_type}_{fingerprint}.pdf"
+
+    def get(self, client_id: str, doc_type: str, fingerprint: str) -> Optional[Path]:
+        """Return the cached PDF path on hit (and mark it as recently used), else None"""
+        path = self._entry_path(client_id, doc_type, fingerprint)
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def put(self, client_id: str, doc_type: str, fingerprint: str, content: bytes) -> Optional[Path]:
+        """Store a combined PDF and evict least recently used entries over the byte budget"""
+        if self.max_bytes <= 0 or len(content) > self.max_bytes:
+            return None
+
+        # Drop stale entries for the same client/doc_type before writing the new one
+        self.invalidate(client_id, doc_type)
+
+        path = self._entry_path(client_id, doc_type, fingerprint)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error writing combined PDF cache entry {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+        self._evict()
+        return path
+
+    def invalidate(self, client_id: str, doc_type: Optional[str] = None) -> int:
+        """Remove cached entries for a client (optionally only one document type)"""
+        prefix = f"{client_id}_{doc_type}_" if doc_type else f"{client_id}_"
+        removed = 0
+        for path in self.cache_dir.glob(f"{prefix}*.pdf"):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*.pdf"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort(key=lambda e: e[0])
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
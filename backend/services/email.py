@@ -1,47 +1,91 @@
 """Email service for sending notifications"""
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM_NAME, RESEND_API_KEY, SENDER_EMAIL, logger
 
-async def send_email_notification(to_email: str, subject: str, html_content: str):
-    """Send email notification using SMTP or Resend"""
-    
-    # Try SMTP first (free)
+def get_resend():
+    """The resend module, imported and configured on first use"""
+    import resend
+    resend.api_key = RESEND_API_KEY
+    return resend
+
+def is_valid_email(email: str) -> bool:
+    """Check if email is valid format"""
+    if not email or '@' not in email:
+        return False
+    # Basic email validation - must have @ and a domain
+    parts = email.split('@')
+    if len(parts) != 2:
+        return False
+    local, domain = parts
+    if not local or not domain:
+        return False
+    if '.' not in domain:
+        return False
+    # Exclude test/fake emails
+    fake_domains = ['dealer.com', 'test.com', 'example.com', 'localhost']
+    if any(domain.lower().endswith(fake) for fake in fake_domains):
+        logger.warning(f"Skipping email to test/fake domain: {email}")
+        return False
+    return True
+
+async def send_email_notification(to_email: str, subject: str, html_content: str) -> dict:
+    """
+    Send email notification using SMTP (FREE) or Resend (paid).
+    Supports Gmail, Outlook, Yahoo, etc.
+    """
+    # Validate email before sending
+    if not is_valid_email(to_email):
+        logger.warning(f"Invalid email address, skipping: {to_email}")
+        return {"success": False, "error": f"Invalid email: {to_email}"}
+
+    # Try SMTP first (FREE)
     if SMTP_USER and SMTP_PASSWORD:
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{SMTP_FROM_NAME} <{SMTP_USER}>"
-            msg['To'] = to_email
-            
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_USER, to_email, msg.as_string())
-            
-            logger.info(f"Email sent via SMTP to {to_email}")
+            def send_smtp_email():
+                msg = MIMEMultipart('alternative')
+                msg['Subject'] = subject
+                msg['From'] = f"{SMTP_FROM_NAME} <{SMTP_USER}>"
+                msg['To'] = to_email
+
+                # Create HTML part
+                html_part = MIMEText(html_content, 'html')
+                msg.attach(html_part)
+
+                # Connect and send
+                with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+                    server.starttls()
+                    server.login(SMTP_USER, SMTP_PASSWORD)
+                    server.sendmail(SMTP_USER, to_email, msg.as_string())
+
+                return True
+
+            # Run in thread to not block async
+            await asyncio.to_thread(send_smtp_email)
+            logger.info(f"Email notification sent via SMTP to {to_email}")
             return {"success": True, "method": "smtp"}
+
         except Exception as e:
-            logger.error(f"SMTP email failed: {str(e)}")
-    
-    # Fallback to Resend if configured
+            logger.error(f"Failed to send email via SMTP: {str(e)}")
+            # Fall through to try Resend if configured
+
+    # Try Resend as fallback (paid)
     if RESEND_API_KEY:
         try:
-            import resend
-            resend.api_key = RESEND_API_KEY
-            resend.Emails.send({
-                "from": f"{SMTP_FROM_NAME} <{SENDER_EMAIL}>",
-                "to": to_email,
+            params = {
+                "from": SENDER_EMAIL,
+                "to": [to_email],
                 "subject": subject,
                 "html": html_content
-            })
-            logger.info(f"Email sent via Resend to {to_email}")
-            return {"success": True, "method": "resend"}
+            }
+            email = await asyncio.to_thread(get_resend().Emails.send, params)
+            logger.info(f"Email notification sent via Resend to {to_email}")
+            return {"success": True, "email_id": email.get("id"), "method": "resend"}
         except Exception as e:
-            logger.error(f"Resend email failed: {str(e)}")
-    
-    return {"success": False, "error": "No email provider configured"}
+            logger.error(f"Failed to send email via Resend: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    logger.warning("No email service configured - skipping email notification")
+    return {"success": False, "error": "Email not configured"}
@@ -0,0 +1,145 @@
+"""In-process pub/sub for pushing real-time events to connected browsers"""
+import asyncio
+import json
+from typing import Dict, Iterable, Optional, Set
+from config import logger
+
+SUBSCRIBER_QUEUE_SIZE = 100
+# Roles that work the whole SMS inbox, unknown senders included; everyone else
+# only hears about messages from clients they are assigned to
+INBOX_SUPERVISOR_ROLES = ("admin", "bdc", "bdc_manager")
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def role_channel(role: str) -> str:
+    return f"role:{role}"
+
+def inbox_channels(user_ids: Iterable[str] = ()) -> Set[str]:
+    """Channels an inbound SMS event goes to: the given users plus the inbox supervisors"""
+    return {user_channel(user_id) for user_id in user_ids} | {role_channel(role) for role in INBOX_SUPERVISOR_ROLES}
+
+def sms_event(message: dict) -> dict:
+    """sms_received payload: enough to refetch the conversation, without the body or phone number"""
+    return {"id": message.get("id"), "client_id": message.get("client_id"), "timestamp": message.get("timestamp")}
+
+class Subscription:
+    """One connected stream. Receives events for its user channel and its role's channel."""
+
+    def __init__(self, user_id: str, role: Optional[str] = None):
+        self.user_id = user_id
+        self.channels = {user_channel(user_id)}
+        if role:
+            self.channels.add(role_channel(role))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when events were dropped because the client is not keeping up;
+        # the stream then tells the browser to refetch instead of showing stale counts
+        self.overflowed = False
+
+    def offer(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class EventBus:
+    """
+    Fan-out of events to the subscriptions connected to this process.
+
+    publish() / publish_to() are called by the code that writes notifications
+    and inbound SMS.
+    With EVENT_BUS_BACKEND=change_streams that call is a no-op and a
+    ChangeStreamFeed delivers the same events from MongoDB instead, so every
+    worker process sees writes made by any other worker.
+    """
+
+    def __init__(self, local_publish: bool = True):
+        self.local_publish = local_publish
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, user_id: str, role: Optional[str] = None) -> Subscription:
+        subscription = Subscription(user_id, role)
+        for channel in subscription.channels:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._subscriptions.get(channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[channel]
+
+    def publish(self, channel: str, event_type: str, data: dict):
+        self.publish_to({channel}, event_type, data)
+
+    def publish_to(self, channels: Iterable[str], event_type: str, data: dict, local: bool = False):
+        """
+        Hand an event to every local subscriber of any of the channels, once
+        each (never blocks). A no-op when a feed delivers events instead,
+        unless `local` (the feed itself delivering).
+        """
+        if not (self.local_publish or local):
+            return
+        subscriptions = set()
+        for channel in channels:
+            subscriptions.update(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.offer({"type": event_type, "data": data})
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({s for subs in self._subscriptions.values() for s in subs})
+
+def format_sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class ChangeStreamFeed:
+    """
+    Feeds an EventBus from MongoDB change streams (requires a replica set).
+    Only inserts are forwarded; the event payload is the inserted document.
+    """
+
+    def __init__(self, db, bus: EventBus):
+        self.db = db
+        self.bus = bus
+        self._tasks = []
+
+    async def _watch(self, collection_name: str, pipeline: list, route):
+        while True:
+            try:
+                async with self.db[collection_name].watch(pipeline) as stream:
+                    async for change in stream:
+                        doc = change["fullDocument"]
+                        doc.pop("_id", None)
+                        channels, event_type, data = route(doc)
+                        self.bus.publish_to(channels, event_type, data, local=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change stream on {collection_name} failed, reconnecting: {e}")
+                await asyncio.sleep(5)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._watch(
+                "notifications",
+                [{"$match": {"operationType": "insert"}}],
+                lambda doc: ({user_channel(doc["user_id"])}, "notification", doc)
+            )),
+            # Supervisors only: assigned salespeople hear about it through their sms_received notification
+            asyncio.create_task(self._watch(
+                "sms_conversations",
+                [{"$match": {"operationType": "insert", "fullDocument.direction": "inbound"}}],
+                lambda doc: (inbox_channels(), "sms_received", sms_event(doc))
+            )),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,113 @@
+"""File download responses with ETag revalidation and byte-range support"""
+import hashlib
+import os
+import stat as stat_module
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """ETag derived from mtime and size (same scheme as Starlette's FileResponse)"""
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+def _parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range.
+
+    Returns (start, end) inclusive, None if the header should be ignored
+    (malformed or multi-range), or (-1, -1) if the range is unsatisfiable.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start_str, sep, end_str = ranges.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_str == "":
+            # Suffix range: last N bytes
+            suffix_length = int(end_str)
+            if suffix_length <= 0:
+                return (-1, -1)
+            start = max(file_size - suffix_length, 0)
+            end = file_size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+            if end_str and end < start:
+                return None
+            end = min(end, file_size - 1)
+    except ValueError:
+        return None
+
+    if start < 0 or start > end or start >= file_size:
+        return (-1, -1)
+    return (start, end)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def _iter_file_range(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, mode="rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def serve_file(request: Request, path: Path, media_type: str, filename: str) -> Response:
+    """
+    Stream a file from disk without buffering it in memory.
+
+    Sends Content-Length, ETag, Last-Modified and Accept-Ranges, answers
+    If-None-Match with 304 and a single-range Range header with 206.
+    """
+    stat_result = os.stat(path)
+    if not stat_module.S_ISREG(stat_result.st_mode):
+        raise FileNotFoundError(str(path))
+
+    file_size = stat_result.st_size
+    etag = file_etag(stat_result)
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, file_size)
+        if byte_range == (-1, -1):
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{file_size}", "Accept-Ranges": "bytes"})
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
+    # Full file: FileResponse streams in chunks and sets Content-Length itself
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
@@ -0,0 +1,71 @@
+"""Image normalization for uploaded documents"""
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional
+from config import logger
+
+DERIVATIVE_MAX_DIMENSION = int(os.environ.get('DOCUMENT_IMAGE_MAX_DIMENSION', '2000'))
+DERIVATIVE_QUALITY = int(os.environ.get('DOCUMENT_IMAGE_QUALITY', '85'))
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff'}
+
+def is_image_file(path: Path) -> bool:
+    return Path(path).suffix.lower() in IMAGE_EXTENSIONS
+
+def derivative_path_for(path: Path) -> Path:
+    """The normalized copy is stored next to the original: <name>.derived.jpg"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.derived.jpg")
+
+def create_image_derivative(source: Path, max_dimension: int = DERIVATIVE_MAX_DIMENSION, quality: int = DERIVATIVE_QUALITY) -> Optional[Path]:
+    """
+    Write a size-capped, EXIF-rotated RGB JPEG next to the original image.
+
+    Blocking (decodes the full image) - call through ensure_image_derivative()
+    from async code. Returns the derivative path, or None if the source could
+    not be decoded.
+    """
+    from PIL import Image as PILImage, ImageOps
+
+    target = derivative_path_for(source)
+    if target.exists():
+        return target
+
+    try:
+        with PILImage.open(source) as img:
+            # Let the JPEG decoder downscale by a power of two while decoding
+            if img.format == 'JPEG':
+                img.draft('RGB', (max_dimension, max_dimension))
+            img = ImageOps.exif_transpose(img)
+
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGBA')
+                background = PILImage.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            img.thumbnail((max_dimension, max_dimension), PILImage.Resampling.LANCZOS)
+
+            tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+            img.save(tmp_path, format='JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, target)
+    except Exception as e:
+        logger.error(f"Error creating image derivative for {source}: {e}")
+        return None
+
+    return target
+
+async def ensure_image_derivative(source: Path) -> Optional[Path]:
+    """Create the derivative for an image document in a worker thread (off the event loop)"""
+    if not is_image_file(source):
+        return None
+    return await asyncio.to_thread(create_image_derivative, Path(source))
+
+def document_output_path(doc: dict) -> Path:
+    """Path to read when rendering a document into a PDF or attachment: the derivative if present"""
+    derivative = doc.get("derivative_path")
+    if derivative and Path(derivative).exists():
+        return Path(derivative)
+    return Path(doc.get("path", ""))
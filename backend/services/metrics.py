@@ -0,0 +1,317 @@
+"""Per-route latency histograms, MongoDB command and connection-pool metrics in Prometheus text format"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_CALL_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+def route_template(scope: dict) -> str:
+    """Path template of the matched route ("/api/clients/{client_id}"), bounded label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+class RequestStats:
+    """MongoDB work done on behalf of one HTTP request"""
+    __slots__ = ("db_calls", "db_seconds", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        # The ASGI scope; routing adds the matched route to it in place
+        self.scope = scope or {}
+
+    @property
+    def route(self) -> str:
+        return route_template(self.scope)
+
+# Set by the request middleware. Motor runs pymongo in executor threads with a
+# copy of the caller's context, so the command listener sees the same object.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return "\n".join(lines)
+
+class Gauge:
+    """Current value per label set, moved up and down (e.g. connections in use)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return "\n".join(lines)
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics: each bucket counts observations <= le)"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return "\n".join(lines)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+class RequestMetrics:
+    """Metrics recorded by the HTTP middleware, one series per (method, route template, status)"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.latency = registry.register(Histogram(
+            "http_request_duration_seconds", "HTTP request latency until the last body chunk is sent",
+            LATENCY_BUCKETS, ("method", "route", "status")
+        ))
+        self.db_calls = registry.register(Histogram(
+            "http_request_db_calls", "MongoDB commands issued per HTTP request",
+            DB_CALL_BUCKETS, ("method", "route")
+        ))
+        self.db_seconds = registry.register(Histogram(
+            "http_request_db_seconds", "Time spent in MongoDB commands per HTTP request",
+            LATENCY_BUCKETS, ("method", "route")
+        ))
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        self.latency.observe(seconds, method, route, str(status))
+        self.db_calls.observe(stats.db_calls, method, route)
+        self.db_seconds.observe(stats.db_seconds, method, route)
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware feeding RequestMetrics. The request is observed when the
+    last body chunk has been sent, so streamed responses (file downloads, the
+    SSE stream) count their full duration and every query made while
+    streaming. The X-DB-Calls / X-DB-Time-Ms headers can only report the work
+    done before the headers went out.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        observed = False
+
+        def observe():
+            nonlocal observed
+            if not observed:
+                observed = True
+                self.metrics.observe(scope["method"], route_template(scope), status_code, time.perf_counter() - start, stats)
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Calls"] = str(stats.db_calls)
+                headers["X-DB-Time-Ms"] = f"{stats.db_seconds * 1000:.1f}"
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_request.reset(token)
+            # Errors and client disconnects before the last chunk
+            observe()
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener: counts every command against the current request
+    (see current_request) and keeps global per-command latency histograms.
+    Pass it to the client with event_listeners=[...].
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.duration = registry.register(Histogram(
+            "mongodb_command_duration_seconds", "MongoDB command latency",
+            LATENCY_BUCKETS, ("command",)
+        ))
+        self.failures = registry.register(Counter(
+            "mongodb_command_failures_total", "MongoDB commands that returned an error", ("command",)
+        ))
+
+    def started(self, event):
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_calls += 1
+
+    def _finished(self, event) -> float:
+        seconds = event.duration_micros / 1_000_000
+        self.duration.observe(seconds, event.command_name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_seconds += seconds
+        return seconds
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+        self.failures.inc(event.command_name)
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    pymongo connection-pool listener: time spent waiting to check out a
+    connection (a saturated pool shows up here before it shows up as slow
+    queries), checkout failures and connections open / in use per server.
+    Pass it to the client with event_listeners=[...].
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.wait = registry.register(Histogram(
+            "mongodb_pool_wait_seconds", "Time waiting to check out a pooled connection",
+            LATENCY_BUCKETS, ("address",)
+        ))
+        self.checkout_failures = registry.register(Counter(
+            "mongodb_pool_checkout_failures_total", "Connection checkouts that failed", ("address", "reason")
+        ))
+        self.open = registry.register(Gauge(
+            "mongodb_pool_connections", "Open pooled connections", ("address",)
+        ))
+        self.in_use = registry.register(Gauge(
+            "mongodb_pool_connections_in_use", "Pooled connections checked out", ("address",)
+        ))
+        # A checkout runs start to finish on the thread that requested it
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _waited(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            self._local.started = None
+            self.wait.observe(time.perf_counter() - started, _address(event))
+
+    def connection_checked_out(self, event):
+        self._waited(event)
+        self.in_use.inc(_address(event))
+
+    def connection_check_out_failed(self, event):
+        self._waited(event)
+        self.checkout_failures.inc(_address(event), str(event.reason))
+
+    def connection_checked_in(self, event):
+        self.in_use.dec(_address(event))
+
+    def connection_created(self, event):
+        self.open.inc(_address(event))
+
+    def connection_closed(self, event):
+        self.open.dec(_address(event))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
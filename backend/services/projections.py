@@ -0,0 +1,65 @@
+"""Lean projections for list endpoints: ?fields=summary or ?fields=name,phone,..."""
+import re
+from typing import Iterable, Optional, Sequence
+
+SUMMARY = "summary"
+# Top-level field names only: no operators, no dotted paths
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+MAX_FIELDS = 50
+
+class ListView:
+    """
+    The projection a list endpoint uses for its `fields` parameter.
+
+    - no `fields`: the full document (previous behaviour)
+    - `fields=summary`: the columns list screens show
+    - `fields=a,b,c`: those fields, restricted to `allowed` when given
+
+    `required` fields are always fetched because the endpoint derives values
+    from them (they come back in the response too); `id` is always included.
+    """
+
+    def __init__(self, summary: Sequence[str], required: Sequence[str] = (), allowed: Optional[Iterable[str]] = None):
+        self.summary = tuple(summary)
+        self.required = ("id",) + tuple(name for name in required if name != "id")
+        self.allowed = frozenset(allowed) if allowed is not None else None
+
+    def field_names(self, fields: Optional[str]) -> Optional[tuple]:
+        """Requested field names, None for the full document. ValueError on invalid names."""
+        if not fields:
+            return None
+        if fields == SUMMARY:
+            return self.summary
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        if not names or len(names) > MAX_FIELDS:
+            raise ValueError(f"fields must be '{SUMMARY}' or 1-{MAX_FIELDS} comma-separated field names")
+        invalid = [name for name in names if not FIELD_NAME.match(name) or (self.allowed is not None and name not in self.allowed)]
+        if invalid:
+            raise ValueError(f"Unknown fields: {', '.join(invalid)}")
+        return names
+
+    def projection(self, fields: Optional[str]) -> dict:
+        names = self.field_names(fields)
+        if names is None:
+            return {"_id": 0}
+        return {"_id": 0, **{name: 1 for name in self.required + names}}
+
+# Clients page: name, contact, ownership and document checkmarks; no financial/ID fields or document arrays
+CLIENT_SUMMARY = (
+    "first_name", "last_name", "phone", "email", "created_by", "created_at", "last_contact",
+    "is_sold", "sold_at", "is_deleted", "opt_out_sms",
+    "id_uploaded", "income_proof_uploaded", "residence_proof_uploaded",
+)
+
+# Opportunity lists: status and ownership, without the credit application fields
+USER_RECORD_SUMMARY = (
+    "client_id", "salesperson_id", "salesperson_name", "created_at", "opportunity_number", "previous_record_id",
+    "record_status", "finance_status", "dealer", "vehicle_make", "vehicle_year",
+    "collaborator_id", "collaborator_name", "is_deleted", "deleted_at",
+)
+
+# Pre-qualify inbox table
+PREQUALIFY_SUMMARY = (
+    "firstName", "lastName", "email", "phone", "estimatedDownPayment", "status", "created_at",
+    "matched_client_id", "matched_client_name",
+)
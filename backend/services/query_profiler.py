@@ -0,0 +1,210 @@
+"""MongoDB query-shape profiler: per-fingerprint timings and a slow-query log"""
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from bson.regex import Regex
+from pymongo import monitoring
+from config import logger
+from .metrics import current_request
+
+# Fingerprints tracked individually; commands beyond this many shapes are pooled
+MAX_SHAPES = 2000
+OTHER_SHAPE = "<other>"
+# Recent durations kept per shape for percentiles
+SAMPLES_PER_SHAPE = 512
+RECENT_SLOW = 100
+# Nesting depth rendered before a sub-document collapses to {...}
+MAX_DEPTH = 5
+
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+                    "endSessions", "killCursors", "buildInfo", "getLastError"}
+
+def value_shape(value, depth: int = 0) -> str:
+    """
+    Structure of a filter with the values blanked out:
+    {"phone": {"$regex": "213", "$options": "i"}, "id": {"$in": ["a", "b"]}}
+    -> "{id: {$in: [?]}, phone: regex}"
+    """
+    if isinstance(value, dict):
+        if "$regex" in value:
+            return "regex"
+        if depth >= MAX_DEPTH:
+            return "{...}"
+        return "{" + ", ".join(f"{key}: {value_shape(val, depth + 1)}" for key, val in sorted(value.items())) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(sorted({value_shape(item, depth + 1) for item in value})) + "]"
+    if isinstance(value, (Regex, re.Pattern)):
+        return "regex"
+    return "?"
+
+def _sort_shape(sort) -> str:
+    return "{" + ", ".join(f"{key}: {direction}" for key, direction in (sort or {}).items()) + "}"
+
+def _pipeline_shape(pipeline: list) -> str:
+    stages = []
+    for stage in pipeline or []:
+        if not isinstance(stage, dict) or not stage:
+            continue
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            stages.append(f"$match {value_shape(spec)}")
+        elif name in ("$lookup", "$unionWith"):
+            target = spec.get("from", spec.get("coll")) if isinstance(spec, dict) else spec
+            stages.append(f"{name} {target}")
+        elif name == "$sort":
+            stages.append(f"$sort {_sort_shape(spec)}")
+        else:
+            stages.append(name)
+    return "[" + ", ".join(stages) + "]"
+
+def fingerprint(command_name: str, command: dict) -> str:
+    """Query-shape key for a command, e.g. 'clients.find {phone: regex} sort {created_at: -1}'"""
+    collection = command.get(command_name)
+    if command_name == "find":
+        shape = f"{collection}.find {value_shape(command.get('filter', {}))}"
+        if command.get("sort"):
+            shape += f" sort {_sort_shape(command['sort'])}"
+        return shape
+    if command_name == "aggregate":
+        return f"{collection}.aggregate {_pipeline_shape(command.get('pipeline'))}"
+    if command_name == "count":
+        return f"{collection}.count {value_shape(command.get('query', {}))}"
+    if command_name == "distinct":
+        return f"{collection}.distinct {command.get('key')} {value_shape(command.get('query', {}))}"
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return f"{collection}.{command_name} {value_shape(statements[0].get('q', {}))}"
+    if command_name == "findAndModify":
+        return f"{collection}.findAndModify {value_shape(command.get('query', {}))}"
+    if command_name == "insert":
+        return f"{collection}.insert"
+    return f"{collection}.{command_name}" if isinstance(collection, str) else command_name
+
+class ShapeStats:
+    __slots__ = ("count", "total_seconds", "max_seconds", "samples", "routes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_SHAPE)
+        # route template -> count, to show where a shape comes from
+        self.routes: Dict[str, int] = {}
+
+    def add(self, seconds: float, route: str):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+        self.routes[route] = self.routes.get(route, 0) + 1
+
+    def snapshot(self) -> tuple:
+        """(count, total, max, samples, routes) copied; call with the profiler's lock held"""
+        return self.count, self.total_seconds, self.max_seconds, list(self.samples), dict(self.routes)
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class QueryProfiler(monitoring.CommandListener):
+    """
+    pymongo command listener that fingerprints every command by query shape
+    and aggregates count / total / p99 per shape. getMore batches are charged
+    to the find/aggregate that opened the cursor. Commands slower than
+    `slow_ms` are logged with the route that issued them.
+    """
+
+    def __init__(self, slow_ms: float = 100):
+        self.slow_seconds = slow_ms / 1000
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, tuple] = {}
+        self._cursors: Dict[int, str] = {}
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._recent_slow = deque(maxlen=RECENT_SLOW)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        cursor_id = None
+        try:
+            if event.command_name == "getMore":
+                cursor_id = event.command.get("getMore")
+                with self._lock:
+                    shape = self._cursors.get(cursor_id)
+                shape = shape or f"{event.command.get('collection')}.getMore"
+            else:
+                shape = fingerprint(event.command_name, event.command)
+        except Exception:
+            shape = event.command_name
+        stats = current_request.get()
+        route = stats.route if stats is not None else "<background>"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (shape, route, cursor_id)
+
+    def _finish(self, event, reply: Optional[dict]):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        shape, route, getmore_cursor_id = pending
+        seconds = event.duration_micros / 1_000_000
+
+        cursor = reply.get("cursor") if isinstance(reply, dict) else None
+        open_cursor_id = cursor.get("id") if isinstance(cursor, dict) else None
+        with self._lock:
+            if open_cursor_id:
+                # Remember which shape opened the cursor so its getMores are charged to it
+                if len(self._cursors) >= MAX_SHAPES * 10:
+                    self._cursors.clear()
+                self._cursors[open_cursor_id] = shape
+            elif getmore_cursor_id is not None:
+                self._cursors.pop(getmore_cursor_id, None)
+            key = shape if shape in self._shapes or len(self._shapes) < MAX_SHAPES else OTHER_SHAPE
+            entry = self._shapes.get(key)
+            if entry is None:
+                entry = self._shapes[key] = ShapeStats()
+            entry.add(seconds, route)
+
+        if seconds >= self.slow_seconds:
+            with self._lock:
+                self._recent_slow.append({"shape": shape, "route": route, "ms": round(seconds * 1000, 1)})
+            logger.warning(f"Slow MongoDB command {seconds * 1000:.0f}ms [{route}] {shape}")
+
+    def succeeded(self, event):
+        self._finish(event, event.reply)
+
+    def failed(self, event):
+        self._finish(event, None)
+
+    def top(self, limit: int = 20, sort: str = "total") -> List[dict]:
+        """Shapes ordered by total time (default), p99, max or count"""
+        # Copied under the lock: Motor's executor threads keep adding to the live stats
+        with self._lock:
+            items = [(shape, stats.snapshot()) for shape, stats in self._shapes.items()]
+        rows = []
+        for shape, (count, total_seconds, max_seconds, samples, routes) in items:
+            rows.append({
+                "shape": shape,
+                "count": count,
+                "total_ms": round(total_seconds * 1000, 1),
+                "mean_ms": round(total_seconds / count * 1000, 2) if count else 0,
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                "max_ms": round(max_seconds * 1000, 1),
+                "routes": dict(sorted(routes.items(), key=lambda item: -item[1])[:5]),
+            })
+        sort_key = {"total": "total_ms", "p99": "p99_ms", "max": "max_ms", "count": "count"}.get(sort, "total_ms")
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit]
+
+    def recent_slow(self) -> List[dict]:
+        with self._lock:
+            return list(self._recent_slow)
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._cursors.clear()
+            self._recent_slow.clear()
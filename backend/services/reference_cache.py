@@ -0,0 +1,73 @@
+"""In-memory cache for small reference data (config lists, SMS templates) served with ETags"""
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from starlette.requests import Request
+from starlette.responses import Response
+from .json_response import dumps
+
+@dataclass
+class CachedValue:
+    value: Any
+    # Serialized once per load; the ETag is its hash so every worker agrees on it
+    body: bytes
+    etag: str
+    loaded_at: float
+
+class ReferenceCache:
+    """
+    Versioned per-key cache. Writers call invalidate(key) after changing the
+    data; each invalidation bumps the key's version so a load that started
+    before it is not stored. Entries also expire after `ttl_seconds`, which
+    bounds how long a worker can serve data another worker has changed.
+    """
+
+    def __init__(self, ttl_seconds: float = 60):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, CachedValue] = {}
+        self._versions: Dict[str, int] = {}
+        # Bumped by invalidate_prefix, which also has to cover loads in flight for keys it can't see
+        self._generation = 0
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> CachedValue:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+            return entry
+        version, generation = self.version(key), self._generation
+        value = await loader()
+        body = dumps(value)
+        entry = CachedValue(value, body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', time.monotonic())
+        if self.version(key) == version and self._generation == generation:
+            self._entries[key] = entry
+        return entry
+
+    async def value(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        return (await self.get(key, loader)).value
+
+    def invalidate(self, *keys: str):
+        for key in keys:
+            self._versions[key] = self.version(key) + 1
+            self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        """Invalidate every key starting with `prefix` (e.g. all config list categories)"""
+        self._generation += 1
+        self.invalidate(*[key for key in list(self._entries) if key.startswith(prefix)])
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def cached_json_response(request: Request, entry: CachedValue) -> Response:
+    """200 with the cached body, or 304 without touching it when the client's copy is current"""
+    # Authenticated data: browsers may keep it but must revalidate every time
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,111 @@
+"""Retention policies: TTL expiry and archival of old rows to compressed NDJSON"""
+import asyncio
+import gzip
+import os
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import List, Optional
+from bson import json_util
+from pymongo.errors import OperationFailure
+from config import logger
+
+ARCHIVE_BATCH_SIZE = 1000
+
+async def ensure_ttl_index(collection, field: str, expire_after_seconds: int):
+    """Create a TTL index, or change its expiry in place if it already exists with another value"""
+    try:
+        await collection.create_index(field, expireAfterSeconds=expire_after_seconds)
+    except OperationFailure:
+        # IndexOptionsConflict: same key, different expireAfterSeconds
+        await collection.database.command({
+            "collMod": collection.name,
+            "index": {"keyPattern": {field: 1}, "expireAfterSeconds": expire_after_seconds}
+        })
+
+class RetentionPolicy:
+    """Rows of `collection` whose `time_field` is older than `days` (and match `query`) get archived"""
+
+    def __init__(self, collection: str, time_field: str, days: int, query: Optional[dict] = None):
+        self.collection = collection
+        self.time_field = time_field
+        self.days = days
+        self.query = query or {}
+
+def _write_archive(target: Path, docs: List[dict]):
+    """Write one archive file durably: gzip to a temp file, fsync it, then rename it into place"""
+    tmp_path = target.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "wb") as raw:
+            # The gzip trailer is written on close, so fsync the raw file after it
+            with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                out.write("".join(json_util.dumps(doc) + "\n" for doc in docs).encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, target)
+
+class Archiver:
+    """
+    Moves old rows out of hot collections into gzipped NDJSON files:
+    <archive_dir>/<collection>/<collection>-<UTC timestamp>-<part>.ndjson.gz
+
+    Rows are written with bson.json_util (extended JSON, lossless) so they
+    can be restored with mongoimport. They are archived ARCHIVE_BATCH_SIZE
+    at a time, one file per batch: a batch is deleted only after its file
+    has been fully written, fsynced and renamed into place. A failure part
+    way leaves the earlier batches archived and the rest in place for the
+    next run.
+    """
+
+    def __init__(self, db, archive_dir: Path, policies: List[RetentionPolicy]):
+        self.db = db
+        self.archive_dir = Path(archive_dir)
+        self.policies = policies
+
+    async def run(self) -> dict:
+        results = {}
+        for policy in self.policies:
+            if policy.days <= 0:
+                continue
+            try:
+                results[policy.collection] = await self.archive(policy)
+            except Exception as e:
+                logger.error(f"Archiving {policy.collection} failed: {e}")
+                results[policy.collection] = {"error": str(e)}
+        return results
+
+    async def archive(self, policy: RetentionPolicy) -> dict:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=policy.days)).isoformat()
+        query = {**policy.query, policy.time_field: {"$lt": cutoff}}
+        collection = self.db[policy.collection]
+
+        target_dir = self.archive_dir / policy.collection
+        target_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+        files = []
+        deleted = 0
+
+        async def flush(batch):
+            nonlocal deleted
+            target = target_dir / f"{policy.collection}-{stamp}-{len(files) + 1:04d}.ndjson.gz"
+            await asyncio.to_thread(_write_archive, target, batch)
+            files.append(str(target))
+            result = await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            deleted += result.deleted_count
+
+        batch = []
+        async for doc in collection.find(query).batch_size(ARCHIVE_BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= ARCHIVE_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        if not files:
+            return {"archived": 0}
+        logger.info(f"Archived {deleted} {policy.collection} rows older than {policy.days} days to {len(files)} file(s)")
+        return {"archived": deleted, "files": files}
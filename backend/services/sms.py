@@ -1,51 +1,77 @@
 """SMS service using Twilio"""
 import re
-from config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER, logger
+from config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER, TWILIO_MESSAGING_SERVICE_SID, logger
 
-# Initialize Twilio client
-twilio_client = None
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    try:
-        from twilio.rest import Client as TwilioClient
-        twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-    except Exception as e:
-        logger.warning(f"Could not initialize Twilio client: {e}")
+_twilio_client = None
+
+def get_twilio_client():
+    """Shared Twilio REST client, created on first use. None when Twilio is not configured."""
+    global _twilio_client
+    if _twilio_client is None and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
+        try:
+            from twilio.rest import Client as TwilioClient
+            _twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        except Exception as e:
+            logger.warning(f"Could not initialize Twilio client: {e}")
+    return _twilio_client
 
 def normalize_phone(phone: str) -> str:
-    """Normalize phone number to E.164 format (+1XXXXXXXXXX)"""
+    """
+    Normalize phone number to E.164 format for US numbers: +1XXXXXXXXXX
+    Accepts various formats: 1234567890, (123) 456-7890, 123-456-7890, +1 123 456 7890, etc.
+    """
     if not phone:
         return phone
-    
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
-    
-    # Handle different formats
+
+    # Remove all non-digit characters except +
+    digits = re.sub(r'[^\d]', '', phone)
+
+    # Handle different cases
     if len(digits) == 10:
+        # US number without country code: 2134629914 -> +12134629914
         return f"+1{digits}"
     elif len(digits) == 11 and digits.startswith('1'):
+        # US number with country code: 12134629914 -> +12134629914
         return f"+{digits}"
-    elif len(digits) > 10:
+    elif len(digits) > 11:
+        # International number or has extra digits
         return f"+{digits}"
-    
-    return phone
+    else:
+        # Return as-is with + prefix if missing
+        if not phone.startswith('+'):
+            return f"+{digits}"
+        return phone
 
-async def send_sms_twilio(to_phone: str, message: str):
-    """Send SMS via Twilio"""
+async def send_sms_twilio(to_phone: str, message: str) -> dict:
+    """Send SMS using Twilio with A2P 10DLC Messaging Service. Returns status dict."""
+    twilio_client = get_twilio_client()
     if not twilio_client:
-        logger.warning("Twilio not configured - SMS not sent")
+        logger.warning("Twilio client not configured - SMS not sent")
         return {"success": False, "error": "Twilio not configured"}
-    
+
     try:
-        normalized_phone = normalize_phone(to_phone)
-        
-        msg = twilio_client.messages.create(
-            body=message,
-            from_=TWILIO_PHONE_NUMBER,
-            to=normalized_phone
-        )
-        
-        logger.info(f"SMS sent to {normalized_phone}: {msg.sid}")
-        return {"success": True, "sid": msg.sid}
+        # Ensure phone number is in E.164 format
+        if not to_phone.startswith('+'):
+            to_phone = '+1' + to_phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
+
+        # Use Messaging Service SID for A2P 10DLC compliance (required)
+        # Falls back to phone number if Messaging Service not configured
+        if TWILIO_MESSAGING_SERVICE_SID:
+            message_obj = twilio_client.messages.create(
+                body=message,
+                messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID,
+                to=to_phone
+            )
+            logger.info(f"SMS sent via Messaging Service to {to_phone}: SID={message_obj.sid}")
+        else:
+            message_obj = twilio_client.messages.create(
+                body=message,
+                from_=TWILIO_PHONE_NUMBER,
+                to=to_phone
+            )
+            logger.info(f"SMS sent via phone number to {to_phone}: SID={message_obj.sid}")
+
+        return {"success": True, "sid": message_obj.sid, "status": message_obj.status}
     except Exception as e:
-        logger.error(f"SMS failed to {to_phone}: {str(e)}")
+        logger.error(f"Failed to send SMS to {to_phone}: {str(e)}")
         return {"success": False, "error": str(e)}
@@ -0,0 +1,74 @@
+"""Maintained unread counters for notification and inbox badges"""
+from typing import Dict, List
+from pymongo import UpdateOne
+from config import logger
+
+INBOX_TOTAL = "sms:all"
+
+def notifications_key(user_id: str) -> str:
+    return f"notifications:{user_id}"
+
+def inbox_key(client_id: str) -> str:
+    return f"sms:{client_id}"
+
+class UnreadCounters:
+    """
+    One small document per badge in the `unread_counters` collection:
+    {_id: "notifications:<user_id>" | "sms:<client_id>" | "sms:all", count}.
+
+    Writers $inc the counter right after inserting an unread item and
+    decrement it by the modified_count of a mark-read update, so every
+    unread -> read transition is counted exactly once. Reads are a single
+    _id lookup. rebuild() recomputes everything from the source collections.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.unread_counters
+
+    async def increment(self, deltas: Dict[str, int]):
+        ops = [
+            UpdateOne({"_id": key}, {"$inc": {"count": delta}}, upsert=True)
+            for key, delta in deltas.items() if delta
+        ]
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def get(self, key: str) -> int:
+        doc = await self.collection.find_one({"_id": key})
+        # A mark-read racing an insert can leave the counter briefly below zero
+        return max(doc["count"], 0) if doc else 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, int]:
+        counts = {key: 0 for key in keys}
+        async for doc in self.collection.find({"_id": {"$in": keys}}):
+            counts[doc["_id"]] = max(doc["count"], 0)
+        return counts
+
+    async def rebuild(self) -> int:
+        """Recompute every counter from notifications and sms_conversations"""
+        counts: Dict[str, int] = {}
+        async for row in self.db.notifications.aggregate([
+            {"$match": {"is_read": False}},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+        ]):
+            counts[notifications_key(row["_id"])] = row["count"]
+
+        total = 0
+        async for row in self.db.sms_conversations.aggregate([
+            {"$match": {"direction": "inbound", "is_read": False}},
+            {"$group": {"_id": "$client_id", "count": {"$sum": 1}}}
+        ]):
+            total += row["count"]
+            if row["_id"]:
+                counts[inbox_key(row["_id"])] = row["count"]
+        counts[INBOX_TOTAL] = total
+
+        ops = [UpdateOne({"_id": key}, {"$set": {"count": count}}, upsert=True) for key, count in counts.items()]
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+        # Counters that have no unread items anymore
+        await self.collection.update_many({"_id": {"$nin": list(counts)}}, {"$set": {"count": 0}})
+
+        logger.info(f"Rebuilt {len(counts)} unread counters")
+        return len(counts)
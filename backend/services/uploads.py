@@ -0,0 +1,45 @@
+"""Streaming upload helpers"""
+import hashlib
+from pathlib import Path
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from config import logger
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+async def save_upload_stream(upload: UploadFile, dest: Path, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> dict:
+    """
+    Stream an UploadFile to disk in fixed-size chunks.
+
+    The SHA-256 is computed while writing, and the write is aborted (and the
+    partial file removed) as soon as the upload exceeds max_bytes.
+
+    Returns:
+        {"size": int, "sha256": str}
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(dest, 'wb') as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El archivo {upload.filename} excede el tamaño máximo de {max_bytes // (1024 * 1024)} MB"
+                    )
+                hasher.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Never leave partial uploads behind
+        try:
+            dest.unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(f"Error removing partial upload {dest}: {e}")
+        raise
+
+    return {"size": size, "sha256": hasher.hexdigest()}
@@ -0,0 +1,179 @@
+"""Durable acknowledge-then-process queue for inbound webhooks"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import logger
+
+class WebhookQueue:
+    """
+    Webhook payloads are written to a MongoDB collection keyed by the provider's
+    message id and acknowledged right away; a background consumer claims them
+    one at a time and runs the handler.
+
+    - Enqueueing the same key twice is a no-op, so provider retries and replays
+      are processed once.
+    - Claims are leases: an item whose worker died is picked up again once
+      its lease expires, by any process sharing the database.
+    - Failed items are retried with exponential backoff, then parked as "failed".
+      Handlers with several side effects wrap each in run_step() so a retry
+      only redoes the ones that had not finished.
+    - Finished items are kept for `retention` (TTL index on expire_at) so late
+      retries are still recognized as duplicates.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection_name: str,
+        handler: Callable[[dict], Awaitable[None]],
+        max_attempts: int = 5,
+        lease: timedelta = timedelta(minutes=2),
+        poll_interval: float = 5.0,
+        retention: timedelta = timedelta(days=7),
+        concurrency: int = 4,
+    ):
+        self.collection = db[collection_name]
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def create_indexes(self):
+        """Create the queue's indexes; a failure is logged and the others are still created"""
+        for keys, options in (
+            ("key", {"unique": True}),
+            ([("status", 1), ("available_at", 1)], {}),
+            # expire_at is a BSON date (TTL indexes ignore ISO strings)
+            ("expire_at", {"expireAfterSeconds": 0}),
+        ):
+            try:
+                await self.collection.create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"Error creating index {keys!r} on {self.collection.name}: {e}")
+
+    async def enqueue(self, key: str, payload: dict) -> bool:
+        """Store a payload durably. Returns False if this key was already enqueued."""
+        now = datetime.now(timezone.utc)
+        try:
+            result = await self.collection.update_one(
+                {"key": key},
+                {"$setOnInsert": {
+                    "key": key,
+                    "payload": payload,
+                    "status": "pending",
+                    "attempts": 0,
+                    "received_at": now.isoformat(),
+                    "available_at": now.isoformat(),
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Two concurrent deliveries of the same key raced on the upsert
+            return False
+
+        if result.upserted_id is None:
+            return False
+        self._wakeup.set()
+        return True
+
+    async def run_step(self, item: dict, step: str, action: Callable[[], Awaitable[None]]):
+        """
+        Run one side effect of the handler unless an earlier attempt at this item
+        already finished it. Finished steps are recorded on the item.
+        """
+        done = item.setdefault("steps_done", [])
+        if step in done:
+            return
+        await action()
+        await self.collection.update_one({"key": item["key"]}, {"$addToSet": {"steps_done": step}})
+        done.append(step)
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "available_at": {"$lte": now.isoformat()}},
+                    {"status": "processing", "available_at": {"$lte": now.isoformat()}},
+                ]
+            },
+            {
+                "$set": {"status": "processing", "available_at": (now + self.lease).isoformat()},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _complete(self, item: dict):
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"key": item["key"]},
+            {"$set": {
+                "status": "done",
+                "processed_at": now.isoformat(),
+                "expire_at": now + self.retention,
+            }}
+        )
+
+    async def _fail(self, item: dict, error: Exception):
+        now = datetime.now(timezone.utc)
+        attempts = item.get("attempts", 1)
+        update = {"error": str(error)}
+        if attempts >= self.max_attempts:
+            update.update({"status": "failed", "expire_at": now + self.retention})
+            logger.error(f"Webhook item {item['key']} failed permanently after {attempts} attempts: {error}")
+        else:
+            backoff = timedelta(seconds=2 ** attempts)
+            update.update({"status": "pending", "available_at": (now + backoff).isoformat()})
+            logger.warning(f"Webhook item {item['key']} failed (attempt {attempts}), retrying in {backoff.seconds}s: {error}")
+        await self.collection.update_one({"key": item["key"]}, {"$set": update})
+
+    async def drain(self) -> int:
+        """Process every item that is currently due. Returns how many were handled."""
+        handled = 0
+        while True:
+            item = await self._claim()
+            if not item:
+                return handled
+            try:
+                await self.handler(item)
+            except Exception as e:
+                await self._fail(item, e)
+            else:
+                await self._complete(item)
+            handled += 1
+
+    async def _run(self):
+        while True:
+            # Cleared before draining so an enqueue during the drain is not missed
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook queue consumer error: {e}")
+            # Wake on local enqueues; poll for retries and items enqueued by other workers
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the consumers (claims are atomic, so they never process the same item twice)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Unit tests import backend modules directly; config only needs these to be
+# set (no connection is made), so a checkout without backend/.env works too
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "dealercrm_test")
@@ -0,0 +1,111 @@
+"""
+Unit tests for the admin backup endpoints (GET /api/admin/backup,
+POST /api/admin/restore, DELETE /api/admin/delete-all-data): data derived
+from the restored collections must be rebuilt with them.
+"""
+
+import asyncio
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from starlette.datastructures import UploadFile
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+from services.datetimes import with_datetime_mirrors  # noqa: E402
+from services.unread_counters import INBOX_TOTAL, UnreadCounters, inbox_key, notifications_key  # noqa: E402
+
+ADMIN = {"id": "admin-1", "role": "admin", "name": "Admin", "email": "admin@example.com"}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "analytics_db", db)
+    monkeypatch.setattr(server, "unread_counters", UnreadCounters(db))
+    return db
+
+
+def restore(collections, merge_mode="replace"):
+    upload = UploadFile(io.BytesIO(json.dumps({"collections": collections}).encode()), filename="backup.json")
+    return asyncio.run(server.restore_backup(file=upload, merge_mode=merge_mode, current_user=ADMIN))
+
+
+async def download_json():
+    response = await server.download_backup(current_user=ADMIN)
+    return json.loads("".join([chunk async for chunk in response.body_iterator]))
+
+
+def counter(key):
+    return asyncio.run(server.unread_counters.get(key))
+
+
+class TestUnreadCounters:
+    """Badge counters follow a wholesale replace of their source collections"""
+
+    def test_restore_rebuilds_counters(self, db):
+        asyncio.run(server.unread_counters.increment({notifications_key("u1"): 7, INBOX_TOTAL: 7}))
+        restore({
+            "notifications": [
+                {"id": "n1", "user_id": "u1", "is_read": False},
+                {"id": "n2", "user_id": "u1", "is_read": True},
+            ],
+            "sms_conversations": [
+                {"id": "m1", "client_id": "c1", "direction": "inbound", "is_read": False},
+                {"id": "m2", "client_id": "c1", "direction": "outbound", "is_read": False},
+            ],
+        })
+        assert counter(notifications_key("u1")) == 1
+        assert counter(inbox_key("c1")) == 1
+        assert counter(INBOX_TOTAL) == 1
+
+    def test_delete_all_data_zeroes_counters(self, db):
+        asyncio.run(db.notifications.insert_one({"id": "n1", "user_id": "u1", "is_read": False}))
+        asyncio.run(server.unread_counters.increment({notifications_key("u1"): 1, INBOX_TOTAL: 3}))
+        asyncio.run(server.delete_all_data(current_user=ADMIN))
+        assert counter(notifications_key("u1")) == 0
+        assert counter(INBOX_TOTAL) == 0
+
+
+class TestPublicLinks:
+    """expire_at comes back as the BSON date the TTL index acts on"""
+
+    @pytest.mark.parametrize("merge_mode", ["replace", "merge"])
+    def test_expire_at_rederived_from_expires_at(self, db, merge_mode):
+        restore({"public_links": [{
+            "id": "l1", "token": "t1",
+            "created_at": "2026-03-01T10:00:00+00:00",
+            "expires_at": "2026-03-31T10:00:00+00:00",
+            "expire_at": "2026-03-31 10:00:00+00:00",
+        }]}, merge_mode=merge_mode)
+        link = asyncio.run(db.public_links.find_one({"id": "l1"}))
+        assert link["expire_at"] == datetime(2026, 3, 31, 10, 0)
+
+    def test_missing_expiry_falls_back_to_created_at(self, db):
+        restore({"public_links": [{"id": "l1", "token": "t1", "created_at": "2026-03-01T10:00:00Z"}]})
+        link = asyncio.run(db.public_links.find_one({"id": "l1"}))
+        assert link["expire_at"] == datetime(2026, 3, 31, 10, 0)
+
+
+class TestDatetimeMirrors:
+    """The "<field>_dt" mirrors come back as BSON dates, not the backup's strings"""
+
+    def test_backup_round_trip(self, db):
+        sold_at = datetime(2026, 3, 2, 15, 30, tzinfo=timezone.utc)
+        asyncio.run(db.clients.insert_one(with_datetime_mirrors({
+            "id": "c1", "first_name": "Ana",
+            "created_at": "2026-03-01T10:00:00+00:00",
+            "sold_at": sold_at.isoformat(),
+        })))
+        backup = asyncio.run(download_json())
+
+        for merge_mode in ("replace", "merge"):
+            restore({"clients": backup["collections"]["clients"]}, merge_mode=merge_mode)
+            client = asyncio.run(db.clients.find_one({"id": "c1"}))
+            assert client["created_at_dt"] == datetime(2026, 3, 1, 10, 0)
+            assert client["sold_at_dt"] == datetime(2026, 3, 2, 15, 30)
+            assert asyncio.run(db.clients.count_documents({"sold_at_dt": {"$gte": datetime(2026, 3, 1)}})) == 1
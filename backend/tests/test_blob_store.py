@@ -0,0 +1,138 @@
+"""
+Unit tests for services/blob_store.py: content-addressed storage, reference
+counting and garbage collection with its grace period.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from services.blob_store import BlobStore, file_sha256
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+
+
+@pytest.fixture
+def store(tmp_path, db):
+    return BlobStore(tmp_path / "blobs", db)
+
+
+def stage(store, content: bytes):
+    path = store.staging_path()
+    path.write_bytes(content)
+    return path
+
+
+async def blob_row(db, sha256):
+    return await db.document_blobs.find_one({"sha256": sha256}, {"_id": 0})
+
+
+async def backdate(db, sha256, hours=2):
+    past = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    await db.document_blobs.update_one({"sha256": sha256}, {"$set": {"updated_at": past}})
+
+
+class TestBlobStore:
+    """Storing and referencing blobs"""
+
+    def test_identical_content_stored_once(self, store, db):
+        async def scenario():
+            first = stage(store, b"same bytes")
+            sha256 = file_sha256(first)
+            path_a = await store.commit(first, sha256, ".PDF")
+            path_b = await store.commit(stage(store, b"same bytes"), sha256, ".jpg")
+            return sha256, path_a, path_b, await blob_row(db, sha256)
+
+        sha256, path_a, path_b, row = asyncio.run(scenario())
+        # The first upload's extension wins, lower-cased
+        assert path_a == path_b == store.blob_path(sha256, ".pdf")
+        assert path_a.read_bytes() == b"same bytes"
+        assert row["ref_count"] == 2
+        assert list(store.staging_dir.iterdir()) == []
+
+    def test_ingest_links_existing_file(self, store, db, tmp_path):
+        source = tmp_path / "legacy.pdf"
+        source.write_bytes(b"legacy upload")
+
+        result = asyncio.run(store.ingest(source))
+        assert result["sha256"] == file_sha256(source)
+        assert result["size"] == len(b"legacy upload")
+        assert store.is_blob(result["path"])
+        assert not store.is_blob(str(source))
+        assert source.exists()
+
+    def test_release_decrements(self, store, db):
+        async def scenario():
+            path = stage(store, b"doc")
+            sha256 = file_sha256(path)
+            await store.commit(path, sha256, ".pdf")
+            await store.release(sha256)
+            return await blob_row(db, sha256)
+
+        assert asyncio.run(scenario())["ref_count"] == 0
+
+
+class TestGarbageCollection:
+    """collect_garbage() against the clients collection"""
+
+    def test_unreferenced_blob_deleted_after_grace(self, store, db):
+        async def scenario():
+            path = stage(store, b"orphan")
+            sha256 = file_sha256(path)
+            blob_path = await store.commit(path, sha256, ".pdf")
+            await store.release(sha256)
+            await backdate(db, sha256)
+            return blob_path, await store.collect_garbage(), await blob_row(db, sha256)
+
+        blob_path, result, row = asyncio.run(scenario())
+        assert result["deleted"] == 1
+        assert result["freed_bytes"] == len(b"orphan")
+        assert row is None
+        assert not blob_path.exists()
+
+    def test_recent_blob_kept_during_grace(self, store, db):
+        async def scenario():
+            # Committed, but the client document has not been saved yet
+            path = stage(store, b"in flight")
+            sha256 = file_sha256(path)
+            blob_path = await store.commit(path, sha256, ".pdf")
+            return blob_path, await store.collect_garbage()
+
+        blob_path, result = asyncio.run(scenario())
+        assert result["deleted"] == 0
+        assert blob_path.exists()
+
+    def test_referenced_blob_kept_and_count_repaired(self, store, db):
+        async def scenario():
+            path = stage(store, b"id card")
+            sha256 = file_sha256(path)
+            blob_path = await store.commit(path, sha256, ".jpg")
+            await db.clients.insert_one({
+                "id": "c1",
+                "id_documents": [{"sha256": sha256}, {"sha256": sha256}],
+                "income_documents": [{"sha256": sha256}],
+            })
+            await backdate(db, sha256)
+            return sha256, blob_path, await store.collect_garbage()
+
+        sha256, blob_path, result = asyncio.run(scenario())
+        assert result == {"deleted": 0, "freed_bytes": 0, "repaired": 1}
+        assert blob_path.exists()
+        assert asyncio.run(blob_row(db, sha256))["ref_count"] == 3
+
+    def test_stale_staging_files_removed(self, store):
+        stale = stage(store, b"interrupted upload")
+        fresh = stage(store, b"upload in progress")
+        old = (datetime.now(timezone.utc) - timedelta(hours=2)).timestamp()
+        os.utime(stale, (old, old))
+
+        asyncio.run(store.collect_garbage())
+        assert not stale.exists()
+        assert fresh.exists()
@@ -0,0 +1,101 @@
+"""
+Unit tests for services/client_search.py: search tokens, query parsing and
+relevance ranking.
+"""
+
+import re
+
+from services.client_search import (
+    SEARCH_FIELD, client_search_tokens, fold_text, parse_search_query, rank_by_relevance,
+    ranked_search_pipeline, relevance_score, search_filter, with_search_tokens,
+)
+
+
+class TestSearchTokens:
+    """Tokens stored on clients"""
+
+    def test_fold_text(self):
+        assert fold_text("José Peña") == "jose pena"
+        assert fold_text("  O'Brien-Smith ") == "o brien smith"
+        assert fold_text(None) == ""
+
+    def test_client_tokens(self):
+        tokens = client_search_tokens("María José", "Núñez", "(213) 462-9914")
+        assert tokens == sorted(["maria", "jose", "nunez", "2134629914", "4629914", "9914"])
+
+    def test_eleven_digit_phone_indexes_ten_digit_suffix(self):
+        assert "2134629914" in client_search_tokens("", "", "+1 213 462 9914")
+
+    def test_with_search_tokens_on_set_dict(self):
+        update = {"first_name": "Ana", "last_name": "Ruiz", "phone": "2135550100"}
+        assert with_search_tokens(update) is update
+        assert update[SEARCH_FIELD] == client_search_tokens("Ana", "Ruiz", "2135550100")
+
+
+class TestSearchQuery:
+    """Parsing user input into prefix terms"""
+
+    def test_name_terms(self):
+        assert parse_search_query("José  PEÑA jose") == ["jose", "pena"]
+
+    def test_phone_input_is_one_term(self):
+        assert parse_search_query("(213) 462-99") == ["21346299"]
+        assert parse_search_query("  ") == []
+
+    def test_filter_is_anchored(self):
+        query = search_filter(["jo", "a.b"])
+        patterns = [pattern.pattern for pattern in query[SEARCH_FIELD]["$all"]]
+        assert patterns == ["^jo", "^" + re.escape("a.b")]
+
+
+class TestRelevance:
+    """Ranking search matches"""
+
+    def test_relevance_score(self):
+        assert relevance_score(["maria"], ["maria"]) == 1.0
+        assert relevance_score(["mar"], ["maria", "martinez"]) == 0.6
+        assert relevance_score(["ana", "zz"], ["ana"]) == 0.5
+        assert relevance_score([], ["ana"]) == 0.0
+
+    def test_rank_sorts_best_first_and_drops_tokens(self):
+        docs = [
+            {"id": "1", SEARCH_FIELD: ["martinez"]},
+            {"id": "2", SEARCH_FIELD: ["mar"]},
+        ]
+        ranked = rank_by_relevance(docs, ["mar"])
+        assert [doc["id"] for doc in ranked] == ["2", "1"]
+        assert all(SEARCH_FIELD not in doc for doc in ranked)
+        assert ranked[0]["search_score"] == 1.0
+
+    def test_rank_without_terms_adds_no_score(self):
+        docs = [{"id": "1", SEARCH_FIELD: ["ana"]}, {"id": "2"}]
+        assert rank_by_relevance(docs, []) == [{"id": "1"}, {"id": "2"}]
+
+    def test_rank_keeps_order_when_not_sorting(self):
+        docs = [{"id": "1", SEARCH_FIELD: ["anabel"]}, {"id": "2", SEARCH_FIELD: ["ana"]}]
+        ranked = rank_by_relevance(docs, ["ana"], sort=False)
+        assert [doc["id"] for doc in ranked] == ["1", "2"]
+        assert ranked[1]["search_score"] == 1.0
+
+
+class TestRankedSearchPipeline:
+    """Aggregation used when a search has terms and no explicit sort"""
+
+    def test_stages(self):
+        query = {"created_by": "u1"}
+        pipeline = ranked_search_pipeline(query, ["ana"], {"_id": 0}, [("created_at", -1)], 1000)
+        assert [next(iter(stage)) for stage in pipeline] == ["$match", "$addFields", "$sort", "$limit", "$project"]
+        assert pipeline[0]["$match"] is query
+        assert list(pipeline[2]["$sort"].items()) == [("search_score", -1), ("created_at", -1)]
+        assert pipeline[3]["$limit"] == 1000
+
+    def test_exclusion_projection_drops_tokens(self):
+        pipeline = ranked_search_pipeline({}, ["ana"], {"_id": 0}, [], 10)
+        assert pipeline[-1]["$project"] == {"_id": 0, SEARCH_FIELD: 0}
+
+    def test_inclusion_projection_keeps_score_not_tokens(self):
+        projection = {"_id": 0, "id": 1, "first_name": 1, SEARCH_FIELD: 1}
+        pipeline = ranked_search_pipeline({}, ["ana"], projection, [], 10)
+        assert pipeline[-1]["$project"] == {"_id": 0, "id": 1, "first_name": 1, "search_score": 1}
+        # The caller's projection is left alone
+        assert SEARCH_FIELD in projection
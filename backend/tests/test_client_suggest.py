@@ -0,0 +1,162 @@
+"""
+Unit tests for services/client_suggest.py: the in-process typeahead index
+behind GET /api/clients/suggest.
+"""
+
+import asyncio
+
+import pytest
+
+from services.client_suggest import ClientSuggestIndex
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+CLIENTS = [
+    {"id": "c1", "first_name": "María", "last_name": "López", "phone": "2135550101", "created_by": "tm1"},
+    {"id": "c2", "first_name": "Mario", "last_name": "Lopez", "phone": "2135550102", "created_by": "tm1"},
+    {"id": "c3", "first_name": "Marcos", "last_name": "Ruiz", "phone": "3105550103", "created_by": "tm2"},
+    {"id": "c4", "first_name": "Ana", "last_name": "Mar", "phone": "3105550104", "created_by": "tm2"},
+    {"id": "c5", "first_name": "Mariana", "last_name": "Soto", "phone": "3105550105", "created_by": "tm1", "is_deleted": True},
+]
+
+
+@pytest.fixture
+def db():
+    db = mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+    asyncio.run(db.clients.insert_many([dict(client) for client in CLIENTS]))
+    return db
+
+
+@pytest.fixture
+def index(db):
+    index = ClientSuggestIndex()
+    asyncio.run(index.load(db))
+    return index
+
+
+def ids(results):
+    return [result["id"] for result in results]
+
+
+class TestSuggest:
+    """Prefix matching, ranking and ownership"""
+
+    def test_load_skips_deleted_clients(self, index):
+        assert index.ready
+        assert len(index) == 4
+
+    def test_exact_token_ranks_first(self, index):
+        results = index.suggest("mar")
+        assert ids(results)[0] == "c4"
+        assert results[0]["score"] == 1.0
+        assert set(ids(results)) == {"c1", "c2", "c3", "c4"}
+
+    def test_every_term_must_match(self, index):
+        assert ids(index.suggest("mari lop")) == ["c2", "c1"]
+        assert index.suggest("mari ruiz") == []
+
+    def test_phone_digits(self, index):
+        assert ids(index.suggest("(213) 555-01")) == ["c2", "c1"]
+        assert ids(index.suggest("0103")) == ["c3"]
+
+    def test_owner_filters(self, index):
+        assert set(ids(index.suggest("mar", owners=["tm2"]))) == {"c3", "c4"}
+        assert set(ids(index.suggest("mar", exclude_owners=["tm2"]))) == {"c1", "c2"}
+        assert index.suggest("mar", owners=["nobody"]) == []
+
+    def test_limit_and_empty_query(self, index):
+        assert len(index.suggest("mar", limit=2)) == 2
+        assert index.suggest("  ") == []
+
+    def test_result_shape(self, index):
+        [result] = index.suggest("marcos")
+        assert result == {
+            "id": "c3", "first_name": "Marcos", "last_name": "Ruiz",
+            "phone": "3105550103", "created_by": "tm2", "score": 1.0,
+        }
+
+
+class TestIncrementalUpdates:
+    """Writes applied between full loads"""
+
+    def test_upsert_renames_and_moves_owner(self, index):
+        index.upsert({**CLIENTS[2], "first_name": "Lucas", "created_by": "tm1"})
+        assert index.suggest("marcos") == []
+        [result] = index.suggest("lucas", owners=["tm1"])
+        assert result["id"] == "c3"
+
+    def test_upsert_deleted_removes(self, index):
+        index.upsert({**CLIENTS[3], "is_deleted": True})
+        assert "c4" not in ids(index.suggest("ana"))
+        assert len(index) == 3
+
+    def test_refresh_rereads_one_client(self, index, db):
+        asyncio.run(db.clients.update_one({"id": "c1"}, {"$set": {"last_name": "Vega"}}))
+        asyncio.run(index.refresh(db, "c1"))
+        assert ids(index.suggest("vega")) == ["c1"]
+
+        asyncio.run(db.clients.delete_one({"id": "c1"}))
+        asyncio.run(index.refresh(db, "c1"))
+        assert index.suggest("vega") == []
+
+
+class SlowClients:
+    """db stand-in whose clients cursor runs `during` halfway through, like a write racing load()"""
+
+    def __init__(self, docs, during):
+        self.docs = docs
+        self.during = during
+        self.clients = self
+
+    def find(self, query, projection):
+        async def cursor():
+            for i, doc in enumerate(self.docs):
+                if i == len(self.docs) // 2:
+                    self.during()
+                await asyncio.sleep(0)
+                yield dict(doc)
+        return cursor()
+
+
+class TestReload:
+    """Writes made while load() reads the collection"""
+
+    def test_writes_during_load_survive_the_swap(self, index):
+        def concurrent_writes():
+            index.upsert({"id": "c9", "first_name": "Nuevo", "last_name": "Cliente", "phone": "", "created_by": "tm1"})
+            index.remove("c1")
+
+        live = [client for client in CLIENTS if not client.get("is_deleted")]
+        asyncio.run(index.load(SlowClients(live, concurrent_writes)))
+
+        assert ids(index.suggest("nuevo")) == ["c9"]
+        assert "c1" not in ids(index.suggest("maria"))
+        assert len(index) == 4
+
+    def test_overlapping_load_skipped(self, index):
+        loads = []
+
+        def start_second_load():
+            loads.append(asyncio.get_running_loop().create_task(index.load(SlowClients([], lambda: None))))
+
+        async def scenario():
+            await index.load(SlowClients(CLIENTS[:2], start_second_load))
+            await asyncio.gather(*loads)
+
+        asyncio.run(scenario())
+        # The second load found the first still running and left the index alone
+        assert len(index) == 2
+
+
+class TestCandidateCap:
+    """MAX_CANDIDATES counts only clients that match every term"""
+
+    def test_cap_does_not_cut_full_matches(self, monkeypatch):
+        monkeypatch.setattr("services.client_suggest.MAX_CANDIDATES", 5)
+        index = ClientSuggestIndex()
+        # Twenty clients match the lead term alone and their tokens sort before the one full match
+        for letter in "abcdefghijklmnopqrst":
+            index.upsert({"id": f"x{letter}", "first_name": f"Martin{letter}", "last_name": "Perez", "phone": "", "created_by": "tm1"})
+        index.upsert({"id": "target", "first_name": "Martinz", "last_name": "Zuniga", "phone": "", "created_by": "tm1"})
+
+        assert ids(index.suggest("martin zu")) == ["target"]
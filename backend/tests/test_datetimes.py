@@ -0,0 +1,36 @@
+"""
+Unit tests for services/datetimes.py: BSON "<field>_dt" mirrors dual-written
+next to ISO-string timestamps.
+"""
+
+from datetime import datetime, timezone
+
+from services.datetimes import parse_timestamp, with_datetime_mirrors
+
+
+class TestDatetimeMirrors:
+    """BSON date mirrors of ISO-string timestamps"""
+
+    def test_parse_timestamp(self):
+        expected = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+        assert parse_timestamp("2026-03-01T12:30:00Z") == expected
+        assert parse_timestamp("2026-03-01T12:30:00+00:00") == expected
+        assert parse_timestamp("2026-03-01T04:30:00-08:00") == expected
+        assert parse_timestamp("2026-03-01T12:30:00") == expected
+        assert parse_timestamp("2026-03-01") == datetime(2026, 3, 1, tzinfo=timezone.utc)
+        assert parse_timestamp("") is None
+        assert parse_timestamp("not a date") is None
+
+    def test_with_datetime_mirrors(self):
+        doc = {"created_at": "2026-03-01T12:30:00Z", "last_contact": None, "first_name": "Ana"}
+        assert with_datetime_mirrors(doc) is doc
+        assert doc["created_at_dt"] == datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+        assert doc["last_contact_dt"] is None
+        assert "sold_at_dt" not in doc
+        assert "first_name_dt" not in doc
+
+    def test_with_datetime_mirrors_restricted_fields(self):
+        doc = {"created_at": "2026-03-01T12:30:00Z", "reminder_at": "2026-03-02T09:00:00Z"}
+        with_datetime_mirrors(doc, fields=("reminder_at",))
+        assert "created_at_dt" not in doc
+        assert doc["reminder_at_dt"] == datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
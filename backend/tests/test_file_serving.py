@@ -0,0 +1,101 @@
+"""
+Unit tests for services/file_serving.py: streamed downloads with ETag
+revalidation (304) and single byte ranges (206 / 416).
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.file_serving import _parse_range, serve_file
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "license.pdf"
+    path.write_bytes(CONTENT)
+    app = FastAPI()
+
+    @app.get("/download")
+    def download(request: Request):
+        return serve_file(request, path, "application/pdf", "license.pdf")
+
+    return TestClient(app)
+
+
+class TestParseRange:
+    """Range header parsing"""
+
+    def test_ranges(self):
+        assert _parse_range("bytes=0-99", 1000) == (0, 99)
+        assert _parse_range("bytes=900-", 1000) == (900, 999)
+        assert _parse_range("bytes=-100", 1000) == (900, 999)
+        assert _parse_range("bytes=990-2000", 1000) == (990, 999)
+
+    def test_ignored_ranges(self):
+        assert _parse_range("bytes=0-10,20-30", 1000) is None
+        assert _parse_range("items=0-10", 1000) is None
+        assert _parse_range("bytes=abc", 1000) is None
+        assert _parse_range("bytes=50-10", 1000) is None
+
+    def test_unsatisfiable(self):
+        assert _parse_range("bytes=1000-", 1000) == (-1, -1)
+        assert _parse_range("bytes=1500-2000", 1000) == (-1, -1)
+        assert _parse_range("bytes=-0", 1000) == (-1, -1)
+
+
+class TestServeFile:
+    """Full, conditional and partial downloads"""
+
+    def test_full_download(self, client):
+        response = client.get("/download")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"]
+        assert response.headers["last-modified"]
+        assert "license.pdf" in response.headers["content-disposition"]
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/download").headers["etag"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = client.get("/download", headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+
+    def test_stale_etag_gets_full_body(self, client):
+        response = client.get("/download", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_range_returns_206(self, client):
+        response = client.get("/download", headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+        assert response.headers["content-length"] == "100"
+
+    def test_suffix_range_spanning_chunks(self, client):
+        response = client.get("/download", headers={"Range": "bytes=-10000"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[-10000:]
+
+    def test_unsatisfiable_range_returns_416(self, client):
+        response = client.get("/download", headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    def test_if_range_mismatch_sends_whole_file(self, client):
+        response = client.get("/download", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_if_range_match_honours_range(self, client):
+        etag = client.get("/download").headers["etag"]
+        response = client.get("/download", headers={"Range": "bytes=0-9", "If-Range": etag})
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
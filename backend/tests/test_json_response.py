@@ -0,0 +1,74 @@
+"""
+Unit tests for services/json_response.py: ModelRows must output what a
+List[Model] response_model would, and dumps() must handle Mongo types.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from services.json_response import FastJSONResponse, ModelRows, dumps
+
+
+class Row(BaseModel):
+    id: str
+    name: str
+    phone: Optional[str] = None
+    is_active: bool = True
+    tags: List[str] = Field(default_factory=list)
+
+
+class TestModelRows:
+    """Shaping trusted documents like the response_model would"""
+
+    def test_projection_lists_model_fields(self):
+        rows = ModelRows(Row)
+        assert rows.names == ("id", "name", "phone", "is_active", "tags")
+        assert rows.projection == {"_id": 0, "id": 1, "name": 1, "phone": 1, "is_active": 1, "tags": 1}
+
+    def test_defaults_and_extra_fields(self):
+        rows = ModelRows(Row)
+        shaped = rows([{"id": "1", "name": "Ana", "password": "secret"}])
+        assert shaped == [{"id": "1", "name": "Ana", "phone": None, "is_active": True, "tags": []}]
+
+    def test_matches_response_model_output(self):
+        rows = ModelRows(Row)
+        doc = {"id": "1", "name": "Ana", "phone": "2135550100", "is_active": False, "tags": ["vip"], "extra": 1}
+        assert rows.shape(doc) == Row(**doc).model_dump()
+
+    def test_default_factory_not_shared_between_rows(self):
+        rows = ModelRows(Row)
+        first, second = rows([{"id": "1", "name": "Ana"}, {"id": "2", "name": "Luis"}])
+        first["tags"].append("changed")
+        assert second["tags"] == []
+
+    def test_missing_required_field_is_none(self):
+        rows = ModelRows(Row)
+        assert rows.shape({"id": "1"})["name"] is None
+
+    def test_stored_none_kept(self):
+        rows = ModelRows(Row)
+        assert rows.shape({"id": "1", "name": "Ana", "is_active": None})["is_active"] is None
+
+
+class TestDumps:
+    """Serialization of list responses"""
+
+    def test_datetimes_and_unknown_types(self):
+        when = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+        class Opaque:
+            def __str__(self):
+                return "opaque"
+
+        decoded = json.loads(dumps({"at": when, "value": Opaque(), "name": "José"}))
+        assert decoded["at"].startswith("2026-01-02T03:04:05")
+        assert decoded["value"] == "opaque"
+        assert decoded["name"] == "José"
+
+    def test_fast_json_response_body(self):
+        response = FastJSONResponse([{"id": "1"}])
+        assert json.loads(response.body) == [{"id": "1"}]
+        assert response.media_type == "application/json"
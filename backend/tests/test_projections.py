@@ -0,0 +1,56 @@
+"""
+Unit tests for services/projections.py: the `fields` parameter of list endpoints.
+"""
+
+import pytest
+
+from services.projections import ListView, MAX_FIELDS, CLIENT_SUMMARY
+
+
+class TestListView:
+    """Projection built from the `fields` parameter"""
+
+    def test_no_fields_is_full_document(self):
+        view = ListView(("first_name",))
+        assert view.field_names(None) is None
+        assert view.field_names("") is None
+        assert view.projection(None) == {"_id": 0}
+
+    def test_summary(self):
+        view = ListView(("first_name", "last_name"))
+        assert view.field_names("summary") == ("first_name", "last_name")
+        assert view.projection("summary") == {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}
+
+    def test_explicit_fields_deduplicated_and_trimmed(self):
+        view = ListView(CLIENT_SUMMARY)
+        assert view.field_names(" phone, email,phone ,") == ("phone", "email")
+
+    def test_required_and_id_always_projected(self):
+        view = ListView(("first_name",), required=("created_at", "id"))
+        assert view.required == ("id", "created_at")
+        assert view.projection("phone") == {"_id": 0, "id": 1, "created_at": 1, "phone": 1}
+
+    @pytest.mark.parametrize("fields", [
+        "phone.number",
+        "$where",
+        "password hash",
+        "1abc",
+    ])
+    def test_invalid_names_rejected(self, fields):
+        view = ListView(CLIENT_SUMMARY)
+        with pytest.raises(ValueError, match="Unknown fields"):
+            view.projection(fields)
+
+    def test_allowed_restricts_names(self):
+        view = ListView(("firstName",), allowed=("firstName", "phone"))
+        assert view.field_names("phone") == ("phone",)
+        with pytest.raises(ValueError, match="ssn"):
+            view.field_names("phone,ssn")
+
+    def test_empty_or_too_many_fields(self):
+        view = ListView(CLIENT_SUMMARY)
+        with pytest.raises(ValueError, match="comma-separated"):
+            view.field_names(",,")
+        too_many = ",".join(f"field{i}" for i in range(MAX_FIELDS + 1))
+        with pytest.raises(ValueError, match="comma-separated"):
+            view.field_names(too_many)
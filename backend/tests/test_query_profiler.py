@@ -0,0 +1,157 @@
+"""
+Unit tests for the query shapes in services/query_profiler.py.
+"""
+
+import re
+import threading
+from itertools import count
+from types import SimpleNamespace
+
+from bson.regex import Regex
+
+from services.query_profiler import QueryProfiler, fingerprint, value_shape
+
+_request_ids = count()
+
+
+def run_command(profiler, command_name, command, ms, reply=None, connection_id=1):
+    """Feed one command through the listener the way pymongo does"""
+    event = SimpleNamespace(
+        command_name=command_name, command=command, connection_id=connection_id,
+        request_id=next(_request_ids), duration_micros=int(ms * 1000), reply=reply or {"ok": 1},
+    )
+    profiler.started(event)
+    profiler.succeeded(event)
+
+
+class TestValueShape:
+    """Filters with values blanked out"""
+
+    def test_values_blanked_keys_sorted(self):
+        assert value_shape({"phone": "2134629914", "created_by": "u1"}) == "{created_by: ?, phone: ?}"
+
+    def test_regex_forms(self):
+        assert value_shape({"phone": {"$regex": "213", "$options": "i"}}) == "{phone: regex}"
+        assert value_shape({"name": re.compile("^jo")}) == "{name: regex}"
+        assert value_shape({"name": Regex("^jo")}) == "{name: regex}"
+
+    def test_lists_collapse_to_distinct_shapes(self):
+        assert value_shape({"id": {"$in": ["a", "b", "c"]}}) == "{id: {$in: [?]}}"
+        assert value_shape({"$or": [{"a": 1}, {"b": 2}, {"a": 3}]}) == "{$or: [{a: ?}, {b: ?}]}"
+
+    def test_same_shape_for_different_values(self):
+        first = value_shape({"client_id": "x", "is_deleted": {"$ne": True}})
+        second = value_shape({"is_deleted": {"$ne": False}, "client_id": "y"})
+        assert first == second
+
+
+class TestFingerprint:
+    """Query-shape keys per command"""
+
+    def test_find_with_sort(self):
+        command = {"find": "clients", "filter": {"created_by": "u1"}, "sort": {"created_at": -1}}
+        assert fingerprint("find", command) == "clients.find {created_by: ?} sort {created_at: -1}"
+
+    def test_aggregate(self):
+        command = {"aggregate": "user_records", "pipeline": [
+            {"$match": {"client_id": {"$in": ["a"]}}},
+            {"$lookup": {"from": "clients", "localField": "client_id", "foreignField": "id", "as": "client"}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 10},
+        ]}
+        assert fingerprint("aggregate", command) == (
+            "user_records.aggregate [$match {client_id: {$in: [?]}}, $lookup clients, $sort {created_at: -1}, $limit]"
+        )
+
+    def test_write_commands(self):
+        update = {"update": "clients", "updates": [{"q": {"id": "c1"}, "u": {"$set": {"phone": "1"}}}]}
+        assert fingerprint("update", update) == "clients.update {id: ?}"
+        assert fingerprint("delete", {"delete": "clients", "deletes": []}) == "clients.delete {}"
+        assert fingerprint("insert", {"insert": "clients", "documents": [{}]}) == "clients.insert"
+        assert fingerprint("findAndModify", {"findAndModify": "queue", "query": {"key": "k"}}) == "queue.findAndModify {key: ?}"
+
+    def test_count_and_distinct(self):
+        assert fingerprint("count", {"count": "clients", "query": {"is_sold": True}}) == "clients.count {is_sold: ?}"
+        assert fingerprint("distinct", {"distinct": "clients", "key": "created_by", "query": {}}) == "clients.distinct created_by {}"
+
+    def test_other_commands(self):
+        assert fingerprint("getMore", {"getMore": 123, "collection": "clients"}) == "getMore"
+        assert fingerprint("createIndexes", {"createIndexes": "clients"}) == "clients.createIndexes"
+
+
+class TestQueryProfiler:
+    """Aggregation per shape"""
+
+    def test_same_shape_aggregated(self):
+        profiler = QueryProfiler(slow_ms=100)
+        for phone, ms in (("1", 10), ("2", 30), ("3", 20)):
+            run_command(profiler, "find", {"find": "clients", "filter": {"phone": phone}}, ms)
+
+        [row] = profiler.top()
+        assert row["shape"] == "clients.find {phone: ?}"
+        assert row["count"] == 3
+        assert row["total_ms"] == 60.0
+        assert row["max_ms"] == 30.0
+        assert row["routes"] == {"<background>": 3}
+        assert profiler.recent_slow() == []
+
+    def test_get_more_charged_to_opening_command(self):
+        profiler = QueryProfiler()
+        find = {"find": "clients", "filter": {"created_by": "u1"}}
+        run_command(profiler, "find", find, 5, reply={"cursor": {"id": 42, "firstBatch": []}})
+        run_command(profiler, "getMore", {"getMore": 42, "collection": "clients"}, 7, reply={"cursor": {"id": 0}})
+
+        [row] = profiler.top()
+        assert row["shape"] == "clients.find {created_by: ?}"
+        assert row["count"] == 2
+
+    def test_slow_commands_logged_and_sorting(self):
+        profiler = QueryProfiler(slow_ms=100)
+        run_command(profiler, "find", {"find": "clients", "filter": {}}, 150)
+        for _ in range(3):
+            run_command(profiler, "count", {"count": "notifications", "query": {"user_id": "u"}}, 10)
+
+        assert [row["shape"] for row in profiler.top(sort="count")] == ["notifications.count {user_id: ?}", "clients.find {}"]
+        assert profiler.top(limit=1)[0]["shape"] == "clients.find {}"
+        assert profiler.recent_slow() == [{"shape": "clients.find {}", "route": "<background>", "ms": 150.0}]
+
+        profiler.reset()
+        assert profiler.top() == []
+        assert profiler.recent_slow() == []
+
+    def test_ignored_commands(self):
+        profiler = QueryProfiler()
+        run_command(profiler, "ping", {"ping": 1}, 1)
+        assert profiler.top() == []
+
+    def test_reports_while_other_threads_record(self):
+        # Motor runs the listener on its executor threads while a request reads the report
+        profiler = QueryProfiler(slow_ms=0)
+        errors = []
+        stop = threading.Event()
+
+        def record(connection_id):
+            for i in range(2000):
+                run_command(profiler, "find", {"find": f"c{i % 50}", "filter": {"a": i}}, 1, connection_id=connection_id)
+
+        def report():
+            while not stop.is_set():
+                try:
+                    profiler.top(sort="p99")
+                    profiler.recent_slow()
+                except Exception as e:  # "dictionary/deque mutated during iteration"
+                    errors.append(e)
+                    return
+
+        writers = [threading.Thread(target=record, args=(n,)) for n in range(4)]
+        reader = threading.Thread(target=report)
+        reader.start()
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        reader.join()
+
+        assert errors == []
+        assert sum(row["count"] for row in profiler.top(limit=100)) == 8000
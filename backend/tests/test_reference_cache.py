@@ -0,0 +1,166 @@
+"""
+Unit tests for services/reference_cache.py: invalidation racing an in-flight
+load, TTL expiry, and the ETag / 304 handling of cached_json_response.
+"""
+
+import asyncio
+
+from starlette.requests import Request
+
+from services.reference_cache import ReferenceCache, _etag_matches, cached_json_response
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class CountingLoader:
+    """Loader returning a new value per call; `during` runs while the load is in flight"""
+
+    def __init__(self, during=None):
+        self.calls = 0
+        self.during = during
+
+    async def __call__(self):
+        self.calls += 1
+        if self.during:
+            self.during()
+        await asyncio.sleep(0)
+        return [{"name": f"value {self.calls}"}]
+
+
+class TestReferenceCache:
+    """Caching and invalidation"""
+
+    def test_second_get_is_served_from_cache(self):
+        cache = ReferenceCache()
+        loader = CountingLoader()
+
+        async def scenario():
+            first = await cache.get("config_lists:bank", loader)
+            second = await cache.get("config_lists:bank", loader)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert loader.calls == 1
+        assert second is first
+        assert first.value == [{"name": "value 1"}]
+        assert first.etag.startswith('"') and first.etag.endswith('"')
+
+    def test_invalidate_during_load_does_not_store_stale_value(self):
+        cache = ReferenceCache()
+        loader = CountingLoader(during=lambda: cache.invalidate("config_lists:bank"))
+
+        async def scenario():
+            stale = await cache.get("config_lists:bank", loader)
+            loader.during = None
+            fresh = await cache.get("config_lists:bank", loader)
+            return stale, fresh
+
+        stale, fresh = asyncio.run(scenario())
+        # The caller still gets its result, but it was not cached
+        assert stale.value == [{"name": "value 1"}]
+        assert fresh.value == [{"name": "value 2"}]
+        assert loader.calls == 2
+
+    def test_invalidate_prefix_during_load_of_uncached_key(self):
+        cache = ReferenceCache()
+        # The key is not in the cache yet, so only the generation bump can catch this load
+        loader = CountingLoader(during=lambda: cache.invalidate_prefix("config_lists:"))
+
+        async def scenario():
+            await cache.get("config_lists:dealer", loader)
+            loader.during = None
+            return await cache.get("config_lists:dealer", loader)
+
+        fresh = asyncio.run(scenario())
+        assert fresh.value == [{"name": "value 2"}]
+        assert loader.calls == 2
+
+    def test_invalidate_prefix_leaves_other_keys(self):
+        cache = ReferenceCache()
+        lists_loader = CountingLoader()
+        templates_loader = CountingLoader()
+
+        async def scenario():
+            await cache.get("config_lists:bank", lists_loader)
+            await cache.get("sms_templates", templates_loader)
+            cache.invalidate_prefix("config_lists:")
+            await cache.get("config_lists:bank", lists_loader)
+            await cache.get("sms_templates", templates_loader)
+
+        asyncio.run(scenario())
+        assert lists_loader.calls == 2
+        assert templates_loader.calls == 1
+
+    def test_expired_entry_is_reloaded(self):
+        cache = ReferenceCache(ttl_seconds=0)
+        loader = CountingLoader()
+
+        async def scenario():
+            await cache.get("sms_templates", loader)
+            return await cache.get("sms_templates", loader)
+
+        entry = asyncio.run(scenario())
+        assert loader.calls == 2
+        assert entry.value == [{"name": "value 2"}]
+
+    def test_etag_follows_content(self):
+        cache = ReferenceCache()
+
+        async def load_same():
+            return [{"name": "same"}]
+
+        async def scenario():
+            first = await cache.get("a", load_same)
+            second = await cache.get("b", load_same)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first.etag == second.etag
+
+
+class TestEtagResponses:
+    """Conditional GET handling"""
+
+    def test_etag_matches(self):
+        etag = '"abc"'
+        assert _etag_matches('"abc"', etag)
+        assert _etag_matches('W/"abc"', etag)
+        assert _etag_matches('"other", "abc"', etag)
+        assert _etag_matches("*", etag)
+        assert not _etag_matches('"other"', etag)
+        assert not _etag_matches(None, etag)
+        assert not _etag_matches("", etag)
+
+    def test_response_200_then_304(self):
+        cache = ReferenceCache()
+
+        async def loader():
+            return [{"id": "1", "name": "Chase"}]
+
+        entry = asyncio.run(cache.get("config_lists:bank", loader))
+
+        response = cached_json_response(make_request(), entry)
+        assert response.status_code == 200
+        assert response.body == entry.body
+        assert response.headers["etag"] == entry.etag
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert response.headers["content-type"] == "application/json"
+
+        not_modified = cached_json_response(make_request(entry.etag), entry)
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert not_modified.headers["etag"] == entry.etag
+
+    def test_stale_etag_gets_full_body(self):
+        cache = ReferenceCache()
+
+        async def loader():
+            return [{"id": "1", "name": "Chase"}]
+
+        entry = asyncio.run(cache.get("config_lists:bank", loader))
+        response = cached_json_response(make_request('"outdated"'), entry)
+        assert response.status_code == 200
+        assert response.body == entry.body
@@ -0,0 +1,120 @@
+"""
+Unit tests for services/retention.py: archiving old rows to gzipped
+extended-JSON NDJSON before deleting them.
+"""
+
+import asyncio
+import gzip
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from bson import json_util
+
+from services import retention
+from services.retention import Archiver, RetentionPolicy
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def read_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json_util.loads(line) for line in f if line.strip()]
+
+
+def seed_notifications(db, old=3, recent=2):
+    docs = [{"id": f"old{i}", "is_read": True, "created_at": days_ago(100 + i)} for i in range(old)]
+    docs += [{"id": f"new{i}", "is_read": True, "created_at": days_ago(1)} for i in range(recent)]
+    # Unread rows are never archived, however old (badge counters stay exact)
+    docs.append({"id": "unread", "is_read": False, "created_at": days_ago(200)})
+    asyncio.run(db.notifications.insert_many(docs))
+
+
+class TestArchiver:
+    """Archive, then delete"""
+
+    def test_old_rows_archived_then_deleted(self, db, tmp_path):
+        seed_notifications(db)
+        policy = RetentionPolicy("notifications", "created_at", 90, {"is_read": True})
+        archiver = Archiver(db, tmp_path, [policy])
+
+        result = asyncio.run(archiver.run())["notifications"]
+        assert result["archived"] == 3
+
+        [path] = result["files"]
+        archived = read_archive(path)
+        assert sorted(doc["id"] for doc in archived) == ["old0", "old1", "old2"]
+        # Extended JSON keeps the ObjectId, so the file can be restored with mongoimport
+        assert all("_id" in doc for doc in archived)
+
+        remaining = asyncio.run(db.notifications.find({}, {"_id": 0, "id": 1}).to_list(None))
+        assert sorted(doc["id"] for doc in remaining) == ["new0", "new1", "unread"]
+        assert list(tmp_path.glob("notifications/*.tmp")) == []
+
+    def test_nothing_to_archive_writes_no_file(self, db, tmp_path):
+        seed_notifications(db, old=0)
+        archiver = Archiver(db, tmp_path, [RetentionPolicy("notifications", "created_at", 90, {"is_read": True})])
+
+        result = asyncio.run(archiver.run())["notifications"]
+        assert result == {"archived": 0}
+        assert list((tmp_path / "notifications").iterdir()) == []
+
+    def test_zero_days_keeps_forever(self, db, tmp_path):
+        seed_notifications(db)
+        archiver = Archiver(db, tmp_path, [RetentionPolicy("notifications", "created_at", 0)])
+
+        assert asyncio.run(archiver.run()) == {}
+        assert asyncio.run(db.notifications.count_documents({})) == 6
+
+    def test_failure_reported_per_policy(self, db, tmp_path):
+        seed_notifications(db)
+        blocked = tmp_path / "sms_logs"
+        blocked.write_text("not a directory")
+        archiver = Archiver(db, tmp_path, [
+            RetentionPolicy("sms_logs", "sent_at", 365),
+            RetentionPolicy("notifications", "created_at", 90, {"is_read": True}),
+        ])
+
+        results = asyncio.run(archiver.run())
+        assert "error" in results["sms_logs"]
+        assert results["notifications"]["archived"] == 3
+
+    def test_archived_and_deleted_batch_by_batch(self, db, tmp_path, monkeypatch):
+        monkeypatch.setattr(retention, "ARCHIVE_BATCH_SIZE", 2)
+        seed_notifications(db, old=5)
+        archiver = Archiver(db, tmp_path, [RetentionPolicy("notifications", "created_at", 90, {"is_read": True})])
+
+        result = asyncio.run(archiver.run())["notifications"]
+        assert result["archived"] == 5
+        assert [len(read_archive(path)) for path in result["files"]] == [2, 2, 1]
+        assert asyncio.run(db.notifications.count_documents({"id": {"$regex": "^old"}})) == 0
+
+    def test_failed_batch_left_in_place(self, db, tmp_path, monkeypatch):
+        monkeypatch.setattr(retention, "ARCHIVE_BATCH_SIZE", 2)
+        write_archive = retention._write_archive
+        written = []
+
+        def fail_second_file(target, docs):
+            if written:
+                raise OSError("disk full")
+            write_archive(target, docs)
+            written.append(target)
+
+        monkeypatch.setattr(retention, "_write_archive", fail_second_file)
+        seed_notifications(db, old=4)
+        archiver = Archiver(db, tmp_path, [RetentionPolicy("notifications", "created_at", 90, {"is_read": True})])
+
+        assert asyncio.run(archiver.run())["notifications"] == {"error": "disk full"}
+        # The first batch was archived and deleted, the second is still in the collection
+        [path] = written
+        assert len(read_archive(path)) == 2
+        assert asyncio.run(db.notifications.count_documents({"id": {"$regex": "^old"}})) == 2
+        assert list(tmp_path.glob("notifications/*.tmp")) == []
@@ -0,0 +1,118 @@
+"""
+Unit tests for the keyset-paginated SMS inbox (GET /api/inbox/{client_id}):
+latest page by default, older pages with before=, newer messages with after=.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.routing import Match
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+from services.unread_counters import UnreadCounters  # noqa: E402
+
+ADMIN = {"id": "admin-1", "role": "admin", "name": "Admin"}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "unread_counters", UnreadCounters(db))
+    return db
+
+
+def seed(db, count=5, same_timestamp=()):
+    """Messages m0..m<count-1>, one second apart; indexes in `same_timestamp` share m0's timestamp"""
+    async def insert():
+        await db.clients.insert_one({"id": "c1", "first_name": "Ana", "last_name": "Ruiz", "phone": "2135550100"})
+        await db.sms_conversations.insert_many([
+            {
+                "id": f"m{i}",
+                "client_id": "c1",
+                "direction": "inbound" if i % 2 else "outbound",
+                "message": f"message {i}",
+                "timestamp": f"2026-03-01T10:00:{0 if i in same_timestamp else i:02d}+00:00",
+            }
+            for i in range(count)
+        ] + [{"id": "other", "client_id": "c2", "direction": "inbound", "message": "x", "timestamp": "2026-03-01T10:00:02+00:00"}])
+    asyncio.run(insert())
+
+
+def inbox(**kwargs):
+    return asyncio.run(server.get_client_inbox("c1", current_user=ADMIN, **{"before": None, "after": None, "limit": 50, **kwargs}))
+
+
+def ids(page):
+    return [message["id"] for message in page["messages"]]
+
+
+class TestInboxPagination:
+    """Keyset pages over (timestamp, id)"""
+
+    def test_latest_page_oldest_first(self, db):
+        seed(db)
+        page = inbox(limit=2)
+        assert ids(page) == ["m3", "m4"]
+        assert page["has_more"] is True
+        assert page["client"]["id"] == "c1"
+
+    def test_before_walks_back_to_the_start(self, db):
+        seed(db)
+        page = inbox(limit=2)
+        seen = ids(page)
+        while page["has_more"]:
+            page = inbox(limit=2, before=page["before_cursor"])
+            seen = ids(page) + seen
+        assert seen == ["m0", "m1", "m2", "m3", "m4"]
+
+    def test_after_returns_only_newer_messages(self, db):
+        seed(db)
+        page = inbox(limit=50)
+        assert inbox(after=page["after_cursor"])["messages"] == []
+
+        asyncio.run(db.sms_conversations.insert_one({
+            "id": "m5", "client_id": "c1", "direction": "inbound", "message": "new",
+            "timestamp": "2026-03-01T10:00:05+00:00",
+        }))
+        newer = inbox(after=page["after_cursor"])
+        assert ids(newer) == ["m5"]
+        assert newer["has_more"] is False
+
+    def test_equal_timestamps_split_across_pages(self, db):
+        seed(db, count=4, same_timestamp=(1, 2, 3))
+        first = inbox(limit=2)
+        second = inbox(limit=2, before=first["before_cursor"])
+        assert ids(first) == ["m2", "m3"]
+        assert ids(second) == ["m0", "m1"]
+        assert second["has_more"] is False
+
+    def test_empty_page_keeps_cursor(self, db):
+        seed(db)
+        latest = inbox()
+        newer = inbox(after=latest["after_cursor"])
+        assert newer["after_cursor"] == latest["after_cursor"]
+
+    def test_invalid_requests(self, db):
+        seed(db)
+        with pytest.raises(HTTPException) as both:
+            inbox(before="x", after="y")
+        assert both.value.status_code == 400
+        with pytest.raises(HTTPException) as bad_cursor:
+            inbox(before="x")
+        assert bad_cursor.value.status_code == 400
+        with pytest.raises(HTTPException) as missing:
+            asyncio.run(server.get_client_inbox("nope", before=None, after=None, limit=50, current_user=ADMIN))
+        assert missing.value.status_code == 404
+
+
+class TestRoutes:
+    """Static inbox paths are not shadowed by /inbox/{client_id}"""
+
+    def test_unread_count_route(self):
+        scope = {"type": "http", "method": "GET", "path": "/api/inbox/unread-count"}
+        route = next(route for route in server.app.router.routes if route.matches(scope)[0] == Match.FULL)
+        assert route.endpoint is server.get_unread_count
@@ -0,0 +1,220 @@
+"""
+Unit tests for services/webhook_queue.py: the durable acknowledge-then-process
+queue behind the Twilio SMS webhook (deduplication, leases, retries).
+"""
+
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from services.webhook_queue import WebhookQueue
+
+mongomock = pytest.importorskip("mongomock")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # mongomock's find_one_and_update re-reads the updated document with the
+    # caller's filter when _id is projected out, and the claim's own update no
+    # longer matches it; read it by _id and drop the field afterwards instead
+    find_and_modify = mongomock.collection.Collection._find_and_modify
+
+    def by_id(self, query, projection=None, *args, **kwargs):
+        doc = find_and_modify(self, query, None, *args, **kwargs)
+        if doc is not None and projection == {"_id": 0}:
+            doc.pop("_id", None)
+        return doc
+
+    monkeypatch.setattr(mongomock.collection.Collection, "_find_and_modify", by_id)
+    return mongomock_motor.AsyncMongoMockClient()["dealercrm_test"]
+
+
+class Handler:
+    """Records each payload it is called with; raises while `failures` is positive"""
+
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+
+    async def __call__(self, item):
+        self.calls.append(item["payload"])
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Twilio lookup failed")
+
+
+def make_queue(db, handler, **kwargs):
+    return WebhookQueue(db, "inbound_sms_queue", handler, **kwargs)
+
+
+async def item(queue, key):
+    return await queue.collection.find_one({"key": key}, {"_id": 0})
+
+
+async def make_due(queue, key):
+    """Move an item's available_at into the past (lease expired / backoff elapsed)"""
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    await queue.collection.update_one({"key": key}, {"$set": {"available_at": past}})
+
+
+class TestEnqueue:
+    """Deduplication on the provider's message id"""
+
+    def test_duplicate_message_sid_processed_once(self, db):
+        handler = Handler()
+        queue = make_queue(db, handler)
+
+        async def scenario():
+            first = await queue.enqueue("SM123", {"Body": "hola"})
+            retry = await queue.enqueue("SM123", {"Body": "hola"})
+            handled = await queue.drain()
+            # A late provider retry after processing is still recognized
+            late = await queue.enqueue("SM123", {"Body": "hola"})
+            await queue.drain()
+            return first, retry, handled, late, await item(queue, "SM123")
+
+        first, retry, handled, late, stored = asyncio.run(scenario())
+        assert (first, retry, late) == (True, False, False)
+        assert handled == 1
+        assert handler.calls == [{"Body": "hola"}]
+        assert stored["status"] == "done"
+        assert stored["attempts"] == 1
+        assert isinstance(stored["expire_at"], datetime)
+
+
+class TestLeases:
+    """Claims are leases that expire when a worker dies"""
+
+    def test_claimed_item_not_reclaimed_until_lease_expires(self, db):
+        queue = make_queue(db, Handler())
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            claimed = await queue._claim()
+            # Worker died: nothing else is due while the lease is held
+            while_leased = await queue._claim()
+            await make_due(queue, "SM1")
+            reclaimed = await queue._claim()
+            return claimed, while_leased, reclaimed
+
+        claimed, while_leased, reclaimed = asyncio.run(scenario())
+        assert claimed["status"] == "processing"
+        assert claimed["attempts"] == 1
+        assert while_leased is None
+        assert reclaimed["key"] == "SM1"
+        assert reclaimed["attempts"] == 2
+
+    def test_expired_lease_is_processed_by_drain(self, db):
+        handler = Handler()
+        queue = make_queue(db, handler)
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            await queue._claim()
+            await make_due(queue, "SM1")
+            handled = await queue.drain()
+            return handled, await item(queue, "SM1")
+
+        handled, stored = asyncio.run(scenario())
+        assert handled == 1
+        assert handler.calls == [{"Body": "a"}]
+        assert stored["status"] == "done"
+
+
+class TestRetries:
+    """Backoff and permanent failure"""
+
+    def test_failed_item_waits_for_backoff(self, db):
+        handler = Handler(failures=1)
+        queue = make_queue(db, handler)
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            await queue.drain()
+            after_failure = await item(queue, "SM1")
+            # Not due yet: the second drain does nothing
+            handled_early = await queue.drain()
+            await make_due(queue, "SM1")
+            handled = await queue.drain()
+            return after_failure, handled_early, handled, await item(queue, "SM1")
+
+        after_failure, handled_early, handled, stored = asyncio.run(scenario())
+        assert after_failure["status"] == "pending"
+        assert after_failure["error"] == "Twilio lookup failed"
+        assert after_failure["available_at"] > datetime.now(timezone.utc).isoformat()
+        assert handled_early == 0
+        assert handled == 1
+        assert stored["status"] == "done"
+        assert stored["attempts"] == 2
+        assert len(handler.calls) == 2
+
+    def test_parked_as_failed_after_max_attempts(self, db):
+        handler = Handler(failures=10)
+        queue = make_queue(db, handler, max_attempts=3)
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            for _ in range(5):
+                await make_due(queue, "SM1")
+                await queue.drain()
+            return await item(queue, "SM1")
+
+        stored = asyncio.run(scenario())
+        assert stored["status"] == "failed"
+        assert stored["attempts"] == 3
+        assert len(handler.calls) == 3
+        assert isinstance(stored["expire_at"], datetime)
+
+
+class TestRunStep:
+    """Handlers with several side effects resume after a partial failure"""
+
+    def test_retry_skips_finished_steps(self, db):
+        effects = []
+        failures = {"emails": 1}
+
+        async def handler(item):
+            for step in ("unread_counter", "notifications", "emails"):
+                async def action(step=step):
+                    if failures.get(step):
+                        failures[step] -= 1
+                        raise RuntimeError(f"{step} failed")
+                    effects.append(step)
+                await queue.run_step(item, step, action)
+
+        queue = make_queue(db, handler)
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            await queue.drain()
+            after_failure = await item(queue, "SM1")
+            await make_due(queue, "SM1")
+            await queue.drain()
+            return after_failure, await item(queue, "SM1")
+
+        after_failure, stored = asyncio.run(scenario())
+        assert after_failure["status"] == "pending"
+        assert after_failure["steps_done"] == ["unread_counter", "notifications"]
+        # The counter and notifications were not written a second time
+        assert effects == ["unread_counter", "notifications", "emails"]
+        assert stored["status"] == "done"
+        assert stored["steps_done"] == ["unread_counter", "notifications", "emails"]
+
+    def test_step_recorded_only_after_it_succeeds(self, db):
+        queue = make_queue(db, Handler())
+
+        async def failing():
+            raise RuntimeError("smtp down")
+
+        async def scenario():
+            await queue.enqueue("SM1", {"Body": "a"})
+            claimed = await queue._claim()
+            with pytest.raises(RuntimeError):
+                await queue.run_step(claimed, "emails", failing)
+            return claimed, await item(queue, "SM1")
+
+        claimed, stored = asyncio.run(scenario())
+        assert claimed["steps_done"] == []
+        assert "emails" not in stored.get("steps_done", [])
@@ -0,0 +1,31 @@
+"""
+Backfill the "<field>_dt" BSON date mirrors for documents written before dual-write.
+
+Usage (from backend/):
+    python tools/backfill_datetimes.py
+
+Safe to re-run. Once it completes, restart the API so range queries and the
+dashboard trends switch from ISO-string comparisons to the indexed date fields.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import db, client  # noqa: E402
+from services.datetimes import backfill_datetime_mirrors  # noqa: E402
+
+
+async def main():
+    totals = await backfill_datetime_mirrors(db)
+    for collection, updated in totals.items():
+        print(f"{collection}: {updated} fields written")
+    print("Backfill complete - restart the API to use the date mirrors")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        client.close()
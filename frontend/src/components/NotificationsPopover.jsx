@@ -8,6 +8,7 @@ import { Bell, MessageSquare, Users, Check, CheckCheck, FileText } from 'lucide-
 import { format, parseISO } from 'date-fns';
 import { es } from 'date-fns/locale';
 import { useNavigate } from 'react-router-dom';
+import { useEventStream } from '../hooks/use-event-stream';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -18,12 +19,28 @@ export default function NotificationsPopover() {
   const [loading, setLoading] = useState(false);
   const navigate = useNavigate();
 
+  // New notifications are pushed over the event stream
+  const streamConnected = useEventStream((type, data) => {
+    if (type === 'snapshot') {
+      setUnreadCount(data.notifications_unread || 0);
+    } else if (type === 'notification') {
+      setNotifications(prev => [data, ...prev.filter(n => n.id !== data.id)]);
+      if (!data.is_read) setUnreadCount(prev => prev + 1);
+    } else if (type === 'resync') {
+      fetchNotifications();
+    }
+  });
+
   useEffect(() => {
     fetchNotifications();
-    // Poll for new notifications every 15 seconds (more responsive)
+  }, []);
+
+  useEffect(() => {
+    // Fallback while the stream is down: poll the unread count every 15 seconds
+    if (streamConnected) return undefined;
     const interval = setInterval(fetchUnreadCount, 15000);
     return () => clearInterval(interval);
-  }, []);
+  }, [streamConnected]);
 
   useEffect(() => {
     if (open) {
@@ -10,6 +10,7 @@ import { toast } from 'sonner';
 import { Send, User, Bot, Loader2, Phone, RefreshCw } from 'lucide-react';
 import { format, parseISO } from 'date-fns';
 import { es } from 'date-fns/locale';
+import { useEventStream } from '../hooks/use-event-stream';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -20,22 +21,49 @@ export default function SmsInboxDialog({ open, onOpenChange, client, onMessageSe
   const [sending, setSending] = useState(false);
   const [newMessage, setNewMessage] = useState('');
   const [unreadCount, setUnreadCount] = useState(0);
+  const [hasOlder, setHasOlder] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
+  const beforeCursorRef = useRef(null);
+  const afterCursorRef = useRef(null);
+  const keepScrollRef = useRef(false);
   const scrollRef = useRef(null);
   const inputRef = useRef(null);
   const dateLocale = i18n.language === 'es' ? es : undefined;
 
+  // Inbound SMS for this client are announced on the event stream; fetch what is newer than what we have.
+  // Assigned users also get an sms_received notification, supervisors an sms_received event.
+  const streamConnected = useEventStream((type, data) => {
+    if (!open || !client?.id) return;
+    const forThisClient = data.client_id === client.id;
+    if ((type === 'sms_received' && forThisClient)
+      || (type === 'notification' && data.type === 'sms_received' && forThisClient)) {
+      fetchNewMessages();
+    } else if (type === 'snapshot' || type === 'resync') {
+      // (Re)connected or events were dropped: catch up on anything missed
+      fetchNewMessages();
+    }
+  });
+
   useEffect(() => {
     if (open && client?.id) {
       fetchMessages();
       markAsRead();
-      // Set up polling for new messages
-      const interval = setInterval(fetchMessages, 10000); // Poll every 10 seconds
-      return () => clearInterval(interval);
     }
   }, [open, client?.id]);
 
   useEffect(() => {
-    // Scroll to bottom when messages change
+    // Fallback while the stream is down: poll for messages newer than the last one we have
+    if (!open || !client?.id || streamConnected) return undefined;
+    const interval = setInterval(fetchNewMessages, 10000); // Poll every 10 seconds
+    return () => clearInterval(interval);
+  }, [open, client?.id, streamConnected]);
+
+  useEffect(() => {
+    // Scroll to bottom when messages change (but not when older ones were prepended)
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     if (scrollRef.current) {
       scrollRef.current.scrollTop = scrollRef.current.scrollHeight;
     }
@@ -48,6 +76,9 @@ export default function SmsInboxDialog({ open, onOpenChange, client, onMessageSe
       const response = await axios.get(`${API}/inbox/${client.id}`);
       setMessages(response.data.messages || []);
       setUnreadCount(response.data.unread_count || 0);
+      setHasOlder(!!response.data.has_more);
+      beforeCursorRef.current = response.data.before_cursor;
+      afterCursorRef.current = response.data.after_cursor;
     } catch (error) {
       console.error('Failed to fetch messages:', error);
     } finally {
@@ -55,6 +86,53 @@ export default function SmsInboxDialog({ open, onOpenChange, client, onMessageSe
     }
   };
 
+  const appendUnique = (prev, incoming) => {
+    const known = new Set(prev.map((m) => m.id));
+    return [...prev, ...incoming.filter((m) => !known.has(m.id))];
+  };
+
+  const fetchNewMessages = async () => {
+    if (!client?.id) return;
+    if (!afterCursorRef.current) {
+      fetchMessages();
+      return;
+    }
+
+    try {
+      const response = await axios.get(`${API}/inbox/${client.id}`, {
+        params: { after: afterCursorRef.current }
+      });
+      const incoming = response.data.messages || [];
+      if (incoming.length > 0) {
+        setMessages((prev) => appendUnique(prev, incoming));
+      }
+      afterCursorRef.current = response.data.after_cursor;
+      setUnreadCount(response.data.unread_count || 0);
+    } catch (error) {
+      console.error('Failed to fetch new messages:', error);
+    }
+  };
+
+  const fetchOlderMessages = async () => {
+    if (!client?.id || !beforeCursorRef.current || loadingOlder) return;
+
+    setLoadingOlder(true);
+    try {
+      const response = await axios.get(`${API}/inbox/${client.id}`, {
+        params: { before: beforeCursorRef.current }
+      });
+      const older = response.data.messages || [];
+      keepScrollRef.current = true;
+      setMessages((prev) => appendUnique(older, prev));
+      setHasOlder(!!response.data.has_more);
+      beforeCursorRef.current = response.data.before_cursor;
+    } catch (error) {
+      console.error('Failed to fetch older messages:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const markAsRead = async () => {
     if (!client?.id) return;
     try {
@@ -144,6 +222,13 @@ export default function SmsInboxDialog({ open, onOpenChange, client, onMessageSe
             </div>
           ) : (
             <div className="space-y-3">
+              {hasOlder && (
+                <div className="flex justify-center">
+                  <Button variant="ghost" size="sm" onClick={fetchOlderMessages} disabled={loadingOlder}>
+                    {loadingOlder ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Cargar mensajes anteriores'}
+                  </Button>
+                </div>
+              )}
               {messages.map((msg, index) => (
                 <div
                   key={msg.id || index}
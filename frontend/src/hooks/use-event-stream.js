@@ -0,0 +1,98 @@
+import { useEffect, useRef, useState } from 'react';
+import { useAuth } from '../context/AuthContext';
+
+const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const EVENT_TYPES = ['snapshot', 'notification', 'sms_received', 'resync'];
+// The server closed the stream for good (e.g. 401 while the token was being refreshed)
+const RECONNECT_DELAY_MS = 15000;
+
+// One EventSource per tab, shared by every component listening to /events/stream
+let source = null;
+let sourceToken = null;
+let reconnectTimer = null;
+let connected = false;
+const listeners = new Set();
+const statusListeners = new Set();
+
+function setConnected(value) {
+  if (connected === value) return;
+  connected = value;
+  statusListeners.forEach((listener) => listener(value));
+}
+
+function openSource(token) {
+  sourceToken = token;
+  source = new EventSource(`${API}/events/stream?token=${encodeURIComponent(token)}`);
+  source.onopen = () => setConnected(true);
+  source.onerror = () => {
+    setConnected(false);
+    // EventSource retries network errors by itself, but gives up on HTTP errors
+    if (source && source.readyState === EventSource.CLOSED && !reconnectTimer) {
+      reconnectTimer = setTimeout(() => {
+        reconnectTimer = null;
+        if (listeners.size > 0 && sourceToken) {
+          closeSource();
+          openSource(token);
+        }
+      }, RECONNECT_DELAY_MS);
+    }
+  };
+  EVENT_TYPES.forEach((type) => {
+    source.addEventListener(type, (event) => {
+      let data;
+      try {
+        data = JSON.parse(event.data);
+      } catch {
+        return;
+      }
+      listeners.forEach((listener) => listener(type, data));
+    });
+  });
+}
+
+function closeSource() {
+  if (source) {
+    source.close();
+    source = null;
+  }
+  setConnected(false);
+}
+
+/**
+ * Subscribe to the server's real-time event stream (notifications, inbound SMS).
+ *
+ * `onEvent(type, data)` is called for every event. Returns whether the stream
+ * is currently connected, so callers can fall back to polling while it is not.
+ */
+export function useEventStream(onEvent) {
+  const { token } = useAuth();
+  const handlerRef = useRef(onEvent);
+  const [isConnected, setIsConnected] = useState(connected);
+  handlerRef.current = onEvent;
+
+  useEffect(() => {
+    if (!token || typeof EventSource === 'undefined') return undefined;
+
+    const listener = (type, data) => handlerRef.current(type, data);
+    listeners.add(listener);
+    statusListeners.add(setIsConnected);
+    if (!source || sourceToken !== token) {
+      closeSource();
+      openSource(token);
+    }
+    setIsConnected(connected);
+
+    return () => {
+      listeners.delete(listener);
+      statusListeners.delete(setIsConnected);
+      if (listeners.size === 0) {
+        clearTimeout(reconnectTimer);
+        reconnectTimer = null;
+        sourceToken = null;
+        closeSource();
+      }
+    };
+  }, [token]);
+
+  return isConnected;
+}
@@ -53,7 +53,7 @@ export default function AdminPage() {
       const [usersRes, trashClientsRes, trashRecordsRes, banksRes, dealersRes, carsRes, idTypesRes, poiTypesRes, porTypesRes, templatesRes] = await Promise.all([
         axios.get(`${API}/users`).catch(e => ({ data: [] })),
         axios.get(`${API}/trash/clients`).catch(e => ({ data: [] })),
-        axios.get(`${API}/trash/user-records`).catch(e => ({ data: [] })),
+        axios.get(`${API}/trash/user-records?fields=summary`).catch(e => ({ data: [] })),
         axios.get(`${API}/config-lists/bank`).catch(e => ({ data: [] })),
         axios.get(`${API}/config-lists/dealer`).catch(e => ({ data: [] })),
         axios.get(`${API}/config-lists/car`).catch(e => ({ data: [] })),
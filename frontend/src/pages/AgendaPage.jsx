@@ -10,7 +10,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { Badge } from '../components/ui/badge';
 import { toast } from 'sonner';
 import { Calendar as CalendarIcon, Clock, MapPin, User, Send, CheckCircle2, XCircle, Phone, AlertTriangle, Bell, MessageSquare } from 'lucide-react';
-import { format, isToday, isTomorrow, addDays, parseISO, isWithinInterval, startOfDay, endOfDay, isSameDay } from 'date-fns';
+import { format, isToday, isTomorrow, addDays, parseISO, isWithinInterval, startOfDay, endOfDay, isSameDay, startOfMonth, endOfMonth, startOfWeek, endOfWeek, min, max } from 'date-fns';
 import { es } from 'date-fns/locale';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
@@ -24,14 +24,24 @@ export default function AgendaPage() {
   const [selectedDate, setSelectedDate] = useState(new Date());
   const [filter, setFilter] = useState('all');
   const [viewMode, setViewMode] = useState('grouped'); // 'grouped' or 'selected'
+  const [visibleMonth, setVisibleMonth] = useState(startOfMonth(new Date()));
 
   useEffect(() => {
     fetchAppointments();
-  }, []);
+  }, [visibleMonth]);
+
+  // Visible calendar grid, widened to always include today and the coming week (grouped view)
+  const agendaWindow = () => {
+    const today = new Date();
+    return {
+      from: format(min([startOfWeek(startOfMonth(visibleMonth)), today]), 'yyyy-MM-dd'),
+      to: format(max([endOfWeek(endOfMonth(visibleMonth)), addDays(today, 7)]), 'yyyy-MM-dd'),
+    };
+  };
 
   const fetchAppointments = async () => {
     try {
-      const response = await axios.get(`${API}/appointments/agenda`);
+      const response = await axios.get(`${API}/appointments/agenda`, { params: agendaWindow() });
       setAppointments(response.data);
     } catch (error) {
       toast.error('Failed to fetch appointments');
@@ -233,6 +243,8 @@ export default function AgendaPage() {
             <Calendar
               mode="single"
               selected={selectedDate}
+              month={visibleMonth}
+              onMonthChange={(month) => setVisibleMonth(startOfMonth(month))}
               onSelect={(date) => {
                 setSelectedDate(date || new Date());
                 setViewMode('selected');
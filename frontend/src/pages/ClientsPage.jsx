@@ -30,6 +30,10 @@ export default function ClientsPage() {
   const [clients, setClients] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  // The search the client list is filtered by; lags searchTerm while the user is typing
+  const [appliedSearch, setAppliedSearch] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
   const [selectedClient, setSelectedClient] = useState(null);
   const [showAddClient, setShowAddClient] = useState(false);
   const [expandedClients, setExpandedClients] = useState({});
@@ -177,7 +181,8 @@ export default function ClientsPage() {
 
   const fetchClients = async (search = '', fromNotification = false) => {
     try {
-      const params = new URLSearchParams();
+      // List columns only; the info modal loads the full client
+      const params = new URLSearchParams({ fields: 'summary' });
       if (search) params.append('search', search);
       
       // NEVER exclude sold - show all clients with sold indicator (star/cart icon)
@@ -236,7 +241,7 @@ export default function ClientsPage() {
   // Only re-fetch on filter/sort change if NOT from notification
   useEffect(() => {
     if (!isFromNotification) {
-      fetchClients(searchTerm);
+      fetchClients(appliedSearch);
     }
   }, [ownerFilter, sortBy]);
 
@@ -309,6 +314,16 @@ export default function ClientsPage() {
     }
   };
 
+  // The list is fetched with fields=summary; the info modal needs the whole client
+  const openClientInfo = async (client) => {
+    try {
+      const response = await axios.get(`${API}/clients/${client.id}`);
+      setSelectedClient({ ...client, ...response.data });
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to load client');
+    }
+  };
+
   const sendDocumentsEmail = async (client) => {
     if (!client.email) {
       toast.error('El cliente no tiene email registrado');
@@ -340,18 +355,46 @@ export default function ClientsPage() {
     }
   };
 
-  // Search with debounce
+  // While typing only the suggestions are fetched; the full list search runs once the user
+  // pauses, presses Enter or picks a suggestion, and right away when the box is cleared
   useEffect(() => {
-    const timer = setTimeout(() => {
-      if (searchTerm) {
-        fetchClients(searchTerm);
-      } else {
-        fetchClients();
-      }
-    }, 300);
+    if (!searchTerm) {
+      setAppliedSearch('');
+      return;
+    }
+    const timer = setTimeout(() => setAppliedSearch(searchTerm), 1000);
     return () => clearTimeout(timer);
   }, [searchTerm]);
 
+  useEffect(() => {
+    if (appliedSearch) {
+      fetchClients(appliedSearch);
+    } else {
+      fetchClients();
+    }
+  }, [appliedSearch]);
+
+  // Typeahead suggestions (in-memory index on the server, cheap per keystroke)
+  useEffect(() => {
+    if (searchTerm.trim().length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/clients/suggest`, { params: { q: searchTerm, limit: 8 } });
+        if (!cancelled) setSuggestions(response.data);
+      } catch (error) {
+        if (!cancelled) setSuggestions([]);
+      }
+    }, 80);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   // Filter clients by status color
   const filteredClients = statusFilter === 'all' 
     ? clients 
@@ -611,9 +654,41 @@ export default function ClientsPage() {
             placeholder={t('clients.search')}
             className="pl-10 max-w-md"
             value={searchTerm}
-            onChange={(e) => setSearchTerm(e.target.value)}
+            onChange={(e) => {
+              setSearchTerm(e.target.value);
+              setShowSuggestions(true);
+            }}
+            onKeyDown={(e) => {
+              if (e.key === 'Enter') {
+                setAppliedSearch(searchTerm);
+                setShowSuggestions(false);
+              }
+            }}
+            onFocus={() => setShowSuggestions(true)}
+            onBlur={() => setTimeout(() => setShowSuggestions(false), 150)}
             data-testid="search-clients"
           />
+          {showSuggestions && suggestions.length > 0 && (
+            <div className="absolute z-20 mt-1 w-full max-w-md bg-white border rounded-md shadow-lg" data-testid="client-suggestions">
+              {suggestions.map((s) => (
+                <button
+                  key={s.id}
+                  type="button"
+                  className="w-full flex items-center justify-between px-3 py-2 text-left text-sm hover:bg-slate-50"
+                  onMouseDown={(e) => e.preventDefault()}
+                  onClick={() => {
+                    const term = s.phone || `${s.first_name} ${s.last_name}`;
+                    setSearchTerm(term);
+                    setAppliedSearch(term);
+                    setShowSuggestions(false);
+                  }}
+                >
+                  <span className="font-medium text-slate-900">{s.first_name} {s.last_name}</span>
+                  <span className="text-slate-500">{s.phone}</span>
+                </button>
+              ))}
+            </div>
+          )}
         </div>
         {/* Status color filters */}
         <div className="flex items-center gap-2">
@@ -821,7 +896,7 @@ export default function ClientsPage() {
                         size="icon"
                         onClick={(e) => {
                           e.stopPropagation();
-                          setSelectedClient(client);
+                          openClientInfo(client);
                         }}
                         data-testid={`client-info-btn-${client.id}`}
                       >
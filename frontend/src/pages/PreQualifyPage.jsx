@@ -45,7 +45,7 @@ export default function PreQualifyPage() {
 
   const fetchSubmissions = async () => {
     try {
-      const response = await axios.get(`${API}/prequalify/submissions`);
+      const response = await axios.get(`${API}/prequalify/submissions?fields=summary`);
       setSubmissions(response.data);
     } catch (error) {
       toast.error('Error al cargar las solicitudes');